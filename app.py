@@ -10,10 +10,13 @@ from io import StringIO
 import streamlit as st
 import pandas as pd
 
-from src.storage import ticks_to_ohlcv
-from src.analytics import ols_hedge_ratio, construct_spread, rolling_zscore, adf_test, rolling_corr
-from src.alerts import zscore_alerts
-from tools.gen_synthetic_ticks import gen
+from src.pipeline import AnalyticsPipeline
+from src.alerts import AlertEngine, zscore_rule
+from src.loader import load_bars
+from src.storage import compact_ticks
+from src.daemon import read_state
+from src.export import FORMATS, MIME, export_bytes
+from src.shm import SharedBarsReader
 
 
 st.set_page_config(page_title="Realtime Quant Prototype", layout="wide")
@@ -27,29 +30,53 @@ with st.sidebar:
         n = st.number_input("Ticks per symbol (demo)", min_value=120, max_value=100000, value=120)
         symbols = st.text_input("Symbols (space-separated)", value="SYM1 SYM2").split()
         if st.button("Generate demo data"):
+            from tools.gen_synthetic_ticks import gen  # only needed for demo data
+
             frames = [gen(s, n=n, seed=42 + i) for i, s in enumerate(symbols)]
-            df = pd.concat(frames).sort_values("timestamp").reset_index(drop=True)
+            df = compact_ticks(pd.concat(frames).sort_values("timestamp").reset_index(drop=True))
             st.session_state["df"] = df
     else:
-        uploaded = st.file_uploader("Upload synthetic ticks CSV", type=["csv"]) 
-        if uploaded is not None:
-            df = pd.read_csv(uploaded)
-            st.session_state["df"] = df
+        uploaded = st.file_uploader("Upload ticks (CSV or Parquet)", type=["csv", "parquet"])
+        if uploaded is not None and st.session_state.get("upload_id") != (uploaded.name, uploaded.size):
+            # stream the file into 1s bars; coarser intervals are resampled from them
+            st.session_state["df"] = load_bars(uploaded, "1s").reset_index()
+            st.session_state["upload_id"] = (uploaded.name, uploaded.size)
 
     st.header("Analysis")
-    interval = st.selectbox("OHLCV interval", options=["1s", "1m", "5m"], index=0)
+    interval = st.selectbox("OHLCV interval", options=["1s", "15s", "1m", "5m", "15m", "1h"], index=0)
     rolling_window = st.number_input("Rolling window (periods)", min_value=10, max_value=1000, value=60)
+    chart_points = st.number_input("Chart detail (buckets per series)", min_value=200, max_value=4000, value=1500)
     z_threshold = st.number_input("Z-score alert threshold", min_value=0.1, max_value=10.0, value=2.0, step=0.1)
+    export_fmt = st.selectbox("Export format", FORMATS, index=0)
     st.write("--")
     st.write("Pair analytics")
     symbol_a = st.selectbox("Symbol A", options=["(none)"], index=0, key="sym_a")
     symbol_b = st.selectbox("Symbol B", options=["(none)"], index=0, key="sym_b")
+    st.header("Live daemon")
+    daemon_port = st.number_input("Daemon state port", min_value=1, max_value=65535, value=8766)
+    read_daemon = st.button("Read daemon state")
+    shm_name = st.text_input("Shared-memory segment", value="", help="name passed to run_daemon.py --shm")
 
 
 def _ensure_data():
     return st.session_state.get("df") if "df" in st.session_state else None
 
 
+def _pipeline() -> AnalyticsPipeline:
+    """Per-session cache of bars and pair analytics."""
+    if "pipeline" not in st.session_state:
+        st.session_state["pipeline"] = AnalyticsPipeline()
+    return st.session_state["pipeline"]
+
+
+def _alert_engine(threshold: float) -> AlertEngine:
+    """Per-session alert state; rebuilt when the threshold changes."""
+    engine = st.session_state.get("alert_engine")
+    if engine is None or engine.rules[0].enter != threshold:
+        engine = st.session_state["alert_engine"] = AlertEngine([zscore_rule(threshold, exit=0.5)])
+    return engine
+
+
 df = _ensure_data()
 if df is None:
     st.info("No data loaded. Use demo data or upload a synthetic ticks CSV (see tools/gen_synthetic_ticks.py).")
@@ -62,13 +89,17 @@ else:
     symbol_a = st.sidebar.selectbox("Symbol A", options=syms, index=0, key="sym_a2")
     symbol_b = st.sidebar.selectbox("Symbol B", options=syms, index=1 if len(syms) > 1 else 0, key="sym_b2")
 
-    # aggregate for both symbols
-    bars = ticks_to_ohlcv(df, interval=interval)
+    # aggregate for all symbols (cached per dataset and interval)
+    pipe = _pipeline()
+    if pipe.bars(df, interval).empty:
+        st.info(f"No {interval} bars in this dataset. Pick a different interval or load more data.")
+        st.stop()
+    close_df = pipe.closes(df, interval)
 
     st.subheader("Price (close) — All symbols")
     # show combined close series per symbol as separate lines
-    close_df = bars["close"].unstack(level=0)
-    st.line_chart(close_df.ffill())
+    # downsampled to min/max per bucket so long histories stay cheap to draw
+    st.line_chart(pipe.pyramid(df, ("closes", interval), close_df.ffill).view(width=chart_points))
 
     st.subheader("Pair analytics")
     col1, col2 = st.columns(2)
@@ -77,37 +108,39 @@ else:
         st.markdown(f"**Symbol B:** {symbol_b}")
         if st.button("Compute pair analytics"):
             try:
-                a_close = close_df[symbol_a].dropna()
-                b_close = close_df[symbol_b].dropna()
-                # align series
-                pair = pd.concat([a_close, b_close], axis=1).dropna()
-                a = pair.iloc[:, 0]
-                b = pair.iloc[:, 1]
-                beta = ols_hedge_ratio(a, b)
+                a, b = pipe.pair(df, interval, symbol_a, symbol_b)
+                beta = pipe.hedge_ratio(df, interval, symbol_a, symbol_b)
                 st.write(f"OLS hedge ratio (A ~ B): {beta:.6f}")
-                spread = construct_spread(a, b, hedge_ratio=beta)
-                z = rolling_zscore(spread, window=rolling_window)
-                corr = rolling_corr(a, b, window=rolling_window)
+                spread = pipe.spread(df, interval, symbol_a, symbol_b)
+                z = pipe.zscore(df, interval, symbol_a, symbol_b, window=rolling_window)
+                corr = pipe.corr(df, interval, symbol_a, symbol_b, window=rolling_window)
 
-                st.line_chart(pd.DataFrame({"spread": spread, "zscore": z}).fillna(method="ffill"))
-                st.line_chart(corr)
+                chart_key = (interval, symbol_a, symbol_b, rolling_window)
+                sz = pipe.pyramid(df, ("spread_z", *chart_key),
+                                  lambda: pd.DataFrame({"spread": spread, "zscore": z}).ffill())
+                st.line_chart(sz.view(width=chart_points))
+                st.line_chart(pipe.pyramid(df, ("corr", *chart_key), lambda: corr).view(width=chart_points))
 
                 # ADF test on spread
-                adf_res = adf_test(spread)
+                adf_res = pipe.adf(df, interval, symbol_a, symbol_b)
                 st.write("ADF test:", adf_res)
 
                 # alerts
-                alerts = zscore_alerts(z, threshold=z_threshold)
+                # alerts: one per excursion beyond the threshold, re-armed once |z| < 0.5
+                engine = _alert_engine(z_threshold)
+                key = (pipe.dataset_key(df), interval, symbol_a, symbol_b, rolling_window)
+                engine.evaluate(key, z.rename("zscore"))
+                alerts = [{"timestamp": a["timestamp"], "zscore": a["value"]} for a in engine.history if a["pair"] == key]
                 if alerts:
                     st.warning(f"{len(alerts)} alerts: show in table below")
                     st.table(pd.DataFrame(alerts))
                 else:
                     st.write("No z-score alerts")
 
-                # CSV export
-                out = pd.concat([a, b, spread.rename("spread"), z.rename("zscore")], axis=1)
-                csv = out.to_csv(index=True)
-                st.download_button("Download pair CSV", data=csv, file_name="pair_analysis.csv", mime="text/csv")
+                # export, generated only when the download is clicked
+                columns = {symbol_a: a, symbol_b: b, "spread": spread, "zscore": z}
+                st.download_button(f"Download pair {export_fmt}", data=lambda: export_bytes(columns, export_fmt),
+                                   file_name=f"pair_analysis.{export_fmt}", mime=MIME[export_fmt], on_click="ignore")
 
             except Exception as exc:
                 st.error(f"Error computing analytics: {exc}")
@@ -115,12 +148,40 @@ else:
         st.markdown("**On-demand tests & notes**")
         if st.button("Run ADF on selected spread"):
             try:
-                a_close = close_df[symbol_a].dropna()
-                b_close = close_df[symbol_b].dropna()
-                pair = pd.concat([a_close, b_close], axis=1).dropna()
-                spread = construct_spread(pair.iloc[:, 0], pair.iloc[:, 1], ols_hedge_ratio(pair.iloc[:, 0], pair.iloc[:, 1]))
-                st.json(adf_test(spread))
+                st.json(pipe.adf(df, interval, symbol_a, symbol_b))
             except Exception as exc:
                 st.error(f"ADF error: {exc}")
-
-    st.caption("UI is research-oriented and intentionally minimal. For live connectivity, replace the demo generator with a Binance WebSocket source and feed ticks into the same in-memory buffer.")
+        if st.button("Scan all pairs"):
+            try:
+                st.dataframe(pipe.scan(df, interval))
+            except Exception as exc:
+                st.error(f"Scan error: {exc}")
+
+    st.caption("UI is research-oriented and intentionally minimal. For live connectivity, replace the demo generator with a Binance WebSocket source feeding a `TickRingBuffer` (src/buffer.py).")
+
+
+# latest signals computed by tools/run_daemon.py, read instead of recomputed
+if read_daemon:
+    try:
+        state = read_state(("127.0.0.1", int(daemon_port)))
+        st.subheader("Live daemon state")
+        st.caption(f"{state.get('stats', {})}")
+        st.dataframe(pd.DataFrame.from_dict(state.get("pairs", {}), orient="index"))
+    except OSError as exc:
+        st.error(f"Could not reach daemon on port {daemon_port}: {exc}")
+
+# same daemon, mapped read-only from shared memory (no socket round trip)
+if shm_name:
+    try:
+        reader = SharedBarsReader(shm_name, timeout=0.5)
+    except (FileNotFoundError, ValueError) as exc:
+        st.error(f"Could not attach shared memory {shm_name!r}: {exc}")
+    else:
+        try:
+            st.subheader("Shared-memory signals")
+            st.dataframe(reader.latest())
+            pair = st.selectbox("Pair", reader.pairs, key="shm_pair") if reader.pairs else None
+            if pair:
+                st.line_chart(reader.signals(pair)[["zscore"]])
+        finally:
+            reader.close()
@@ -0,0 +1,28 @@
+"""Shared data for the benchmark suite (generated once per session)."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from tools.gen_synthetic_ticks import gen_universe
+
+
+@pytest.fixture(scope="session")
+def ticks() -> pd.DataFrame:
+    """1M ticks over 20 cointegrated symbols with Poisson/burst arrivals."""
+    return pd.concat(gen_universe(n_symbols=20, n_ticks=1_000_000, n_factors=4, seed=7), ignore_index=True)
+
+
+@pytest.fixture(scope="session")
+def pair_ticks() -> pd.DataFrame:
+    """200k ticks of two cointegrated symbols (about 1.4 h of 1s bars)."""
+    return pd.concat(gen_universe(n_symbols=2, n_ticks=200_000, n_factors=1, rate=40.0, seed=7), ignore_index=True)
+
+
+@pytest.fixture(scope="session")
+def closes() -> pd.DataFrame:
+    """One day of aligned 1s closes for a cointegrated pair (86,400 bars)."""
+    rng = np.random.default_rng(7)
+    n = 86_400
+    x = 100 + rng.normal(scale=0.01, size=n).cumsum()
+    y = 5 + 1.5 * x + rng.normal(scale=0.05, size=n)
+    return pd.DataFrame({"y": y, "x": x}, index=pd.date_range("2025-01-01", periods=n, freq="1s"))
@@ -0,0 +1,12 @@
+from src.alerts import AlertEngine, zscore_alerts, zscore_rule
+from src.analytics import rolling_zscore
+
+
+def test_zscore_alerts(benchmark, closes):
+    z = rolling_zscore(closes["y"] - 1.5 * closes["x"], 60)
+    benchmark(zscore_alerts, z, 2.0)
+
+
+def test_alert_engine_evaluate(benchmark, closes):
+    z = rolling_zscore(closes["y"] - 1.5 * closes["x"], 60).rename("zscore")
+    benchmark(lambda: AlertEngine([zscore_rule(2.0)]).evaluate("y/x", z))
@@ -0,0 +1,41 @@
+import pytest
+
+from src.adf import adf_fast
+from src.analytics import (
+    adf_test, construct_spread, ewm_hedge_ratio, ols_hedge_ratio, rolling_corr, rolling_hedge_ratio, rolling_zscore,
+)
+
+
+def test_ols_hedge_ratio(benchmark, closes):
+    benchmark(ols_hedge_ratio, closes["y"], closes["x"])
+
+
+def test_rolling_hedge_ratio(benchmark, closes):
+    benchmark(rolling_hedge_ratio, closes["y"], closes["x"], 60)
+
+
+def test_ewm_hedge_ratio(benchmark, closes):
+    benchmark(ewm_hedge_ratio, closes["y"], closes["x"], 60)
+
+
+@pytest.mark.parametrize("dynamic", [False, True], ids=["static", "dynamic"])
+def test_construct_spread(benchmark, closes, dynamic):
+    beta = rolling_hedge_ratio(closes["y"], closes["x"], 60) if dynamic else 1.5
+    benchmark(construct_spread, closes["y"], closes["x"], beta)
+
+
+def test_rolling_zscore(benchmark, closes):
+    benchmark(rolling_zscore, closes["y"] - 1.5 * closes["x"], 60)
+
+
+def test_rolling_corr(benchmark, closes):
+    benchmark(rolling_corr, closes["y"], closes["x"], 60)
+
+
+def test_adf_test_3600(benchmark, closes):
+    spread = (closes["y"] - 1.5 * closes["x"]).iloc[:3600]
+    benchmark.pedantic(adf_test, args=(spread,), rounds=3, iterations=1)
+
+
+def test_adf_fast_3600(benchmark, closes):
+    benchmark(adf_fast, (closes["y"] - 1.5 * closes["x"]).iloc[:3600])
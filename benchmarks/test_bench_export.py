@@ -0,0 +1,20 @@
+import pandas as pd
+import pytest
+
+from src.export import FORMATS, export_bytes
+
+
+@pytest.fixture(scope="module")
+def columns(closes):
+    spread = closes["y"] - 1.5 * closes["x"]
+    return {"y": closes["y"], "x": closes["x"], "spread": spread, "zscore": (spread - spread.mean()) / spread.std()}
+
+
+def test_full_to_csv(benchmark, columns):
+    # what the dashboards used to do on every rerun
+    benchmark(lambda: pd.concat(columns, axis=1).to_csv())
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_export_bytes(benchmark, columns, fmt):
+    benchmark(export_bytes, columns, fmt)
@@ -0,0 +1,14 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.mark.parametrize("module", ["src.kernels", "src.analytics", "src.pipeline", "src.daemon"])
+def test_cold_import(benchmark, module):
+    # a fresh interpreter per round, as a pool worker or CLI run would pay
+    benchmark.pedantic(subprocess.run, args=([sys.executable, "-c", f"import {module}"],),
+                       kwargs={"cwd": ROOT, "check": True}, rounds=5, iterations=1)
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from src import kernels
+
+BACKENDS = [pytest.param(b, marks=pytest.mark.skipif(not kernels.available(b), reason=f"{b} not installed"))
+            for b in kernels.BACKENDS]
+KERNELS = ["zscore", "beta", "corr"]
+
+
+@pytest.fixture(scope="module")
+def batch():
+    """100 pairs x 1 hour of 1s closes, one column per pair."""
+    rng = np.random.default_rng(7)
+    x = 100 + rng.normal(scale=0.01, size=(3600, 100)).cumsum(axis=0)
+    return 5 + 1.5 * x + rng.normal(scale=0.05, size=x.shape), x
+
+
+def _call(name, y, x, backend, out=None):
+    if name == "zscore":
+        return kernels.rolling_zscore(y - 1.5 * x, 60, out=out, backend=backend)
+    fn = kernels.rolling_beta if name == "beta" else kernels.rolling_corr
+    return fn(y, x, 60, out=out, backend=backend)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("name", KERNELS)
+def test_kernel_one_day(benchmark, closes, name, backend):
+    y, x = closes["y"].to_numpy(), closes["x"].to_numpy()
+    _call(name, y, x, backend)  # compile outside the timing
+    benchmark(_call, name, y, x, backend)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("name", KERNELS)
+def test_kernel_100_pairs(benchmark, batch, name, backend):
+    y, x = batch
+    out = np.empty_like(y)
+    _call(name, y, x, backend, out)
+    benchmark(_call, name, y, x, backend, out)
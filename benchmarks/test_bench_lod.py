@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.lod import LODPyramid
+
+
+@pytest.fixture(scope="module", params=[86_400, 7 * 86_400], ids=["1day", "1week"])
+def pyramid(request):
+    n = request.param
+    rng = np.random.default_rng(7)
+    index = pd.date_range("2025-01-01", periods=n, freq="1s")
+    return LODPyramid(pd.DataFrame(rng.normal(size=(n, 2)).cumsum(axis=0), index=index, columns=["spread", "zscore"]))
+
+
+def test_lod_view_full_range(benchmark, pyramid):
+    # payload and time should not grow with history length
+    view = benchmark(pyramid.view, width=1500)
+    assert len(view) <= 4 * 1500 + 2
+
+
+def test_lod_append_one_bar(benchmark, pyramid):
+    last = pyramid.span()[1]
+    bar = pd.DataFrame({"spread": [0.0], "zscore": [0.0]})
+
+    def append():
+        nonlocal last
+        last += pd.Timedelta("1s")
+        pyramid.append(bar.set_axis([last]))
+
+    benchmark(append)
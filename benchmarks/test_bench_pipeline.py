@@ -0,0 +1,28 @@
+"""End-to-end latency: the dashboard path on a fresh dataset and the live per-bar path."""
+from src.daemon import PairShard
+from src.pipeline import AnalyticsPipeline
+
+
+def test_dashboard_pipeline_cold(benchmark, pair_ticks):
+    a, b = sorted(pair_ticks["symbol"].unique())
+
+    def run():
+        pipe = AnalyticsPipeline()
+        pipe.zscore(pair_ticks, "1s", a, b, 60)
+        pipe.corr(pair_ticks, "1s", a, b, 60)
+        return pipe.adf(pair_ticks, "1s", a, b)
+
+    benchmark.pedantic(run, rounds=3, iterations=1)
+
+
+def test_live_bar_100_pairs(benchmark):
+    symbols = [f"S{i}" for i in range(20)]
+    pairs = [(symbols[i], symbols[j]) for i in range(20) for j in range(i + 1, 20)][:100]
+    shard = PairShard(pairs, adf_every=0)
+    state = {"t": 0}
+
+    def one_bar():
+        state["t"] += 1_000_000_000
+        shard.process([(state["t"], {s: 100.0 + (state["t"] // 10**9 * (k + 1)) % 7 for k, s in enumerate(symbols)})])
+
+    benchmark(one_bar)
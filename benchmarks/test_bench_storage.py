@@ -0,0 +1,50 @@
+import pytest
+
+from src.storage import BarAggregator, compact_ticks, ticks_to_ohlcv
+
+
+def test_ticks_to_ohlcv_1m(benchmark, ticks):
+    bars = benchmark(ticks_to_ohlcv, ticks, "1s")
+    assert len(bars)
+
+
+def test_ticks_to_ohlcv_iso_strings(benchmark, ticks):
+    iso = ticks.iloc[:200_000].assign(timestamp=ticks["timestamp"].iloc[:200_000].dt.strftime("%Y-%m-%dT%H:%M:%S.%f"))
+    benchmark(ticks_to_ohlcv, iso, "1s")
+
+
+def test_bar_aggregator_streaming(benchmark, ticks):
+    batches = [ticks.iloc[i:i + 1_000] for i in range(0, 200_000, 1_000)]
+
+    def run():
+        agg = BarAggregator("1s", history=0)
+        for b in batches:
+            agg.update_records(b)
+
+    benchmark(run)
+
+
+# before/after for the compact tick schema: object symbols + int quantities
+# (the old CSV round-trip layout) vs `compact_ticks` with float64 / float32
+SCHEMAS = {
+    "object": lambda t: t.astype({"symbol": object, "quantity": "int64"}),
+    "compact": lambda t: compact_ticks(t),
+    "compact32": lambda t: compact_ticks(t, float_dtype="float32"),
+}
+
+
+@pytest.fixture(scope="module", params=list(SCHEMAS))
+def schema_ticks(request, ticks):
+    frame = SCHEMAS[request.param](ticks)
+    return frame, frame.memory_usage(deep=True).sum() / len(frame)
+
+
+def test_ticks_to_ohlcv_by_schema(benchmark, schema_ticks):
+    frame, bytes_per_tick = schema_ticks
+    benchmark.extra_info["mb_per_million_ticks"] = round(bytes_per_tick, 1)
+    benchmark(ticks_to_ohlcv, frame, "1s")
+
+
+def test_groupby_symbol_by_schema(benchmark, schema_ticks):
+    frame, _ = schema_ticks
+    benchmark(lambda: frame.groupby("symbol", observed=True)["price"].agg(["last", "max", "count"]))
@@ -1,7 +1,26 @@
-"""Simple rule-based alerts."""
-from typing import List
+"""Rule-based alerts.
+
+`zscore_alerts` flags every bar of a z-score Series beyond a threshold.
+For live use, `AlertEngine` keeps per-pair, per-rule state instead: it only
+evaluates values newer than the last one it saw for a pair, fires once
+when a metric enters its alert zone and re-arms only after the metric
+comes back through a separate exit level (hysteresis), with an optional
+cooldown between alerts. New alerts are handed to an `AlertDispatcher`,
+whose asyncio task delivers them to pluggable sinks off the analytics
+thread.
+"""
+from collections import deque
+from typing import Callable, Deque, Dict, Hashable, Iterable, List, Literal, Optional, Tuple, Union
+import asyncio
+import json
+import queue
+import threading
+import urllib.request
+import numpy as np
 import pandas as pd
 
+from src.metrics import REGISTRY, timer, timed
+
 
 def zscore_alerts(z: pd.Series, threshold: float = 2.0) -> List[dict]:
     """Return alert dicts for times where |z| > threshold."""
@@ -12,3 +31,360 @@ def zscore_alerts(z: pd.Series, threshold: float = 2.0) -> List[dict]:
     for t, val in z[mask].items():
         out.append({"timestamp": t, "zscore": float(val)})
     return out
+
+
+Direction = Literal["abs", "above", "below", "drift"]
+
+
+class Rule:
+    """Hysteresis rule on one metric.
+
+    - ``abs``: fires when |v| > enter, re-arms when |v| <= exit
+    - ``above``: fires when v > enter, re-arms when v <= exit
+    - ``below``: fires when v < enter, re-arms when v >= exit
+    - ``drift``: like ``abs`` on the relative change |v / ref - 1|, where
+      ref is the first value seen for the pair
+
+    `exit` defaults to `enter` (no hysteresis). `cooldown` suppresses a new
+    alert for that long after the previous one of the same rule and pair.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        metric: str,
+        enter: float,
+        exit: Optional[float] = None,
+        direction: Direction = "abs",
+        cooldown: Union[str, pd.Timedelta, None] = None,
+    ):
+        if direction not in ("abs", "above", "below", "drift"):
+            raise ValueError(f"Unknown rule direction: {direction}")
+        exit = enter if exit is None else exit
+        if (exit < enter) if direction == "below" else (exit > enter):
+            raise ValueError("exit level must lie on the non-alerting side of enter")
+        self.name = name
+        self.metric = metric
+        self.enter = float(enter)
+        self.exit = float(exit)
+        self.direction = direction
+        self.cooldown_ns = pd.Timedelta(cooldown).value if cooldown is not None else 0
+
+    def _masks(self, v):
+        if self.direction == "below":
+            return v < self.enter, v >= self.exit
+        if self.direction in ("abs", "drift"):
+            v = np.abs(v)
+        return v > self.enter, v <= self.exit
+
+
+def zscore_rule(threshold: float = 2.0, exit: float = 0.5, cooldown=None) -> Rule:
+    """|z| above `threshold`, re-armed once |z| falls to `exit`."""
+    return Rule("zscore", "zscore", threshold, min(exit, threshold), "abs", cooldown)
+
+
+def corr_breakdown_rule(min_corr: float = 0.5, exit: float = 0.6, cooldown=None) -> Rule:
+    """Rolling correlation falling below `min_corr`, re-armed above `exit`."""
+    return Rule("corr_breakdown", "corr", min_corr, max(exit, min_corr), "below", cooldown)
+
+
+def hedge_drift_rule(max_drift: float = 0.1, exit: float = 0.05, cooldown=None) -> Rule:
+    """Hedge ratio moving more than `max_drift` (relative) from its first value."""
+    return Rule("hedge_drift", "hedge_ratio", max_drift, min(exit, max_drift), "drift", cooldown)
+
+
+class _State:
+    __slots__ = ("active", "last_fire", "last_ts", "ref")
+
+    def __init__(self):
+        self.active = False
+        self.last_fire: Optional[int] = None
+        self.last_ts: Optional[int] = None
+        self.ref: Optional[float] = None
+
+
+class AlertEngine:
+    """Stateful streaming evaluation of `rules` for many pairs.
+
+    Call `update(pair, timestamp, zscore=..., corr=...)` once per bar, or
+    `evaluate(pair, metrics)` with a whole Series/DataFrame of metrics
+    indexed by time; either way only values newer than the last one seen
+    for that pair and rule are examined. Returns the alerts newly fired,
+    also kept in `history` and published to `dispatcher` if given.
+    """
+
+    def __init__(self, rules: Iterable[Rule], dispatcher: Optional["AlertDispatcher"] = None, history: int = 10_000):
+        self.rules = list(rules)
+        self.dispatcher = dispatcher
+        self.history: Deque[dict] = deque(maxlen=history)
+        self.stats: Dict[str, int] = {"evaluated": 0, "alerts": 0}
+        self._state: Dict[Tuple[Hashable, str], _State] = {}
+
+    def _get(self, pair: Hashable, rule: Rule) -> _State:
+        st = self._state.get((pair, rule.name))
+        if st is None:
+            st = self._state[(pair, rule.name)] = _State()
+        return st
+
+    def _fire(self, pair, rule: Rule, st: _State, ts: int, value: float, out: List[dict]) -> None:
+        was_active, st.active = st.active, True
+        if was_active or (st.last_fire is not None and ts - st.last_fire < rule.cooldown_ns):
+            return
+        st.last_fire = ts
+        out.append({
+            "timestamp": pd.Timestamp(ts),
+            "pair": pair,
+            "rule": rule.name,
+            "metric": rule.metric,
+            "value": float(value),
+            "threshold": rule.enter,
+        })
+
+    def _step(self, pair, rule: Rule, ts: int, raw: float, out: List[dict]) -> None:
+        """Scalar version of `_scan` for one new bar."""
+        st = self._get(pair, rule)
+        if st.last_ts is not None and ts <= st.last_ts:
+            return
+        st.last_ts = ts
+        self.stats["evaluated"] += 1
+        v = raw
+        if rule.direction == "drift":
+            if st.ref is None:
+                if not np.isfinite(raw) or raw == 0:
+                    return
+                st.ref = raw
+            v = raw / st.ref - 1.0
+        if rule.direction == "below":
+            fire, rearm = v < rule.enter, v >= rule.exit
+        else:
+            if rule.direction != "above":
+                v = abs(v)
+            fire, rearm = v > rule.enter, v <= rule.exit
+        if fire:
+            self._fire(pair, rule, st, ts, raw, out)
+        elif rearm:
+            st.active = False
+
+    def _scan(self, pair, rule: Rule, ts: np.ndarray, raw: np.ndarray, out: List[dict]) -> None:
+        st = self._get(pair, rule)
+        if st.last_ts is not None:
+            start = np.searchsorted(ts, st.last_ts, side="right")
+            ts, raw = ts[start:], raw[start:]
+        if not len(ts):
+            return
+        st.last_ts = int(ts[-1])
+        self.stats["evaluated"] += len(ts)
+        v = raw
+        if rule.direction == "drift":
+            if st.ref is None:
+                finite = np.flatnonzero(np.isfinite(raw) & (raw != 0))
+                if not len(finite):
+                    return
+                st.ref = float(raw[finite[0]])
+            v = raw / st.ref - 1.0
+        with np.errstate(invalid="ignore"):
+            fire, rearm = rule._masks(v)
+        # only state changes matter: walk the first bar of each fire/re-arm run
+        idx = np.flatnonzero(fire | rearm)
+        if not len(idx):
+            return
+        kind = fire[idx]
+        idx = idx[np.concatenate(([True], kind[1:] != kind[:-1]))]
+        for i in idx:
+            if fire[i]:
+                self._fire(pair, rule, st, int(ts[i]), raw[i], out)
+            else:
+                st.active = False
+
+    def _emit(self, out: List[dict]) -> List[dict]:
+        if out:
+            self.stats["alerts"] += len(out)
+            self.history.extend(out)
+            if self.dispatcher is not None:
+                self.dispatcher.publish(out)
+        return out
+
+    @timed("alert")
+    def update(self, pair: Hashable, timestamp, **metrics: float) -> List[dict]:
+        """Evaluate one bar of metrics (e.g. ``zscore=2.4, corr=0.8``) for `pair`."""
+        ts = pd.Timestamp(timestamp).value
+        out: List[dict] = []
+        for rule in self.rules:
+            if rule.metric in metrics:
+                self._step(pair, rule, ts, float(metrics[rule.metric]), out)
+        return self._emit(out)
+
+    @timed("alert")
+    def evaluate(self, pair: Hashable, metrics: Union[pd.Series, pd.DataFrame]) -> List[dict]:
+        """Evaluate the new rows of a time-indexed metric Series (named) or DataFrame."""
+        frame = metrics.to_frame() if isinstance(metrics, pd.Series) else metrics
+        ts = pd.DatetimeIndex(frame.index).asi8
+        out: List[dict] = []
+        for rule in self.rules:
+            if rule.metric in frame.columns:
+                self._scan(pair, rule, ts, frame[rule.metric].to_numpy(dtype=float), out)
+        return self._emit(out)
+
+    def reset(self, pair: Optional[Hashable] = None) -> None:
+        """Forget the state of one pair (or of all pairs)."""
+        if pair is None:
+            self._state.clear()
+        else:
+            for key in [k for k in self._state if k[0] == pair]:
+                del self._state[key]
+
+
+def _dumps(alerts: List[dict]) -> str:
+    return "".join(json.dumps(a, default=str) + "\n" for a in alerts)
+
+
+class QueueSink:
+    """In-process sink: alerts land on a bounded queue, oldest dropped first."""
+
+    def __init__(self, maxsize: int = 10_000):
+        self.queue: "queue.Queue[dict]" = queue.Queue(maxsize=maxsize)
+
+    async def send(self, alerts: List[dict]) -> None:
+        for alert in alerts:
+            while True:
+                try:
+                    self.queue.put_nowait(alert)
+                    break
+                except queue.Full:
+                    try:
+                        self.queue.get_nowait()
+                    except queue.Empty:
+                        pass
+
+    def get(self, timeout: Optional[float] = None) -> Optional[dict]:
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class FileSink:
+    """Append alerts to `path` as JSON lines."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _write(self, text: str) -> None:
+        with open(self.path, "a") as f:
+            f.write(text)
+
+    async def send(self, alerts: List[dict]) -> None:
+        await asyncio.to_thread(self._write, _dumps(alerts))
+
+
+class WebhookSink:
+    """POST each alert batch as a JSON array to `url` (e.g. a local webhook stand-in)."""
+
+    def __init__(self, url: str, timeout: float = 2.0):
+        self.url = url
+        self.timeout = timeout
+
+    def _post(self, body: bytes) -> None:
+        req = urllib.request.Request(self.url, data=body, headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(req, timeout=self.timeout):
+            pass
+
+    async def send(self, alerts: List[dict]) -> None:
+        await asyncio.to_thread(self._post, json.dumps(alerts, default=str).encode())
+
+
+class CallbackSink:
+    """Call `fn(alerts)` on the dispatcher thread."""
+
+    def __init__(self, fn: Callable[[List[dict]], None]):
+        self.fn = fn
+
+    async def send(self, alerts: List[dict]) -> None:
+        self.fn(alerts)
+
+
+class AlertDispatcher:
+    """Delivers published alerts to `sinks` from a background asyncio task.
+
+    `publish()` never blocks the caller: alerts are queued on the
+    dispatcher's event loop (bounded by `queue_size` alerts, oldest dropped)
+    and whatever has accumulated is sent to every sink concurrently. A
+    failing sink is counted in ``stats["errors"]`` and does not affect the
+    others.
+    """
+
+    def __init__(self, sinks: Iterable, queue_size: int = 10_000):
+        self.sinks = list(sinks)
+        self.queue_size = queue_size
+        self.stats: Dict[str, int] = {"published": 0, "delivered": 0, "dropped": 0, "errors": 0}
+        self._pending: Deque[dict] = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._closing = False
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ready = threading.Event()
+
+    def _enqueue(self, alerts: List[dict]) -> None:
+        self._pending.extend(alerts)
+        overflow = len(self._pending) - self.queue_size
+        for _ in range(max(0, overflow)):
+            self._pending.popleft()
+        self.stats["dropped"] += max(0, overflow)
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        self._wakeup = asyncio.Event()
+        self._ready.set()
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if self._pending:
+                batch = list(self._pending)
+                self._pending.clear()
+                with timer("deliver"):
+                    results = await asyncio.gather(*(s.send(batch) for s in self.sinks), return_exceptions=True)
+                self.stats["errors"] += sum(isinstance(r, Exception) for r in results)
+                self.stats["delivered"] += len(batch)
+            if self._closing and not self._pending:
+                return
+
+    def _run_loop(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._run())
+        finally:
+            self._loop.close()
+
+    def start(self) -> "AlertDispatcher":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run_loop, daemon=True)
+            self._thread.start()
+            self._ready.wait()
+            REGISTRY.register_collector(f"alerts-{id(self)}", self._collect_metrics)
+        return self
+
+    def _collect_metrics(self) -> Dict[str, float]:
+        return {
+            "alert_queue_depth": len(self._pending),
+            "alerts_published_total": self.stats["published"],
+            "alerts_delivered_total": self.stats["delivered"],
+            "alerts_dropped_total": self.stats["dropped"],
+            "alert_sink_errors_total": self.stats["errors"],
+        }
+
+    def publish(self, alerts: List[dict]) -> None:
+        self.stats["published"] += len(alerts)
+        if self._thread is None or self._closing:
+            self.stats["dropped"] += len(alerts)
+            return
+        self._loop.call_soon_threadsafe(self._enqueue, list(alerts))
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Deliver what is pending, then stop the loop thread."""
+        if self._thread is None or self._closing:
+            return
+        self._closing = True
+        self._loop.call_soon_threadsafe(self._wakeup.set)
+        self._thread.join(timeout=timeout)
+        REGISTRY.unregister_collector(f"alerts-{id(self)}")
@@ -2,32 +2,73 @@
 """Quantitative analytics functions for relative-value research.
 
 All functions operate on Pandas Series and return Series or scalars where
-appropriate. They are intentionally small and easily testable.
+appropriate. They are intentionally small and easily testable; the rolling
+statistics are thin wrappers over the array kernels in `src.kernels`.
 """
-from typing import Dict
+from typing import Dict, Hashable, Optional, Tuple, Union
+import numpy as np
 import pandas as pd
-import statsmodels.api as sm
-from statsmodels.tsa.stattools import adfuller
+
+from src import kernels
+
+
+def _aligned(a: pd.Series, b: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    """Outer-align two series like pandas binary rolling ops do."""
+    return (a, b) if a.index.equals(b.index) else a.align(b)
+
+
+def _name(a: pd.Series, b: pd.Series) -> Optional[Hashable]:
+    return a.name if a.name == b.name else None
 
 
 def ols_hedge_ratio(y: pd.Series, x: pd.Series) -> float:
     """Estimate hedge ratio from OLS: y = alpha + beta * x + eps -> return beta.
 
-    Missing values are dropped pairwise. Returns the slope (beta) as float.
+    Missing values are dropped pairwise. Returns the slope (beta) as float,
+    computed in closed form as cov(x, y) / var(x) on demeaned data.
     """
-    xy = pd.concat([y, x], axis=1).dropna()
-    if xy.empty:
+    if not y.index.equals(x.index):
+        y, x = y.align(x, join="inner")
+    yv = y.to_numpy(dtype=float)
+    xv = x.to_numpy(dtype=float)
+    ok = ~(np.isnan(yv) | np.isnan(xv))
+    if not ok.any():
         raise ValueError("Insufficient data to estimate hedge ratio")
-    y_clean = xy.iloc[:, 0]
-    x_clean = xy.iloc[:, 1]
-    x_const = sm.add_constant(x_clean)
-    model = sm.OLS(y_clean, x_const).fit()
-    return float(model.params[1])
+    if not ok.all():
+        yv, xv = yv[ok], xv[ok]
+    dy = yv - yv.mean()
+    dx = xv - xv.mean()
+    sxx = float(dx @ dx)
+    if sxx == 0.0:
+        return float("nan")
+    return float(dx @ dy) / sxx
+
+
+def rolling_hedge_ratio(y: pd.Series, x: pd.Series, window: int = 60) -> pd.Series:
+    """OLS slope of y on x (with intercept) over a rolling window.
+
+    Rows missing either series are skipped; windows where x is constant give NaN.
+    """
+    y, x = _aligned(y, x)
+    beta = kernels.rolling_beta(y.to_numpy(dtype=float), x.to_numpy(dtype=float), window)
+    return pd.Series(beta, index=y.index, name=_name(y, x))
 
 
-def construct_spread(y: pd.Series, x: pd.Series, hedge_ratio: float) -> pd.Series:
-    """Construct spread series: s = y - hedge_ratio * x"""
-    return y - hedge_ratio * x
+def ewm_hedge_ratio(y: pd.Series, x: pd.Series, halflife: float = 60) -> pd.Series:
+    """Exponentially-weighted OLS slope of y on x (with intercept)."""
+    return y.ewm(halflife=halflife).cov(x) / x.ewm(halflife=halflife).var()
+
+
+def construct_spread(y: pd.Series, x: pd.Series, hedge_ratio: Union[float, pd.Series]) -> pd.Series:
+    """Construct spread series: s = y - hedge_ratio * x
+
+    `hedge_ratio` may be a scalar or a time-varying Series aligned on the index.
+    """
+    if not y.index.equals(x.index) or (isinstance(hedge_ratio, pd.Series) and not hedge_ratio.index.equals(y.index)):
+        return y - hedge_ratio * x
+    beta = hedge_ratio.to_numpy(dtype=float) if isinstance(hedge_ratio, pd.Series) else hedge_ratio
+    name = _name(y, x) if not isinstance(hedge_ratio, pd.Series) or hedge_ratio.name == x.name else None
+    return pd.Series(kernels.spread(y.to_numpy(dtype=float), x.to_numpy(dtype=float), beta), index=y.index, name=name)
 
 
 def rolling_zscore(s: pd.Series, window: int = 60) -> pd.Series:
@@ -36,9 +77,7 @@ def rolling_zscore(s: pd.Series, window: int = 60) -> pd.Series:
     Uses population std (ddof=0) to be consistent and avoid small-sample
     instability in short windows.
     """
-    mu = s.rolling(window, min_periods=1).mean()
-    sd = s.rolling(window, min_periods=1).std(ddof=0)
-    return (s - mu) / sd
+    return pd.Series(kernels.rolling_zscore(s.to_numpy(dtype=float), window), index=s.index, name=s.name)
 
 
 def adf_test(s: pd.Series, **kwargs) -> Dict[str, float]:
@@ -46,10 +85,14 @@ def adf_test(s: pd.Series, **kwargs) -> Dict[str, float]:
     arr = s.dropna().astype(float)
     if arr.size < 10:
         return {"statistic": float("nan"), "pvalue": 1.0, "usedlag": 0, "nobs": int(arr.size)}
+    from statsmodels.tsa.stattools import adfuller  # heavy; only loaded when a test is run
+
     res = adfuller(arr, **kwargs)
     return {"statistic": float(res[0]), "pvalue": float(res[1]), "usedlag": int(res[2]), "nobs": int(res[3])}
 
 
 def rolling_corr(a: pd.Series, b: pd.Series, window: int = 60) -> pd.Series:
     """Rolling Pearson correlation between two series using a fixed window."""
-    return a.rolling(window).corr(b)
+    a, b = _aligned(a, b)
+    corr = kernels.rolling_corr(a.to_numpy(dtype=float), b.to_numpy(dtype=float), window)
+    return pd.Series(corr, index=a.index, name=_name(a, b))
@@ -0,0 +1,106 @@
+"""Vectorised pair-trading backtest and parameter sweeps.
+
+Signals come from `ReplayEngine`, i.e. the same incremental code the live
+daemon runs. The strategy is the usual z-score mean reversion: short the
+spread when z > entry, long when z < -entry, flat once |z| < exit. A
+position of q spread units holds q of A and -q * beta of B, with beta
+frozen at entry. Positions are decided on a bar's close and earn the next
+bar's price changes, so there is no look-ahead.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+import os
+import numpy as np
+import pandas as pd
+
+from src.daemon import Pair, pair_key
+from src.replay import ReplayEngine, Source
+from src.storage import Interval
+
+
+def positions(z: pd.Series, entry: float = 2.0, exit: float = 0.5) -> pd.Series:
+    """Spread position (-1, 0, +1) per bar from z-score entry/exit bands."""
+    sig = pd.Series(np.nan, index=z.index)
+    sig[z > entry] = -1.0
+    sig[z < -entry] = 1.0
+    sig[z.abs() < exit] = 0.0
+    return sig.ffill().fillna(0.0).rename("position")
+
+
+def backtest_pair(signals: pd.DataFrame, entry: float = 2.0, exit: float = 0.5,
+                  cost_bps: float = 0.0) -> Tuple[pd.DataFrame, Dict[str, float]]:
+    """Backtest one pair from a `ReplayEngine` signal frame.
+
+    Returns a per-bar frame (position, pnl, cost, equity, drawdown) and a
+    summary with pnl, turnover (traded notional), trades, max_drawdown
+    and a per-bar Sharpe ratio.
+    """
+    pos = positions(signals["zscore"], entry, exit)
+    trade = pos.ne(pos.shift(fill_value=0.0)).cumsum()
+    beta = signals["hedge_ratio"].groupby(trade).transform("first").where(pos != 0, 0.0)
+    qa, qb = pos, -pos * beta
+    a, b = signals["a"], signals["b"]
+    pnl = (qa.shift() * a.diff() + qb.shift() * b.diff()).fillna(0.0)
+    traded = qa.diff().fillna(qa).abs() * a + qb.diff().fillna(qb).abs() * b
+    cost = traded * cost_bps / 1e4
+    equity = (pnl - cost).cumsum()
+    drawdown = equity - equity.cummax().clip(lower=0.0)
+    net = pnl - cost
+    sd = net.std()
+    frame = pd.DataFrame({"position": pos, "pnl": pnl, "cost": cost, "equity": equity, "drawdown": drawdown})
+    summary = {
+        "pnl": float(equity.iloc[-1]) if len(equity) else 0.0,
+        "turnover": float(traded.sum()),
+        "trades": int(((pos != 0) & (pos != pos.shift())).sum()),
+        "max_drawdown": float(drawdown.min()) if len(drawdown) else 0.0,
+        "sharpe": float(net.mean() / sd) if sd > 0 else float("nan"),
+    }
+    return frame, summary
+
+
+def _sweep_window(source: Source, pairs: List[Pair], interval: Interval, window: int, forgetting: float,
+                  thresholds: List[float], exit: float, cost_bps: float) -> List[dict]:
+    signals = ReplayEngine(pairs, interval=interval, window=window, forgetting=forgetting).run(source)
+    rows = []
+    for pair in pairs:
+        sig = signals[pair_key(pair)]
+        for entry in thresholds:
+            if sig.empty:
+                continue
+            _, summary = backtest_pair(sig, entry=entry, exit=min(exit, entry), cost_bps=cost_bps)
+            rows.append({"pair": pair_key(pair), "window": window, "threshold": entry, **summary})
+    return rows
+
+
+def sweep(
+    source: Source,
+    pairs: Iterable[Pair],
+    windows: Iterable[int] = (30, 60, 120),
+    thresholds: Iterable[float] = (1.5, 2.0, 2.5),
+    exit: float = 0.5,
+    interval: Interval = "1s",
+    forgetting: float = 0.999,
+    cost_bps: float = 0.0,
+    processes: Optional[int] = None,
+) -> pd.DataFrame:
+    """Backtest every (pair, rolling window, entry threshold) combination.
+
+    Each window needs its own replay (the z-score depends on it); those
+    replays run across a process pool (`processes=1` runs serially), and
+    all thresholds are evaluated on each replay's signals. `source` is a
+    tick DataFrame or a CSV path; paths avoid pickling the ticks to every
+    worker. Results are sorted by pnl.
+    """
+    pairs, windows, thresholds = [tuple(p) for p in pairs], list(windows), list(thresholds)
+    args = [(source, pairs, interval, w, forgetting, thresholds, exit, cost_bps) for w in windows]
+    workers = min(processes or os.cpu_count() or 1, len(windows))
+    if workers <= 1:
+        parts = [_sweep_window(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_sweep_window, *zip(*args)))
+    out = pd.DataFrame([row for part in parts for row in part])
+    if out.empty:
+        return out
+    return out.sort_values(["pnl", "pair", "window", "threshold"], ascending=[False, True, True, True],
+                           kind="stable").reset_index(drop=True)
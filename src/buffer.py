@@ -0,0 +1,131 @@
+"""Bounded, columnar in-memory tick store shared by ingestion and analytics.
+
+Each symbol owns preallocated NumPy columns (int64 ns timestamps, float64
+prices and quantities) used as a ring buffer. Every value is written twice,
+at slot ``i`` and ``i + capacity``, so the latest ``n <= capacity`` ticks are
+always one contiguous slice and readers get zero-copy views instead of
+DataFrame copies. Memory is fixed at construction time per symbol.
+
+There is a single writer (typically `WebsocketClient` via
+``on_message=buffer.extend``). The writer fills the slots first and only
+then advances the published tick count, so readers never see unwritten
+data. Views alias live memory: a reader holding a view while more than
+``capacity - n`` new ticks arrive sees them overwritten, so take a
+``.copy()`` if a view must outlive the next few batches.
+"""
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+import numpy as np
+import pandas as pd
+
+from src.storage import Interval, _to_ns, ohlcv_from_arrays
+
+Columns = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+class _SymbolRing:
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.ts = np.zeros(2 * capacity, dtype=np.int64)
+        self.price = np.zeros(2 * capacity, dtype=np.float64)
+        self.qty = np.zeros(2 * capacity, dtype=np.float64)
+        self.count = 0  # total ticks ever written; published last
+
+    def write(self, ts: np.ndarray, price: np.ndarray, qty: np.ndarray) -> None:
+        cap = self.capacity
+        if len(ts) > cap:
+            ts, price, qty = ts[-cap:], price[-cap:], qty[-cap:]
+        slots = (self.count + np.arange(len(ts))) % cap
+        for col, vals in ((self.ts, ts), (self.price, price), (self.qty, qty)):
+            col[slots] = vals
+            col[slots + cap] = vals
+        self.count += len(ts)
+
+    def view(self, last: Optional[int] = None) -> Columns:
+        count = self.count
+        n = min(count, self.capacity)
+        if last is not None:
+            n = min(n, last)
+        end = count % self.capacity + self.capacity if count >= self.capacity else count
+        return self.ts[end - n:end], self.price[end - n:end], self.qty[end - n:end]
+
+
+class TickRingBuffer:
+    """Per-symbol columnar ring buffer holding the latest `capacity` ticks."""
+
+    def __init__(self, capacity: int = 1_000_000):
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self.capacity = capacity
+        self._rings: Dict[str, _SymbolRing] = {}
+
+    @property
+    def symbols(self) -> List[str]:
+        return sorted(self._rings)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by all symbol columns."""
+        return sum(r.ts.nbytes + r.price.nbytes + r.qty.nbytes for r in self._rings.values())
+
+    def __len__(self) -> int:
+        return sum(min(r.count, r.capacity) for r in self._rings.values())
+
+    def _ring(self, symbol: str) -> _SymbolRing:
+        ring = self._rings.get(symbol)
+        if ring is None:
+            ring = self._rings[symbol] = _SymbolRing(self.capacity)
+        return ring
+
+    def append(self, symbol: str, timestamp_ns: int, price: float, quantity: float) -> None:
+        """Append one tick (timestamp in epoch nanoseconds)."""
+        self._ring(symbol).write(
+            np.array([timestamp_ns], dtype=np.int64),
+            np.array([price], dtype=np.float64),
+            np.array([quantity], dtype=np.float64),
+        )
+
+    def extend(self, ticks: Union[pd.DataFrame, Iterable[dict]]) -> None:
+        """Append a tick batch: a DataFrame or a list of tick dicts.
+
+        Accepts the same timestamp formats as `ticks_to_ohlcv`, so batches
+        from `WebsocketClient` (epoch ms) can be passed straight through.
+        """
+        if not isinstance(ticks, pd.DataFrame):
+            ticks = pd.DataFrame(list(ticks), columns=["timestamp", "symbol", "price", "quantity"])
+        if ticks.empty:
+            return
+        ts = _to_ns(ticks["timestamp"])
+        price = ticks["price"].to_numpy(dtype=np.float64)
+        qty = ticks["quantity"].to_numpy(dtype=np.float64)
+        codes, uniques = pd.factorize(ticks["symbol"])
+        if len(uniques) == 1:
+            self._ring(uniques[0]).write(ts, price, qty)
+            return
+        for code, sym in enumerate(uniques):
+            m = codes == code
+            self._ring(sym).write(ts[m], price[m], qty[m])
+
+    def view(self, symbol: str, last: Optional[int] = None) -> Columns:
+        """Zero-copy (timestamps, prices, quantities) views, oldest first."""
+        ring = self._rings.get(symbol)
+        if ring is None:
+            empty = np.empty(0)
+            return empty.astype(np.int64), empty, empty
+        return ring.view(last)
+
+    def prices(self, symbol: str, last: Optional[int] = None) -> pd.Series:
+        """Latest prices as a Series indexed by timestamp, backed by the buffer."""
+        ts, price, _ = self.view(symbol, last)
+        return pd.Series(price, index=pd.DatetimeIndex(ts.view("datetime64[ns]")), name=symbol, copy=False)
+
+    def ohlcv(self, interval: Interval = "1s", symbols: Optional[Iterable[str]] = None,
+              last: Optional[int] = None) -> pd.DataFrame:
+        """Bars in the `ticks_to_ohlcv` layout, aggregated straight from the views."""
+        frames = []
+        for sym in sorted(symbols) if symbols is not None else self.symbols:
+            ts, price, qty = self.view(sym, last)
+            if len(ts):
+                frames.append(ohlcv_from_arrays(ts, price, qty, symbols=[sym], interval=interval))
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames)
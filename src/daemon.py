@@ -0,0 +1,441 @@
+"""Headless multi-pair live analytics service.
+
+`AnalyticsDaemon` turns a tick stream (`WebsocketClient` batches or a
+replayed file) into bars with one `BarAggregator`, cuts the closed bars
+into complete time slices across symbols (`BarSlicer`) and fans the
+slices out to worker processes. Each worker owns a shard of the pairs and
+updates their streaming signals in O(1) per bar: recursive hedge ratio,
+spread, rolling z-score and correlation, a periodic fast ADF and the
+alert engine. Workers send back the latest state per pair, which the
+daemon serves as a JSON snapshot on a local TCP socket (`StateServer`,
+read with `read_state`) and optionally in shared memory (`src.shm`), so
+dashboards can display it without recomputing anything.
+"""
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+import json
+import math
+import multiprocessing as mp
+import queue
+import socket
+import socketserver
+import threading
+import time
+import numpy as np
+import pandas as pd
+
+from src.adf import ADFLagCache
+from src import metrics
+from src.alerts import AlertDispatcher, AlertEngine, Rule, corr_breakdown_rule, hedge_drift_rule, zscore_rule
+from src.online import RecursiveHedgeRatio, RollingCorr, RollingZScore
+from src.shm import SharedBarsWriter
+from src.storage import BarAggregator, Interval, _interval_ns
+
+Pair = Tuple[str, str]
+# (bar start ns, {symbol: close}) for one bar interval across all symbols
+Slice = Tuple[int, Dict[str, float]]
+
+
+def pair_key(pair: Pair) -> str:
+    return f"{pair[0]}/{pair[1]}"
+
+
+def default_rules(z_threshold: float = 2.0) -> List[Rule]:
+    return [zscore_rule(z_threshold), corr_breakdown_rule(), hedge_drift_rule()]
+
+
+class BarSlicer:
+    """Release closed bars as complete time slices across symbols.
+
+    A bar interval is released once every active symbol has closed a bar
+    at or after it; `symbols` lists those expected before any of their bars
+    arrive. Symbols more than `stale_bars` intervals behind the most
+    advanced one are treated as idle and do not hold the others back;
+    their last close is carried forward by the consumers.
+    """
+
+    def __init__(self, interval: Interval = "1s", stale_bars: int = 5, symbols: Iterable[str] = ()):
+        self._step = _interval_ns(interval)
+        self.stale_bars = stale_bars
+        self._expected = set(symbols)
+        self._pending: Dict[int, Dict[str, float]] = {}
+        self._last: Dict[str, int] = {}
+        self._released: Optional[int] = None
+
+    def add(self, bars: Union[pd.DataFrame, List[tuple]]) -> List[Slice]:
+        """Consume closed bars and return the slices they complete.
+
+        Accepts ``BarAggregator.update`` frames or ``update_records`` tuples.
+        """
+        if isinstance(bars, pd.DataFrame):
+            if bars.empty:
+                return self._release()
+            bars = zip(bars.index.get_level_values("symbol"), bars.index.get_level_values("timestamp").asi8,
+                       bars["close"].to_numpy())
+        else:
+            bars = ((r[0], r[1], r[5]) for r in bars)
+        for sym, t, close in bars:
+            t = int(t)
+            if not self._last and self._expected:
+                # expected symbols count as one bar behind the first bar seen
+                self._last = {s: t - self._step for s in self._expected}
+            if self._released is not None and t <= self._released:
+                continue
+            if not math.isnan(close):
+                self._pending.setdefault(t, {})[sym] = float(close)
+            if t > self._last.get(sym, t - 1):
+                self._last[sym] = t
+        return self._release()
+
+    def _release(self, until: Optional[int] = None) -> List[Slice]:
+        if until is None:
+            if not self._last:
+                return []
+            newest = max(self._last.values())
+            active = [t for t in self._last.values() if t >= newest - self.stale_bars * self._step]
+            until = min(active)
+        ready = sorted(t for t in self._pending if t <= until)
+        if ready:
+            self._released = ready[-1]
+        return [(t, self._pending.pop(t)) for t in ready]
+
+    def flush(self) -> List[Slice]:
+        """Release everything still pending."""
+        return self._release(until=max(self._pending, default=0))
+
+
+class PairSignals:
+    """O(1)-per-bar signal state of one pair, fed with aligned closes."""
+
+    def __init__(self, pair: Pair, window: int = 60, forgetting: float = 0.999,
+                 adf_every: int = 300, history: int = 3600):
+        self.pair = pair
+        self.hedge = RecursiveHedgeRatio(forgetting)
+        self.z = RollingZScore(window)
+        self.corr = RollingCorr(window)
+        self.spreads: deque = deque(maxlen=history)
+        self.adf_every = adf_every
+        self.bars = 0
+        self.state: Dict[str, object] = {}
+
+    def update(self, t: int, a: float, b: float, adf_lags: Optional[ADFLagCache] = None) -> Dict[str, object]:
+        with metrics.timer("hedge"):
+            beta = self.hedge.update(a, b)
+            spread = a - beta * b if math.isfinite(beta) else float("nan")
+        self.spreads.append(spread)
+        self.bars += 1
+        with metrics.timer("zscore"):
+            z, corr = self.z.update(spread), self.corr.update(a, b)
+        self.state.update(timestamp=t, a=a, b=b, hedge_ratio=beta, spread=spread, zscore=z, corr=corr, bars=self.bars)
+        if adf_lags is not None and self.adf_every and self.bars % self.adf_every == 0:
+            with metrics.timer("adf"):
+                res = adf_lags.test(pair_key(self.pair), pd.Series(self.spreads))
+            self.state.update(adf_statistic=res["statistic"], adf_pvalue=res["pvalue"])
+        return self.state
+
+
+class PairShard:
+    """Signals and alert state for a subset of pairs (one per worker)."""
+
+    def __init__(self, pairs: Sequence[Pair], rules: Optional[List[Rule]] = None, **signal_kwargs):
+        self.signals = {p: PairSignals(p, **signal_kwargs) for p in pairs}
+        self.engine = AlertEngine(rules if rules is not None else default_rules())
+        self.adf_lags = ADFLagCache()
+        self._last: Dict[str, float] = {}
+
+    def process(self, slices: Iterable[Slice],
+                record: Optional[Dict[str, List[dict]]] = None) -> Tuple[Dict[str, dict], List[dict]]:
+        """Apply slices in time order; return changed pair states and new alerts.
+
+        If `record` is given, every bar's state is also appended to
+        ``record[pair_key]``.
+        """
+        changed: Dict[str, dict] = {}
+        alerts: List[dict] = []
+        for t, closes in slices:
+            self._last.update(closes)
+            for pair, sig in self.signals.items():
+                if pair[0] not in closes and pair[1] not in closes:
+                    continue
+                a, b = self._last.get(pair[0]), self._last.get(pair[1])
+                if a is None or b is None:
+                    continue
+                state = sig.update(t, a, b, self.adf_lags)
+                key = pair_key(pair)
+                alerts += self.engine.update(key, t, zscore=state["zscore"], corr=state["corr"],
+                                             hedge_ratio=state["hedge_ratio"])
+                changed[key] = dict(state)
+                if record is not None:
+                    record[key].append(changed[key])
+        return changed, alerts
+
+
+def _worker(pairs: List[Pair], kwargs: dict, inbox, outbox, instrument: bool = False, rows: bool = False) -> None:
+    metrics.enable(instrument)
+    shard = PairShard(pairs, **kwargs)
+    while True:
+        slices = inbox.get()
+        if slices is None:
+            break
+        record = {pair_key(p): [] for p in pairs} if rows else None
+        changed, alerts = shard.process(slices, record=record)
+        # ship this batch's stage latencies so the parent exports one view
+        outbox.put((changed, alerts, metrics.REGISTRY.export_state() if instrument else {}, record))
+    outbox.put(None)
+
+
+def _jsonable(state: Dict[str, dict]) -> Dict[str, dict]:
+    out = {}
+    for key, st in state.items():
+        row = {k: (float(v) if isinstance(v, (float, np.floating)) else v) for k, v in st.items()}
+        row["timestamp"] = pd.Timestamp(st["timestamp"]).isoformat()
+        out[key] = row
+    return out
+
+
+class StateServer:
+    """Serve the latest state snapshot as one JSON document per TCP connection."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self._payload = b"{}"
+        server = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                self.request.sendall(server._payload)
+
+        self._server = socketserver.ThreadingTCPServer((host, port), Handler, bind_and_activate=False)
+        self._server.allow_reuse_address = True
+        self._server.daemon_threads = True
+        self._server.server_bind()
+        self._server.server_activate()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._server.server_address[:2]
+
+    def publish(self, snapshot: dict) -> None:
+        self._payload = json.dumps(snapshot).encode()
+
+    def start(self) -> "StateServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def read_state(address: Tuple[str, int] = ("127.0.0.1", 8766), timeout: float = 2.0) -> dict:
+    """Fetch the latest snapshot published by a running `AnalyticsDaemon`."""
+    chunks = []
+    with socket.create_connection(address, timeout=timeout) as conn:
+        while True:
+            data = conn.recv(1 << 16)
+            if not data:
+                break
+            chunks.append(data)
+    return json.loads(b"".join(chunks) or b"{}")
+
+
+class AnalyticsDaemon:
+    """Long-running bars + pair signals service, sharded across processes.
+
+    `processes=0` runs the single shard in-process (useful for tests and
+    one-core machines); otherwise pairs are dealt round-robin to that many
+    worker processes (default: one per CPU, at most one per pair). Feed it
+    with `process_ticks()` or `run()`; the latest state per pair is in
+    `snapshot()` and, if `address` is given, served by a `StateServer`.
+    With `shm_name`, closed bars and every bar's pair signals are also
+    published to a shared-memory segment (`src.shm.SharedBarsReader`)
+    whose rings keep `shm_capacity` rows (default: `history`, the spread
+    history each pair keeps for the ADF test).
+
+    Bars are finalized by event-time watermark (see `BarAggregator`):
+    `lateness` delays each bar to absorb out-of-order ticks, and late ticks
+    within `amend_bars` correct published bars, marking the latest state of
+    the affected pairs ``amended`` until their next bar.
+    """
+
+    def __init__(
+        self,
+        pairs: Sequence[Pair],
+        interval: Interval = "1s",
+        window: int = 60,
+        forgetting: float = 0.999,
+        adf_every: int = 300,
+        history: int = 3600,
+        rules: Optional[List[Rule]] = None,
+        processes: Optional[int] = None,
+        address: Optional[Tuple[str, int]] = None,
+        dispatcher: Optional[AlertDispatcher] = None,
+        stale_bars: int = 5,
+        shm_name: Optional[str] = None,
+        lateness: Optional[Interval] = None,
+        amend_bars: int = 0,
+        shm_capacity: Optional[int] = None,
+    ):
+        self.pairs = [tuple(p) for p in pairs]
+        self.interval = interval
+        self.aggregator = BarAggregator(interval, history=0, lateness=lateness, amend_bars=amend_bars)
+        self.slicer = BarSlicer(interval, stale_bars=stale_bars, symbols={s for p in self.pairs for s in p})
+        self.dispatcher = dispatcher
+        self.server = StateServer(*address) if address is not None else None
+        self.shared: Optional[SharedBarsWriter] = None
+        if shm_name is not None:
+            self.shared = SharedBarsWriter(shm_name, sorted({s for p in self.pairs for s in p}),
+                                           [pair_key(p) for p in self.pairs],
+                                           capacity=history if shm_capacity is None else shm_capacity)
+        self.state: Dict[str, dict] = {}
+        self.stats: Dict[str, int] = {"ticks": 0, "slices": 0, "alerts": 0}
+        kwargs = dict(rules=rules, window=window, forgetting=forgetting, adf_every=adf_every, history=history)
+        n = min(mp.cpu_count() if processes is None else processes, len(self.pairs))
+        self._local: Optional[PairShard] = None
+        self._workers: List[Tuple[mp.Process, "mp.Queue", List[str]]] = []
+        self._outbox: Optional["mp.Queue"] = None
+        if n <= 0:
+            self._local = PairShard(self.pairs, **kwargs)
+            return
+        self._outbox = mp.Queue()
+        for i in range(n):
+            shard = self.pairs[i::n]
+            inbox: "mp.Queue" = mp.Queue()
+            proc = mp.Process(target=_worker, daemon=True,
+                              args=(shard, kwargs, inbox, self._outbox, metrics.enabled(), self.shared is not None))
+            symbols = sorted({s for p in shard for s in p})
+            self._workers.append((proc, inbox, symbols))
+
+    def start(self) -> "AnalyticsDaemon":
+        for proc, _, _ in self._workers:
+            proc.start()
+        if self.server is not None:
+            self.server.start()
+        metrics.REGISTRY.register_collector(f"daemon-{id(self)}", self._collect_metrics)
+        return self
+
+    def _collect_metrics(self) -> Dict[str, float]:
+        out = {
+            "ticks_total": self.stats["ticks"],
+            "slices_total": self.stats["slices"],
+            "alerts_total": self.stats["alerts"],
+            "ticks_late_total": self.aggregator.stats["late"],
+            "ticks_dropped_total": self.aggregator.stats["dropped"],
+            "bars_amended_total": self.aggregator.stats["amended"],
+            "slicer_pending_slices": len(self.slicer._pending),
+        }
+        try:
+            out["worker_queue_depth"] = sum(inbox.qsize() for _, inbox, _ in self._workers)
+        except NotImplementedError:  # macOS has no sem_getvalue
+            pass
+        return out
+
+    def _merge(self, changed: Dict[str, dict], alerts: List[dict], latencies: Optional[dict] = None,
+               rows: Optional[Dict[str, List[dict]]] = None) -> None:
+        if latencies:
+            metrics.REGISTRY.merge_state(latencies)
+        self.state.update(changed)
+        if self.shared is not None and rows:
+            self.shared.write_signals(rows)
+        if alerts:
+            self.stats["alerts"] += len(alerts)
+            if self.dispatcher is not None:
+                self.dispatcher.publish(alerts)
+
+    def _collect(self, block: bool = False, timeout: float = 0.0) -> int:
+        """Merge worker results; returns the number of finished workers seen."""
+        done = 0
+        while self._outbox is not None:
+            try:
+                item = self._outbox.get(block=block, timeout=timeout if block else None)
+            except queue.Empty:
+                break
+            if item is None:
+                done += 1
+                if block and done == len(self._workers):
+                    break
+                continue
+            self._merge(*item)
+        return done
+
+    def _dispatch(self, slices: List[Slice]) -> None:
+        if not slices:
+            return
+        self.stats["slices"] += len(slices)
+        if self._local is not None:
+            rows = {pair_key(p): [] for p in self.pairs} if self.shared is not None else None
+            self._merge(*self._local.process(slices, record=rows), None, rows)
+        else:
+            for _, inbox, symbols in self._workers:
+                part = [(t, {s: closes[s] for s in symbols if s in closes}) for t, closes in slices]
+                inbox.put(part)
+            self._collect()
+        self.publish()
+
+    def snapshot(self) -> dict:
+        return {"interval": self.interval, "updated": time.time(), "stats": {**self.stats, **self.aggregator.stats},
+                "pairs": _jsonable(self.state)}
+
+    def publish(self) -> None:
+        if self.server is not None:
+            self.server.publish(self.snapshot())
+
+    def process_ticks(self, ticks: Union[pd.DataFrame, List[dict]]) -> None:
+        """Feed one tick batch (DataFrame or `WebsocketClient` list of dicts)."""
+        if not isinstance(ticks, pd.DataFrame):
+            ticks = pd.DataFrame(ticks, columns=["timestamp", "symbol", "price", "quantity"])
+        if ticks.empty:
+            return
+        self.stats["ticks"] += len(ticks)
+        self._bars(self.aggregator.update_records(ticks))
+        fixed = self.aggregator.take_amendments()
+        if fixed:
+            self._amend(fixed)
+
+    def _amend(self, records: List[tuple]) -> None:
+        """Republish corrected bars and flag the pair states computed from the old ones."""
+        if self.shared is not None:
+            self.shared.rewrite_bars(records)
+        symbols = {r[0] for r in records}
+        for pair in self.pairs:
+            state = self.state.get(pair_key(pair))
+            if state is not None and (pair[0] in symbols or pair[1] in symbols):
+                state["amended"] = True
+
+    def _bars(self, records: List[tuple]) -> None:
+        if self.shared is not None and records:
+            self.shared.write_bars(records)
+        self._dispatch(self.slicer.add(records))
+
+    def run(self, batches: Iterable) -> None:
+        """Consume tick batches until the iterable ends (see `src.replay.replay_ticks`, `ws_batches`)."""
+        for batch in batches:
+            if batch is not None:
+                self.process_ticks(batch)
+            else:
+                self._collect()
+                self.publish()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Close open bars, drain the workers and stop serving."""
+        self._bars(self.aggregator.flush_records())
+        self._dispatch(self.slicer.flush())
+        for _, inbox, _ in self._workers:
+            inbox.put(None)
+        if self._workers:
+            self._collect(block=True, timeout=timeout)
+            for proc, _, _ in self._workers:
+                proc.join(timeout=timeout)
+        self.publish()
+        if self.server is not None:
+            self.server.stop()
+        if self.shared is not None:
+            self.shared.close()
+        metrics.REGISTRY.unregister_collector(f"daemon-{id(self)}")
+
+
+def ws_batches(client, poll: float = 0.5) -> Iterator[Optional[List[dict]]]:
+    """Batches from a started `WebsocketClient` queue; yields None when idle."""
+    while True:
+        yield client.get_batch(timeout=poll)
@@ -0,0 +1,250 @@
+"""Streaming export of pair analytics to CSV, gzip CSV, Parquet and Arrow IPC.
+
+The columns to export are passed as a mapping of name -> Series and are
+only ever sliced `chunk_rows` rows at a time, so an export never holds more
+than one chunk of formatted output next to the analytics themselves:
+
+- ``csv`` / ``csv.gz``: text chunks; gzip output is compressed as it goes
+- ``parquet``: one row group per chunk
+- ``arrow``: an Arrow IPC stream, one record batch per chunk
+
+`export_bytes` builds a whole file in memory for download buttons and is
+meant to be called lazily (e.g. as Streamlit's deferred ``data`` callable).
+`write_export` writes to disk and with ``append=True`` only adds rows
+stamped after the last one already exported, so a continuous run can keep
+extending the same export:
+
+- CSV files are appended to (gzip gains another member, which readers
+  treat as one stream)
+- Arrow streams have their end-of-stream marker replaced by the new batches
+- Parquet files cannot be extended in place, so Parquet exports on disk are
+  a directory of ``part-NNNNN.parquet`` files; appends add a part and
+  ``pd.read_parquet(path)`` reads them all
+
+The index is written as the first column (named after the index, or
+``timestamp``).
+"""
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, Literal, Optional, Union
+import gzip
+import io
+import itertools
+import zlib
+import pandas as pd
+
+Format = Literal["csv", "csv.gz", "parquet", "arrow"]
+FORMATS = ("csv", "csv.gz", "parquet", "arrow")
+MIME = {"csv": "text/csv", "csv.gz": "application/gzip", "parquet": "application/vnd.apache.parquet",
+        "arrow": "application/vnd.apache.arrow.stream"}
+CHUNK_ROWS = 100_000
+
+_EOS = b"\xff\xff\xff\xff\x00\x00\x00\x00"  # Arrow IPC end-of-stream marker
+_SUFFIXES = {".csv": "csv", ".gz": "csv.gz", ".parquet": "parquet", ".arrow": "arrow", ".arrows": "arrow"}
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:  # pragma: no cover - depends on environment
+        raise ImportError("Parquet and Arrow exports require pyarrow (pip install pyarrow)") from exc
+    return pa, pq
+
+
+def infer_format(path: Union[str, Path]) -> str:
+    """Export format from a file name: .csv, .csv.gz, .parquet, .arrow / .arrows."""
+    fmt = _SUFFIXES.get(Path(path).suffix.lower())
+    if fmt is None:
+        raise ValueError(f"Cannot infer export format from {str(path)!r}; pass fmt= one of {FORMATS}")
+    return fmt
+
+
+def iter_frames(columns: Dict[str, pd.Series], chunk_rows: int = CHUNK_ROWS,
+                after: Optional[pd.Timestamp] = None) -> Iterator[pd.DataFrame]:
+    """Yield the columns side by side, `chunk_rows` rows at a time, with the index as the first column.
+
+    Series sharing one index are sliced by position without building the
+    full frame; otherwise they are outer-aligned first, like ``pd.concat``.
+    Only rows indexed strictly after `after` are yielded.
+    """
+    series = list(columns.values())
+    if not series:
+        return
+    index = series[0].index
+    if not all(s.index.equals(index) for s in series[1:]):
+        for s in series[1:]:
+            index = index.union(s.index)
+        series = [s.reindex(index) for s in series]
+    start = 0 if after is None else int(index.searchsorted(after, side="right"))
+    label = index.name or "timestamp"
+    for i in range(start, len(index), chunk_rows):
+        j = min(i + chunk_rows, len(index))
+        data = {label: index[i:j]}
+        data.update((name, s.to_numpy()[i:j]) for name, s in zip(columns, series))
+        yield pd.DataFrame(data)
+
+
+def _write_csv(frames: Iterator[pd.DataFrame], f: BinaryIO, compress: bool, header: bool = True) -> int:
+    gz = zlib.compressobj(wbits=31) if compress else None  # wbits=31: gzip container
+    rows = 0
+    for frame in frames:
+        data = frame.to_csv(index=False, header=header).encode()
+        f.write(gz.compress(data) if gz else data)
+        header, rows = False, rows + len(frame)
+    if gz:
+        f.write(gz.flush())
+    return rows
+
+
+def _write_parquet(frames: Iterator[pd.DataFrame], f: BinaryIO) -> int:
+    pa, pq = _pyarrow()
+    writer, rows = None, 0
+    for frame in frames:
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(f, table.schema)
+        writer.write_table(table)
+        rows += len(frame)
+    if writer is not None:
+        writer.close()
+    return rows
+
+
+def _write_arrow(frames: Iterator[pd.DataFrame], f: BinaryIO, schema=None) -> int:
+    """Write an IPC stream; with `schema` (appending) only record batches and the end marker."""
+    pa, _ = _pyarrow()
+    writer, rows = None, 0
+    for frame in frames:
+        batch = pa.RecordBatch.from_pandas(frame, preserve_index=False)
+        if schema is not None:
+            f.write(batch.serialize())
+        else:
+            if writer is None:
+                writer = pa.ipc.new_stream(f, batch.schema)
+            writer.write_batch(batch)
+        rows += len(frame)
+    if writer is not None:
+        writer.close()
+    elif schema is not None:
+        f.write(_EOS)
+    return rows
+
+
+def _write(frames: Iterator[pd.DataFrame], f: BinaryIO, fmt: str) -> int:
+    if fmt in ("csv", "csv.gz"):
+        return _write_csv(frames, f, compress=fmt == "csv.gz")
+    if fmt == "parquet":
+        return _write_parquet(frames, f)
+    if fmt == "arrow":
+        return _write_arrow(frames, f)
+    raise ValueError(f"Unknown export format {fmt!r}; expected one of {FORMATS}")
+
+
+def export_bytes(columns: Dict[str, pd.Series], fmt: Format = "csv", chunk_rows: int = CHUNK_ROWS) -> bytes:
+    """The whole export as one file's bytes (e.g. for a download button)."""
+    buf = io.BytesIO()
+    _write(iter_frames(columns, chunk_rows), buf, fmt)
+    return buf.getvalue()
+
+
+def _parts(path: Path):
+    return sorted(path.glob("part-*.parquet"))
+
+
+def last_exported(path: Union[str, Path], fmt: Optional[Format] = None) -> Optional[pd.Timestamp]:
+    """Index value of the last row in an existing export, or None if there is none.
+
+    Plain CSV reads only the file tail and Parquet only the index column of
+    the last row group; gzip CSV and Arrow streams are scanned chunk by chunk.
+    """
+    path = Path(path)
+    fmt = fmt or infer_format(path)
+    if not path.exists():
+        return None
+    if fmt == "parquet":
+        _, pq = _pyarrow()
+        parts = _parts(path)
+        if not parts:
+            return None
+        pf = pq.ParquetFile(parts[-1])
+        first = pf.schema_arrow.names[0]
+        col = pf.read_row_group(pf.num_row_groups - 1, columns=[first]).column(0)
+        return pd.Timestamp(col[-1].as_py()) if len(col) else None
+    if fmt == "arrow":
+        pa, _ = _pyarrow()
+        last = None
+        with pa.ipc.open_stream(pa.memory_map(str(path))) as reader:
+            for batch in reader:
+                if batch.num_rows:
+                    last = batch.column(0)[-1].as_py()
+        return None if last is None else pd.Timestamp(last)
+    if fmt == "csv.gz":
+        line = b""
+        with gzip.open(path, "rb") as f:
+            for line in f:
+                pass
+    else:
+        with open(path, "rb") as f:
+            f.seek(max(f.seek(0, 2) - 64 * 1024, 0))
+            lines = f.read().splitlines()
+            line = lines[-1] if lines else b""
+    first = line.split(b",", 1)[0].decode()
+    try:
+        return pd.Timestamp(first) if first else None
+    except ValueError:  # header only
+        return None
+
+
+def write_export(columns: Dict[str, pd.Series], path: Union[str, Path], fmt: Optional[Format] = None,
+                 append: bool = False, chunk_rows: int = CHUNK_ROWS) -> int:
+    """Stream the columns to `path` and return the number of rows written.
+
+    With ``append=True`` and an existing export, only rows indexed after its
+    last row are added; otherwise the export is replaced.
+    """
+    path = Path(path)
+    fmt = fmt or infer_format(path)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; expected one of {FORMATS}")
+    if fmt == "parquet" and path.is_file():
+        raise ValueError(f"{path} is a file, but Parquet exports on disk are a directory of part files; "
+                         "remove it or export to another path")
+    last = last_exported(path, fmt) if append else None
+    exists = append and path.exists()
+    frames = iter_frames(columns, chunk_rows, after=last)
+    if fmt == "parquet":
+        path.mkdir(parents=True, exist_ok=True)
+        parts = _parts(path)
+        if not exists:
+            for part in parts:
+                part.unlink()
+            parts = []
+        n = int(parts[-1].stem.split("-")[1]) + 1 if parts else 0
+        target = path / f"part-{n:05d}.parquet"
+        with open(target, "wb") as f:
+            rows = _write_parquet(frames, f)
+        if not rows:
+            target.unlink()
+        return rows
+    if not exists:
+        with open(path, "wb") as f:
+            return _write(frames, f, fmt)
+    if fmt == "arrow":
+        pa, _ = _pyarrow()
+        with pa.ipc.open_stream(pa.memory_map(str(path))) as reader:
+            schema = reader.schema
+        frame = next(frames, None)
+        if frame is None:
+            return 0
+        # check before touching the file so a mismatch leaves the export intact
+        if not pa.Schema.from_pandas(frame, preserve_index=False).equals(schema):
+            raise ValueError(f"Appended columns {list(frame.columns)} do not match the export's {schema.names}")
+        with open(path, "r+b") as f:
+            f.seek(-len(_EOS), 2)
+            if f.read() != _EOS:
+                raise ValueError(f"{path} is not a complete Arrow IPC stream")
+            f.seek(-len(_EOS), 2)
+            f.truncate()
+            return _write_arrow(itertools.chain([frame], frames), f, schema=schema)
+    with open(path, "ab") as f:
+        return _write_csv(frames, f, compress=fmt == "csv.gz", header=f.tell() == 0)
@@ -0,0 +1,350 @@
+"""Array kernels behind the rolling analytics in `src.analytics`.
+
+Every kernel takes float arrays of shape (T,) or (T, P), one column per
+series or pair, and returns an array of the same shape, optionally written
+into a caller-supplied `out`. Two backends compute the same results:
+
+- ``numba``: single-pass loops compiled on first use with ``numba.njit``
+  and cached on disk (``cache=True``), so later processes load the machine
+  code instead of recompiling. Used when numba is installed.
+- ``numpy``: vectorised cumulative sums within blocks of `window` rows,
+  always available.
+
+Rolling windows follow the pandas conventions of the Series functions:
+a window covers the last `window` rows, NaNs are skipped (pairwise for
+two-series kernels) and a result needs `min_periods` observations. Moments
+are kept relative to a per-column reference value, re-centred on the
+window mean once every `window` rows (in the NumPy path: each block of
+`window` rows is taken relative to the previous block's mean), which keeps
+cancellation small on price levels; windows of identical values have
+exactly zero variance.
+
+Set ``RTQ_KERNELS=numpy`` (or call `set_backend`) to force the fallback.
+"""
+from importlib.util import find_spec
+from typing import Callable, Dict, Optional, Union
+import math
+import os
+import numpy as np
+
+BACKENDS = ("numba", "numpy")
+ArrayLike = Union[np.ndarray, float]
+
+_backend: Optional[str] = None
+_jitted: Dict[str, Callable] = {}
+
+
+def available(name: str) -> bool:
+    """Whether backend `name` can run here."""
+    return name == "numpy" or (name == "numba" and find_spec("numba") is not None)
+
+
+def get_backend() -> str:
+    """The active backend: ``RTQ_KERNELS`` if set, else numba when installed."""
+    global _backend
+    if _backend is None:
+        _backend = os.environ.get("RTQ_KERNELS") or ("numba" if available("numba") else "numpy")
+        if _backend not in BACKENDS:
+            raise ValueError(f"Unknown kernel backend {_backend!r}; expected one of {BACKENDS}")
+    return _backend
+
+
+def set_backend(name: str) -> None:
+    """Select the backend used when a kernel is called without `backend=`."""
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown kernel backend {name!r}; expected one of {BACKENDS}")
+    if not available(name):
+        raise ImportError("The numba kernel backend requires numba (pip install numba)")
+    _backend = name
+
+
+def _jit(fn: Callable) -> Callable:
+    compiled = _jitted.get(fn.__name__)
+    if compiled is None:
+        import numba
+
+        compiled = _jitted[fn.__name__] = numba.njit(cache=True, nogil=True)(fn)
+    return compiled
+
+
+def _as2d(a: np.ndarray) -> np.ndarray:
+    a = np.asarray(a, dtype=np.float64)
+    return a.reshape(-1, 1) if a.ndim == 1 else a
+
+
+def _out(out: Optional[np.ndarray], like: np.ndarray) -> np.ndarray:
+    if out is None:
+        return np.empty(like.shape, dtype=np.float64, order="F")
+    if out.shape != like.shape or out.dtype != np.float64:
+        raise ValueError(f"out must be a float64 array of shape {like.shape}")
+    return out
+
+
+# ---------------------------------------------------------------- loop kernels
+# Plain Python over arrays so numba can compile them unchanged.
+
+def _zscore_loop(x, window, minp, out):
+    n, m = x.shape
+    for j in range(m):
+        ref = 0.0
+        nobs, s, ss, run = 0, 0.0, 0.0, 0
+        prev = math.nan
+        for t in range(n):
+            v = x[t, j]
+            if v == v:
+                if nobs == 0:
+                    ref = v
+                d = v - ref
+                nobs += 1
+                s += d
+                ss += d * d
+                run = run + 1 if v == prev else 1
+            else:
+                run = 0
+            prev = v
+            if t >= window:
+                u = x[t - window, j]
+                if u == u:
+                    d = u - ref
+                    nobs -= 1
+                    s -= d
+                    ss -= d * d
+                    if nobs == 0:
+                        s, ss = 0.0, 0.0
+            if (t + 1) % window == 0 and nobs > 0:
+                # re-centre on the window mean and recompute exactly (amortised O(1))
+                ref += s / nobs
+                s, ss = 0.0, 0.0
+                for k in range(t + 1 - window, t + 1):
+                    u = x[k, j]
+                    if u == u:
+                        d = u - ref
+                        s += d
+                        ss += d * d
+            if nobs < minp or nobs == 0 or run >= nobs:
+                out[t, j] = math.nan  # a constant window has zero variance: 0 / 0
+                continue
+            mean = s / nobs
+            var = ss / nobs - mean * mean
+            out[t, j] = (v - ref - mean) / math.sqrt(var) if var > 0 else math.nan
+    return out
+
+
+def _pair_loop(y, x, window, minp, corr, out):
+    n, m = y.shape
+    for j in range(m):
+        ry, rx = 0.0, 0.0
+        nobs = 0
+        sy, sx, syy, sxx, sxy = 0.0, 0.0, 0.0, 0.0, 0.0
+        run_y, run_x = 0, 0
+        py, px = math.nan, math.nan
+        for t in range(n):
+            a, b = y[t, j], x[t, j]
+            if a == a and b == b:
+                if nobs == 0:
+                    ry, rx = a, b
+                dy, dx = a - ry, b - rx
+                nobs += 1
+                sy += dy
+                sx += dx
+                syy += dy * dy
+                sxx += dx * dx
+                sxy += dx * dy
+                run_y = run_y + 1 if a == py else 1
+                run_x = run_x + 1 if b == px else 1
+                py, px = a, b
+            else:
+                run_y, run_x = 0, 0
+                py, px = math.nan, math.nan
+            if t >= window:
+                a, b = y[t - window, j], x[t - window, j]
+                if a == a and b == b:
+                    dy, dx = a - ry, b - rx
+                    nobs -= 1
+                    sy -= dy
+                    sx -= dx
+                    syy -= dy * dy
+                    sxx -= dx * dx
+                    sxy -= dx * dy
+                    if nobs == 0:
+                        sy, sx, syy, sxx, sxy = 0.0, 0.0, 0.0, 0.0, 0.0
+            if (t + 1) % window == 0 and nobs > 0:
+                ry += sy / nobs
+                rx += sx / nobs
+                sy, sx, syy, sxx, sxy = 0.0, 0.0, 0.0, 0.0, 0.0
+                for k in range(t + 1 - window, t + 1):
+                    a, b = y[k, j], x[k, j]
+                    if a == a and b == b:
+                        dy, dx = a - ry, b - rx
+                        sy += dy
+                        sx += dx
+                        syy += dy * dy
+                        sxx += dx * dx
+                        sxy += dx * dy
+            if nobs < minp or nobs < 2 or run_x >= nobs or (corr and run_y >= nobs):
+                out[t, j] = math.nan
+                continue
+            vx = sxx - sx * sx / nobs
+            cov = sxy - sx * sy / nobs
+            if corr:
+                vy = syy - sy * sy / nobs
+                den = math.sqrt(vx * vy) if vx > 0 and vy > 0 else 0.0
+            else:
+                den = vx
+            out[t, j] = cov / den if den > 0 else math.nan
+    return out
+
+
+# ------------------------------------------------------------ numpy fallbacks
+
+def _window_sum(a: np.ndarray, window: int) -> np.ndarray:
+    c = np.cumsum(a, axis=0)
+    c[window:] = c[window:] - c[:-window]
+    return c
+
+
+def _local(x: np.ndarray, valid: np.ndarray, window: int):
+    """`x` relative to a per-block reference, as (blocks, window, m) for each row's block and the one before.
+
+    Rows are cut into blocks of `window`; the window ending on a row spans its
+    own block and the previous one, and both are taken relative to the mean
+    of the previous block (the first block uses its own mean) - the value
+    the loop kernels re-centre on. Deviations therefore stay on the scale of
+    the local spread, whatever the price level or series length. Invalid
+    rows are zero.
+    """
+    n, m = x.shape
+    nb = -(-n // window)
+    mask = np.zeros((nb * window, m), dtype=bool)
+    mask[:n] = valid
+    mask = mask.reshape(nb, window, m)
+    blocks = np.zeros((nb * window, m))
+    blocks[:n] = np.where(valid, x, 0.0)
+    blocks = blocks.reshape(nb, window, m)
+    counts = mask.sum(axis=1)
+    with np.errstate(all="ignore"):
+        means = np.where(counts > 0, blocks.sum(axis=1) / counts, np.nan)
+    # previous block's mean, falling back to the block's own, then zero
+    ref = np.concatenate([means[:1], np.where(counts[:-1] > 0, means[:-1], means[1:])])
+    ref = np.nan_to_num(ref)
+    cur = np.where(mask, blocks - ref[:, None], 0.0)
+    prev = np.zeros_like(cur)
+    prev[1:] = np.where(mask[:-1], blocks[:-1] - ref[1:, None], 0.0)
+    return cur, prev
+
+
+def _wsum(cur: np.ndarray, prev: np.ndarray, n: int) -> np.ndarray:
+    """Rolling window sums of a quantity laid out by `_local`, as (n, m)."""
+    out = np.cumsum(cur, axis=1)
+    out[:, :-1] += np.cumsum(prev[:, :0:-1], axis=1)[:, ::-1]  # rows after i of the previous block
+    return out.reshape(-1, out.shape[2])[:n]
+
+
+def _runs(x: np.ndarray) -> np.ndarray:
+    """Length of the run of identical non-NaN values ending at each row."""
+    idx = np.arange(len(x)).reshape(-1, 1)
+    same = np.zeros(x.shape, dtype=bool)
+    same[1:] = x[1:] == x[:-1]
+    start = np.maximum.accumulate(np.where(same, 0, idx), axis=0)
+    return np.where(np.isnan(x), 0, idx - start + 1)
+
+
+def _zscore_numpy(x, window, minp, out):
+    n = len(x)
+    valid = ~np.isnan(x)
+    nobs = _window_sum(valid.astype(np.float64), window)
+    cur, prev = _local(x, valid, window)
+    with np.errstate(all="ignore"):
+        mean = _wsum(cur, prev, n) / nobs
+        var = _wsum(cur * cur, prev * prev, n) / nobs - mean * mean
+        d = cur.reshape(-1, x.shape[1])[:n]
+        np.divide(np.where(valid, d, np.nan) - mean, np.sqrt(var), out=out)
+    out[~(var > 0) | (nobs < max(minp, 1)) | (_runs(x) >= nobs)] = np.nan
+    return out
+
+
+def _pair_numpy(y, x, window, minp, corr, out):
+    n = len(x)
+    valid = ~(np.isnan(y) | np.isnan(x))
+    nobs = _window_sum(valid.astype(np.float64), window)
+    (cy, py), (cx, px) = _local(y, valid, window), _local(x, valid, window)
+    with np.errstate(all="ignore"):
+        sx, sy = _wsum(cx, px, n), _wsum(cy, py, n)
+        vx = _wsum(cx * cx, px * px, n) - sx * sx / nobs
+        cov = _wsum(cx * cy, px * py, n) - sx * sy / nobs
+        bad = ~(vx > 0)
+        if corr:
+            vy = _wsum(cy * cy, py * py, n) - sy * sy / nobs
+            bad |= ~(vy > 0)
+            np.divide(cov, np.sqrt(vx * vy), out=out)
+        else:
+            np.divide(cov, vx, out=out)
+    bad |= (nobs < max(minp, 2)) | (_runs(np.where(valid, x, np.nan)) >= nobs)
+    if corr:
+        bad |= _runs(np.where(valid, y, np.nan)) >= nobs
+    out[bad] = np.nan
+    return out
+
+
+# ----------------------------------------------------------------- public API
+
+def _check(window: int, min_periods: Optional[int]) -> int:
+    if window < 1:
+        raise ValueError("window must be >= 1")
+    return window if min_periods is None else min_periods
+
+
+def rolling_zscore(x: np.ndarray, window: int, min_periods: int = 1, out: Optional[np.ndarray] = None,
+                   backend: Optional[str] = None) -> np.ndarray:
+    """(x - rolling mean) / rolling population std per column."""
+    minp = _check(window, min_periods)
+    x2 = _as2d(x)
+    res = _out(None if out is None else _as2d(out), x2)
+    if (backend or get_backend()) == "numba":
+        _jit(_zscore_loop)(np.asfortranarray(x2), window, minp, res)
+    else:
+        _zscore_numpy(x2, window, minp, res)
+    return res.reshape(np.shape(x)) if out is None else out
+
+
+def _pair(y, x, window, min_periods, corr, out, backend):
+    minp = _check(window, min_periods)
+    y2, x2 = np.broadcast_arrays(_as2d(y), _as2d(x))
+    res = _out(None if out is None else _as2d(out), y2)
+    if (backend or get_backend()) == "numba":
+        _jit(_pair_loop)(np.asfortranarray(y2), np.asfortranarray(x2), window, minp, corr, res)
+    else:
+        _pair_numpy(y2, x2, window, minp, corr, res)
+    return res.reshape(np.shape(y)) if out is None else out
+
+
+def rolling_beta(y: np.ndarray, x: np.ndarray, window: int, min_periods: Optional[int] = None,
+                 out: Optional[np.ndarray] = None, backend: Optional[str] = None) -> np.ndarray:
+    """Rolling OLS slope of y on x (with intercept): cov(x, y) / var(x) per column."""
+    return _pair(y, x, window, min_periods, False, out, backend)
+
+
+def rolling_corr(a: np.ndarray, b: np.ndarray, window: int, min_periods: Optional[int] = None,
+                 out: Optional[np.ndarray] = None, backend: Optional[str] = None) -> np.ndarray:
+    """Rolling Pearson correlation per column."""
+    return _pair(a, b, window, min_periods, True, out, backend)
+
+
+def spread(y: np.ndarray, x: np.ndarray, beta: ArrayLike, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """y - beta * x, with beta a scalar, one value per pair column or a (T, P) array.
+
+    Two ufunc passes into one buffer; NumPy already runs these at memory
+    speed, so both backends share this path.
+    """
+    out = np.multiply(x, beta, out=out)
+    return np.subtract(y, out, out=out)
+
+
+def warmup() -> None:
+    """Compile (or load from cache) the numba kernels so the first real call is fast."""
+    if get_backend() != "numba":
+        return
+    a = np.linspace(1.0, 2.0, 8).reshape(-1, 1)
+    rolling_zscore(a, 3)
+    rolling_beta(a, a[::-1].copy(), 3)
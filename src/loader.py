@@ -0,0 +1,137 @@
+"""Out-of-core tick ingestion for large CSV and Parquet files.
+
+`iter_ticks` streams a tick file in bounded chunks with explicit dtypes
+(categorical symbols, float prices/quantities, timestamps normalised to
+datetime64 once). Parquet reads only the tick columns and skips row groups
+whose min/max statistics rule out the requested symbols or time range.
+
+`load_bars` reduces each chunk to bars as soon as it is read, so only
+bars are retained and peak memory follows the chunk size rather than the
+file size.
+"""
+from pathlib import Path
+from typing import IO, Iterable, Iterator, List, Optional, Union
+import numpy as np
+import pandas as pd
+
+from src.storage import FloatDtype, Interval, _to_ns, resample_bars, ticks_to_ohlcv
+
+TickSource = Union[str, Path, IO]
+TimeLike = Union[str, pd.Timestamp, None]
+
+TICK_COLUMNS = ["timestamp", "symbol", "price", "quantity"]
+
+
+def _is_parquet(source: TickSource) -> bool:
+    name = str(source) if isinstance(source, (str, Path)) else getattr(source, "name", "")
+    return Path(name).suffix.lower() in (".parquet", ".pq")
+
+
+def _bound(t: TimeLike) -> Optional[int]:
+    return pd.Timestamp(t).value if t is not None else None
+
+
+def _filter(chunk: pd.DataFrame, symbols: Optional[set], t0: Optional[int], t1: Optional[int]) -> pd.DataFrame:
+    """Normalise timestamps and keep rows for `symbols` within [t0, t1)."""
+    ts = _to_ns(chunk["timestamp"])
+    keep = np.ones(len(chunk), dtype=bool)
+    if symbols is not None:
+        keep &= chunk["symbol"].isin(symbols).to_numpy()
+    if t0 is not None:
+        keep &= ts >= t0
+    if t1 is not None:
+        keep &= ts < t1
+    chunk = chunk.assign(timestamp=pd.DatetimeIndex(ts.view("datetime64[ns]")))
+    return chunk if keep.all() else chunk[keep]
+
+
+def _row_groups(pf, symbols: Optional[set], t0: Optional[int], t1: Optional[int]) -> List[int]:
+    """Row groups whose statistics may contain matching ticks."""
+    names = pf.schema_arrow.names
+    sym_col, ts_col = names.index("symbol"), names.index("timestamp")
+    keep = []
+    for i in range(pf.metadata.num_row_groups):
+        rg = pf.metadata.row_group(i)
+        stats = rg.column(sym_col).statistics
+        if symbols is not None and stats is not None and stats.has_min_max:
+            if not any(stats.min <= s <= stats.max for s in symbols):
+                continue
+        stats = rg.column(ts_col).statistics
+        if (t0 is not None or t1 is not None) and stats is not None and stats.has_min_max:
+            try:
+                lo, hi = _to_ns(pd.Series([stats.min, stats.max]))
+            except (ValueError, TypeError):
+                lo, hi = None, None
+            if lo is not None and ((t1 is not None and lo >= t1) or (t0 is not None and hi < t0)):
+                continue
+        keep.append(i)
+    return keep
+
+
+def _parquet_chunks(source: TickSource, chunksize: int, symbols: Optional[set], t0: Optional[int],
+                    t1: Optional[int], float_dtype: FloatDtype) -> Iterator[pd.DataFrame]:
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as exc:  # pragma: no cover - depends on environment
+        raise ImportError("Reading Parquet ticks requires pyarrow (pip install pyarrow)") from exc
+
+    pf = pq.ParquetFile(source)
+    groups = _row_groups(pf, symbols, t0, t1)
+    if not groups:
+        return
+    for batch in pf.iter_batches(batch_size=chunksize, row_groups=groups, columns=TICK_COLUMNS):
+        chunk = batch.to_pandas()
+        chunk["symbol"] = chunk["symbol"].astype("category")
+        yield chunk.astype({"price": float_dtype, "quantity": float_dtype}, copy=False)
+
+
+def iter_ticks(
+    source: TickSource,
+    chunksize: int = 1_000_000,
+    symbols: Optional[Iterable[str]] = None,
+    start: TimeLike = None,
+    end: TimeLike = None,
+    float_dtype: FloatDtype = "float64",
+) -> Iterator[pd.DataFrame]:
+    """Yield tick chunks of at most `chunksize` rows from a CSV or Parquet file.
+
+    `source` is a path or a file-like object (e.g. a Streamlit upload);
+    ``.parquet``/``.pq`` names are read as Parquet, anything else as CSV.
+    Only ticks of `symbols` (all if None) in [start, end) are returned, in
+    the `compact_ticks` schema with `float_dtype` prices and quantities.
+    """
+    wanted = set(symbols) if symbols is not None else None
+    t0, t1 = _bound(start), _bound(end)
+    if _is_parquet(source):
+        chunks = _parquet_chunks(source, chunksize, wanted, t0, t1, float_dtype)
+    else:
+        # the timestamp column is left to `_to_ns`, which detects its format once per chunk
+        dtypes = {"symbol": "category", "price": float_dtype, "quantity": float_dtype}
+        chunks = pd.read_csv(source, usecols=TICK_COLUMNS, dtype=dtypes, chunksize=chunksize)
+    for chunk in chunks:
+        chunk = _filter(chunk, wanted, t0, t1)
+        if len(chunk):
+            yield chunk
+
+
+def load_bars(
+    source: TickSource,
+    interval: Interval = "1s",
+    chunksize: int = 1_000_000,
+    symbols: Optional[Iterable[str]] = None,
+    start: TimeLike = None,
+    end: TimeLike = None,
+) -> pd.DataFrame:
+    """Aggregate a tick file into OHLCV bars without holding the ticks.
+
+    Each chunk is reduced to bars as soon as it is read; bars split across
+    chunk boundaries are merged at the end with `resample_bars`. Returns the
+    same (symbol, timestamp) layout as `ticks_to_ohlcv`. Ticks are expected
+    in time order across the file (as written by the store and the
+    generators), which decides the open/close of a bar split across chunks.
+    """
+    parts = [ticks_to_ohlcv(chunk, interval)
+             for chunk in iter_ticks(source, chunksize=chunksize, symbols=symbols, start=start, end=end)]
+    if not parts:
+        return pd.DataFrame()
+    return resample_bars(pd.concat(parts), interval)
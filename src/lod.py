@@ -0,0 +1,166 @@
+"""Level-of-detail downsampling for charting long time series.
+
+`LODPyramid` keeps a series (or a frame of columns sharing a time index)
+together with a pyramid of min/max summaries: level k splits the rows into
+buckets of ``factor**k`` and records, per column, the rows holding each
+bucket's minimum and maximum. ``view(start, end, width)`` picks the
+coarsest level that still gives about `width` buckets over the visible
+range and returns those extreme rows, so a chart always receives at most
+about two points per pixel column per series, whatever the history length,
+and spikes (e.g. z-score excursions) are never averaged away.
+
+Appending rows only recomputes the last bucket of each level, so a live
+chart can keep one pyramid and extend it bar by bar.
+"""
+from typing import List, Optional, Union
+import numpy as np
+import pandas as pd
+
+TimeLike = Union[str, pd.Timestamp, None]
+
+
+class _Rows:
+    """Growable array with amortised O(1) appends along the first axis."""
+
+    def __init__(self, width: int, dtype):
+        self.data = np.empty((64, width), dtype=dtype)
+        self.n = 0
+
+    def view(self) -> np.ndarray:
+        return self.data[:self.n]
+
+    def put(self, start: int, rows: np.ndarray) -> None:
+        """Write `rows` from row `start` on, dropping anything after them."""
+        end = start + len(rows)
+        if end > len(self.data):
+            grown = np.empty((max(end, 2 * len(self.data)), self.data.shape[1]), dtype=self.data.dtype)
+            grown[:self.n] = self.data[:self.n]
+            self.data = grown
+        self.data[start:end] = rows
+        self.n = end
+
+
+class LODPyramid:
+    """Min/max downsampling pyramid over rows of a time-indexed Series or DataFrame."""
+
+    def __init__(self, data: Union[pd.Series, pd.DataFrame], factor: int = 4, min_buckets: int = 64):
+        if factor < 2:
+            raise ValueError("factor must be >= 2")
+        self._series = isinstance(data, pd.Series)
+        frame = data.to_frame() if self._series else data
+        self.name = data.name if self._series else None
+        self.columns = list(frame.columns)
+        self.factor = factor
+        self.min_buckets = min_buckets
+        k = len(self.columns)
+        self._t = _Rows(1, np.int64)
+        self._v = _Rows(k, np.float64)
+        # per level: row index of each bucket's min / max, per column
+        self._lo: List[_Rows] = []
+        self._hi: List[_Rows] = []
+        self.append(frame)
+
+    def __len__(self) -> int:
+        return self._t.n
+
+    @property
+    def levels(self) -> int:
+        return len(self._lo)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(r.data.nbytes for r in [self._t, self._v, *self._lo, *self._hi])
+
+    def append(self, data: Union[pd.Series, pd.DataFrame]) -> None:
+        """Add rows later than the current last row and update every level's tail."""
+        frame = data.to_frame() if isinstance(data, pd.Series) else data
+        if frame.empty:
+            return
+        start = self._t.n
+        self._t.put(start, pd.DatetimeIndex(frame.index).asi8.reshape(-1, 1))
+        self._v.put(start, frame[self.columns].to_numpy(dtype=np.float64))
+        self._rebuild(start)
+
+    def _rebuild(self, start: int) -> None:
+        """Recompute level buckets that include rows from `start` (raw row index) on."""
+        values = self._v.view()
+        lo_prev = hi_prev = None
+        n_prev, first, level = len(values), start, 0
+        # levels are added once they would hold `min_buckets` buckets and kept from then on
+        while level < len(self._lo) or -(-n_prev // self.factor) >= self.min_buckets:
+            b0 = first // self.factor
+            if level == len(self._lo):  # new level: build it whole
+                b0 = 0
+                self._lo.append(_Rows(values.shape[1], np.int64))
+                self._hi.append(_Rows(values.shape[1], np.int64))
+            lo, hi = self._merge(values, lo_prev, hi_prev, b0 * self.factor, n_prev)
+            self._lo[level].put(b0, lo)
+            self._hi[level].put(b0, hi)
+            lo_prev, hi_prev = self._lo[level].view(), self._hi[level].view()
+            n_prev, first, level = len(lo_prev), b0, level + 1
+
+    def _merge(self, values: np.ndarray, lo_prev: Optional[np.ndarray], hi_prev: Optional[np.ndarray],
+               begin: int, end: int):
+        """Min/max rows of the buckets of `factor` entries in [begin, end) of the level below."""
+        f, k = self.factor, values.shape[1]
+        nb = -(-(end - begin) // f)
+        idx = np.minimum(np.arange(begin, begin + nb * f), end - 1)  # pad the last bucket with its last entry
+        if lo_prev is None:
+            lo_rows = hi_rows = np.broadcast_to(idx[:, None], (len(idx), k))
+        else:
+            lo_rows, hi_rows = lo_prev[idx], hi_prev[idx]
+        cols = np.arange(k)
+        lo_vals = np.nan_to_num(values[lo_rows, cols], nan=np.inf).reshape(nb, f, k)
+        hi_vals = np.nan_to_num(values[hi_rows, cols], nan=-np.inf).reshape(nb, f, k)
+        lo = np.take_along_axis(lo_rows.reshape(nb, f, k), lo_vals.argmin(axis=1)[:, None, :], axis=1)[:, 0]
+        hi = np.take_along_axis(hi_rows.reshape(nb, f, k), hi_vals.argmax(axis=1)[:, None, :], axis=1)[:, 0]
+        return lo, hi
+
+    def _frame(self, rows: np.ndarray) -> Union[pd.Series, pd.DataFrame]:
+        index = pd.DatetimeIndex(self._t.view()[rows, 0].view("datetime64[ns]"))
+        frame = pd.DataFrame(self._v.view()[rows], index=index, columns=self.columns)
+        return frame.iloc[:, 0].rename(self.name) if self._series else frame
+
+    def rows(self, start: TimeLike = None, end: TimeLike = None, width: int = 1000) -> np.ndarray:
+        """Sorted row positions to draw [start, end] at about `width` buckets."""
+        ts = self._t.view()[:, 0]
+        i0 = 0 if start is None else int(np.searchsorted(ts, pd.Timestamp(start).value, side="left"))
+        i1 = len(ts) if end is None else int(np.searchsorted(ts, pd.Timestamp(end).value, side="right"))
+        count = i1 - i0
+        if count <= 2 * width or not self._lo:
+            return np.arange(i0, i1)
+        # coarsest detail that still gives at most `width` buckets
+        level, size = 0, self.factor
+        while count / size > width and level + 1 < len(self._lo):
+            level, size = level + 1, size * self.factor
+        # whole buckets from the pyramid; the partial ones at either edge from the raw rows
+        b0, b1 = -(-i0 // size), max(i1 // size, -(-i0 // size))
+        picked = np.concatenate([self._lo[level].view()[b0:b1].ravel(), self._hi[level].view()[b0:b1].ravel(),
+                                 self._extremes(i0, min(b0 * size, i1)), self._extremes(max(b1 * size, i0), i1),
+                                 [i0, i1 - 1]])
+        return np.unique(picked)
+
+    def _extremes(self, begin: int, end: int) -> np.ndarray:
+        """Rows of each column's minimum and maximum among raw rows [begin, end)."""
+        if begin >= end:
+            return np.empty(0, dtype=np.int64)
+        values = self._v.view()[begin:end]
+        lo = np.nan_to_num(values, nan=np.inf).argmin(axis=0)
+        hi = np.nan_to_num(values, nan=-np.inf).argmax(axis=0)
+        return begin + np.concatenate([lo, hi])
+
+    def view(self, start: TimeLike = None, end: TimeLike = None,
+             width: int = 1000) -> Union[pd.Series, pd.DataFrame]:
+        """Rows to plot for the visible range [start, end] on a chart about `width` pixels wide.
+
+        Each column's minimum and maximum of every bucket is kept, plus the
+        first and last visible rows; short ranges are returned in full.
+        """
+        return self._frame(self.rows(start, end, width))
+
+    def span(self) -> Optional[tuple]:
+        """(first, last) timestamp held, or None when empty."""
+        ts = self._t.view()
+        if not len(ts):
+            return None
+        return pd.Timestamp(int(ts[0, 0])), pd.Timestamp(int(ts[-1, 0]))
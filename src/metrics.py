@@ -0,0 +1,297 @@
+"""Lightweight hot-path instrumentation.
+
+Stages (parse, aggregate, hedge, zscore, adf, alert, ...) record their
+latency into HDR-style histograms: log-linear buckets with 64 linear
+sub-buckets per power of two, so any percentile is exact to within ~1.6%
+from a few KB per stage with O(1) recording. Counters and gauges (queue
+depth, dropped messages) come from registered collector callables that
+are only read at export time.
+
+Instrumentation is off by default. While disabled, `timer()` returns a
+shared no-op context manager and `timed` adds a single flag check, so the
+hot paths pay next to nothing. `enable()` turns it on (the daemon does so
+when given a metrics port, the site dashboard always does).
+
+`prometheus_text()` renders everything in the Prometheus text format and
+`MetricsServer` serves it on ``/metrics``.
+"""
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import functools
+import re
+import threading
+import time
+import urllib.request
+
+_SUB_BITS = 6
+_SUB = 1 << _SUB_BITS  # linear sub-buckets per power of two
+_QUANTILES = (0.5, 0.9, 0.99)
+
+
+def _bucket(v: int) -> int:
+    if v < 2 * _SUB:
+        return max(v, 0)
+    e = v.bit_length() - _SUB_BITS - 1
+    return _SUB * e + (v >> e)
+
+
+def _bucket_value(i: int) -> int:
+    """Midpoint of bucket `i`."""
+    if i < 2 * _SUB:
+        return i
+    e = i // _SUB - 1
+    m = i - _SUB * e
+    return (m << e) + (1 << (e - 1))
+
+
+class LatencyHistogram:
+    """HDR-style histogram of non-negative integer values (nanoseconds)."""
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, value: int) -> None:
+        i = _bucket(value)
+        self.counts[i] = self.counts.get(i, 0) + 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for i, c in other.counts.items():
+            self.counts[i] = self.counts.get(i, 0) + c
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, q: float) -> float:
+        """Value at quantile `q` in [0, 1] (NaN when empty)."""
+        if not self.count:
+            return float("nan")
+        rank = max(1, int(q * self.count + 0.5))
+        seen = 0
+        for i in sorted(self.counts):
+            seen += self.counts[i]
+            if seen >= rank:
+                return float(min(_bucket_value(i), self.max))
+        return float(self.max)
+
+
+class Registry:
+    """Named latency histograms plus counter/gauge collectors."""
+
+    def __init__(self):
+        self.enabled = False
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self._collectors: Dict[str, Callable[[], Dict[str, float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, ns: int) -> None:
+        hist = self.histograms.get(stage)
+        if hist is None:
+            with self._lock:
+                hist = self.histograms.setdefault(stage, LatencyHistogram())
+        hist.record(ns)
+
+    def register_collector(self, name: str, fn: Callable[[], Dict[str, float]]) -> None:
+        """`fn()` returns {metric: value}; names ending in ``_total`` export as counters."""
+        self._collectors[name] = fn
+
+    def unregister_collector(self, name: str) -> None:
+        self._collectors.pop(name, None)
+
+    def collect(self) -> Dict[str, float]:
+        out: Dict[str, float] = {}
+        for fn in list(self._collectors.values()):
+            try:
+                out.update(fn())
+            except Exception:
+                continue
+        return out
+
+    def export_state(self, reset: bool = True) -> Dict[str, LatencyHistogram]:
+        """Histograms to ship to another process (and merge there)."""
+        with self._lock:
+            state = self.histograms
+            if reset:
+                self.histograms = {}
+        return state
+
+    def merge_state(self, state: Dict[str, LatencyHistogram]) -> None:
+        for stage, hist in state.items():
+            with self._lock:
+                mine = self.histograms.setdefault(stage, LatencyHistogram())
+            mine.merge(hist)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.histograms = {}
+
+
+REGISTRY = Registry()
+
+
+def enable(on: bool = True) -> None:
+    REGISTRY.enabled = on
+
+
+def disable() -> None:
+    REGISTRY.enabled = False
+
+
+def enabled() -> bool:
+    return REGISTRY.enabled
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL = _NullTimer()
+
+
+@contextmanager
+def _timer(stage: str) -> Iterator[None]:
+    t0 = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        REGISTRY.observe(stage, time.perf_counter_ns() - t0)
+
+
+def timer(stage: str):
+    """Context manager recording the block's latency under `stage`."""
+    return _timer(stage) if REGISTRY.enabled else _NULL
+
+
+def timed(stage: str):
+    """Decorator recording each call's latency under `stage`."""
+
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            if not REGISTRY.enabled:
+                return fn(*args, **kwargs)
+            t0 = time.perf_counter_ns()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                REGISTRY.observe(stage, time.perf_counter_ns() - t0)
+
+        return inner
+
+    return wrap
+
+
+def observe(stage: str, ns: int) -> None:
+    """Record an externally measured latency (nanoseconds) when enabled."""
+    if REGISTRY.enabled:
+        REGISTRY.observe(stage, ns)
+
+
+def stage_summary(registry: Registry = REGISTRY) -> List[dict]:
+    """One row per stage: count, p50/p90/p99/max in milliseconds."""
+    rows = []
+    for stage, hist in sorted(registry.histograms.items()):
+        row = {"stage": stage, "count": hist.count}
+        for q in _QUANTILES:
+            row[f"p{int(q * 100)}_ms"] = hist.percentile(q) / 1e6
+        row["max_ms"] = hist.max / 1e6
+        rows.append(row)
+    return rows
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def prometheus_text(registry: Registry = REGISTRY, prefix: str = "rtq") -> str:
+    """Render all metrics in the Prometheus text exposition format."""
+    lines = [
+        f"# HELP {prefix}_stage_latency_seconds Latency of each pipeline stage.",
+        f"# TYPE {prefix}_stage_latency_seconds summary",
+    ]
+    for stage, hist in sorted(registry.histograms.items()):
+        label = _label(stage)
+        for q in _QUANTILES:
+            lines.append(f'{prefix}_stage_latency_seconds{{stage="{label}",quantile="{q}"}} {hist.percentile(q) / 1e9:.9g}')
+        lines.append(f'{prefix}_stage_latency_seconds_sum{{stage="{label}"}} {hist.total / 1e9:.9g}')
+        lines.append(f'{prefix}_stage_latency_seconds_count{{stage="{label}"}} {hist.count}')
+    for name, value in sorted(registry.collect().items()):
+        kind = "counter" if name.endswith("_total") else "gauge"
+        lines.append(f"# TYPE {prefix}_{name} {kind}")
+        lines.append(f"{prefix}_{name} {float(value):.9g}")
+    return "\n".join(lines) + "\n"
+
+
+_SAMPLE = re.compile(r'^(\w+)_stage_latency_seconds(_count)?\{stage="([^"]*)"(?:,quantile="([^"]*)")?\} (\S+)$')
+
+
+def read_prometheus(url: str, timeout: float = 2.0) -> List[dict]:
+    """Fetch a `/metrics` endpoint and return `stage_summary`-style rows."""
+    with urllib.request.urlopen(url, timeout=timeout) as resp:
+        text = resp.read().decode()
+    rows: Dict[str, dict] = {}
+    for line in text.splitlines():
+        m = _SAMPLE.match(line)
+        if not m:
+            continue
+        _, is_count, stage, q, value = m.groups()
+        row = rows.setdefault(stage, {"stage": stage})
+        if is_count:
+            row["count"] = int(float(value))
+        elif q is not None:
+            row[f"p{int(float(q) * 100)}_ms"] = float(value) * 1e3
+    return list(rows.values())
+
+
+class MetricsServer:
+    """Serve `prometheus_text()` on ``http://host:port/metrics`` from a daemon thread."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 9108, registry: Registry = REGISTRY):
+        reg = registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = prometheus_text(reg).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._server.server_address[:2]
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.address[0]}:{self.address[1]}/metrics"
+
+    def start(self) -> "MetricsServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,248 @@
+"""Streaming counterparts of the rolling analytics in `src.analytics`.
+
+Each object keeps a fixed-size ring buffer of the current window plus
+running Welford moments, so feeding one new bar costs O(1) regardless of
+history length. Results match `rolling_zscore` / `rolling_corr` on the same
+values. To stop floating point drift from accumulating over long sessions,
+the moments are recomputed exactly from the buffer once per window
+(amortised O(1)).
+
+`RecursiveHedgeRatio` is the streaming counterpart of `ols_hedge_ratio` /
+`ewm_hedge_ratio` and yields a time-varying beta for dynamic hedging.
+"""
+import math
+from typing import Iterable
+import numpy as np
+import pandas as pd
+
+
+def _ratio(num: float, den: float) -> float:
+    """num / den with NumPy semantics for a zero denominator."""
+    if den > 0:
+        return num / den
+    if num == 0 or math.isnan(num):
+        return float("nan")
+    return math.copysign(float("inf"), num)
+
+
+class RollingZScore:
+    """Online rolling z-score, equivalent to `rolling_zscore(s, window)`.
+
+    Uses population std (ddof=0) and min_periods=1 like the batch function.
+    """
+
+    def __init__(self, window: int = 60):
+        if window < 1:
+            raise ValueError("window must be >= 1")
+        self.window = window
+        self._buf = np.full(window, np.nan)
+        self._pos = 0
+        self._seen = 0
+        self._n = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        # trailing run of identical values; a window made of one value has exactly zero variance
+        self._run = 0
+        self._last = float("nan")
+
+    def _add(self, x: float) -> None:
+        self._n += 1
+        d = x - self._mean
+        self._mean += d / self._n
+        self._m2 += d * (x - self._mean)
+
+    def _remove(self, x: float) -> None:
+        self._n -= 1
+        if self._n == 0:
+            self._mean = 0.0
+            self._m2 = 0.0
+            return
+        d = x - self._mean
+        self._mean -= d / self._n
+        self._m2 -= d * (x - self._mean)
+
+    def _resync(self) -> None:
+        vals = self._buf[~np.isnan(self._buf)]
+        self._n = int(vals.size)
+        self._mean = float(vals.mean()) if vals.size else 0.0
+        self._m2 = float(((vals - self._mean) ** 2).sum()) if vals.size else 0.0
+
+    @property
+    def mean(self) -> float:
+        if self._n == 0:
+            return float("nan")
+        return self._last if self._run >= self._n else self._mean
+
+    @property
+    def std(self) -> float:
+        if self._n == 0:
+            return float("nan")
+        if self._run >= self._n:
+            return 0.0
+        return math.sqrt(max(self._m2, 0.0) / self._n)
+
+    def update(self, x: float) -> float:
+        """Push one observation and return its z-score against the window."""
+        x = float(x)
+        old = self._buf[self._pos] if self._seen >= self.window else np.nan
+        self._buf[self._pos] = x
+        self._pos = (self._pos + 1) % self.window
+        self._seen += 1
+        if not math.isnan(old):
+            self._remove(float(old))
+        if math.isnan(x):
+            self._run = 0
+        else:
+            self._add(x)
+            self._run = self._run + 1 if x == self._last else 1
+        self._last = x
+        if self._seen % self.window == 0:
+            self._resync()
+        if math.isnan(x) or self._n == 0:
+            return float("nan")
+        return _ratio(x - self.mean, self.std)
+
+    def update_many(self, values: Iterable[float]) -> np.ndarray:
+        """Push a sequence of observations (e.g. to warm up from history)."""
+        return np.array([self.update(v) for v in values], dtype=float)
+
+
+class RollingCorr:
+    """Online rolling Pearson correlation, equivalent to `rolling_corr(a, b, window)`.
+
+    Like the batch function, the result is NaN until the window holds
+    `window` valid (a, b) pairs.
+    """
+
+    def __init__(self, window: int = 60):
+        if window < 1:
+            raise ValueError("window must be >= 1")
+        self.window = window
+        self._buf = np.full((window, 2), np.nan)
+        self._pos = 0
+        self._seen = 0
+        self._n = 0
+        self._ma = 0.0
+        self._mb = 0.0
+        self._caa = 0.0
+        self._cbb = 0.0
+        self._cab = 0.0
+
+    def _add(self, a: float, b: float) -> None:
+        self._n += 1
+        da = a - self._ma
+        db = b - self._mb
+        self._ma += da / self._n
+        self._mb += db / self._n
+        self._caa += da * (a - self._ma)
+        self._cbb += db * (b - self._mb)
+        self._cab += da * (b - self._mb)
+
+    def _remove(self, a: float, b: float) -> None:
+        self._n -= 1
+        if self._n == 0:
+            self._ma = self._mb = self._caa = self._cbb = self._cab = 0.0
+            return
+        da = a - self._ma
+        db = b - self._mb
+        self._ma -= da / self._n
+        self._mb -= db / self._n
+        self._caa -= da * (a - self._ma)
+        self._cbb -= db * (b - self._mb)
+        self._cab -= da * (b - self._mb)
+
+    def _resync(self) -> None:
+        vals = self._buf[~np.isnan(self._buf).any(axis=1)]
+        self._n = int(len(vals))
+        if not self._n:
+            self._ma = self._mb = self._caa = self._cbb = self._cab = 0.0
+            return
+        self._ma, self._mb = (float(v) for v in vals.mean(axis=0))
+        da = vals[:, 0] - self._ma
+        db = vals[:, 1] - self._mb
+        self._caa = float(da @ da)
+        self._cbb = float(db @ db)
+        self._cab = float(da @ db)
+
+    @property
+    def corr(self) -> float:
+        if self._n < self.window:
+            return float("nan")
+        den = math.sqrt(max(self._caa, 0.0) * max(self._cbb, 0.0))
+        return self._cab / den if den > 0 else float("nan")
+
+    def update(self, a: float, b: float) -> float:
+        """Push one (a, b) observation and return the current correlation."""
+        a, b = float(a), float(b)
+        old_a, old_b = self._buf[self._pos] if self._seen >= self.window else (np.nan, np.nan)
+        self._buf[self._pos] = (a, b)
+        self._pos = (self._pos + 1) % self.window
+        self._seen += 1
+        if not (math.isnan(old_a) or math.isnan(old_b)):
+            self._remove(float(old_a), float(old_b))
+        if not (math.isnan(a) or math.isnan(b)):
+            self._add(a, b)
+        if self._seen % self.window == 0:
+            self._resync()
+        return self.corr
+
+    def update_many(self, a: Iterable[float], b: Iterable[float]) -> np.ndarray:
+        """Push paired sequences of observations."""
+        return np.array([self.update(x, y) for x, y in zip(a, b)], dtype=float)
+
+
+class RecursiveHedgeRatio:
+    """Recursive least squares hedge ratio of y on x (with intercept).
+
+    Keeps exponentially weighted means and co-moments, so each bar updates
+    beta in O(1). With ``forgetting=1.0`` beta equals `ols_hedge_ratio` on
+    all data seen so far; with ``forgetting < 1`` older bars decay
+    geometrically and beta equals `ewm_hedge_ratio` for
+    ``halflife = log(0.5) / log(forgetting)``.
+    """
+
+    def __init__(self, forgetting: float = 1.0):
+        if not 0.0 < forgetting <= 1.0:
+            raise ValueError("forgetting must be in (0, 1]")
+        self.forgetting = forgetting
+        self._w = 0.0
+        self._mx = 0.0
+        self._my = 0.0
+        self._cxx = 0.0
+        self._cxy = 0.0
+
+    @property
+    def beta(self) -> float:
+        return self._cxy / self._cxx if self._cxx > 0 else float("nan")
+
+    @property
+    def alpha(self) -> float:
+        return self._my - self.beta * self._mx
+
+    def update(self, y: float, x: float) -> float:
+        """Push one (y, x) observation and return the updated beta."""
+        y, x = float(y), float(x)
+        if math.isnan(y) or math.isnan(x):
+            return self.beta
+        lam = self.forgetting
+        self._w = lam * self._w + 1.0
+        dx = x - self._mx
+        dy = y - self._my
+        self._mx += dx / self._w
+        self._my += dy / self._w
+        self._cxx = lam * self._cxx + dx * (x - self._mx)
+        self._cxy = lam * self._cxy + dx * (y - self._my)
+        return self.beta
+
+    def update_many(self, y: Iterable[float], x: Iterable[float]) -> np.ndarray:
+        """Push paired sequences of observations."""
+        return np.array([self.update(a, b) for a, b in zip(y, x)], dtype=float)
+
+
+def recursive_hedge_ratio(y: pd.Series, x: pd.Series, forgetting: float = 1.0) -> pd.Series:
+    """Time-varying hedge ratio series from `RecursiveHedgeRatio`.
+
+    The result can be passed straight to `construct_spread`.
+    """
+    y, x = y.align(x, join="inner")
+    return pd.Series(RecursiveHedgeRatio(forgetting).update_many(y, x), index=y.index, name="hedge_ratio")
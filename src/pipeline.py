@@ -0,0 +1,192 @@
+"""Memoised analytics pipeline for the dashboards.
+
+Every stage result is cached under a key built from a content hash of the
+tick dataset plus the parameters that stage depends on:
+
+- the bar cascade by dataset (1s bars, coarser levels rolled up on demand)
+- bars / closes by (dataset, interval)
+- hedge ratio, spread and ADF by (dataset, interval, pair)
+- z-score and rolling correlation by (dataset, interval, pair, window)
+- the universe-wide pair scan by (dataset, interval, top_n)
+- chart downsampling pyramids (`src.lod`) by (dataset, chart key)
+
+so moving a slider only recomputes the stages downstream of it (the alert
+threshold recomputes nothing cached at all). All entries share one LRU
+cache bounded by entry count and approximate bytes.
+"""
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, Union
+import hashlib
+import weakref
+import pandas as pd
+
+from src.adf import adf_fast
+from src.analytics import construct_spread, ols_hedge_ratio, rolling_corr, rolling_zscore
+from src.lod import LODPyramid
+from src.metrics import timed
+from src.scanner import scan_pairs
+from src.storage import BarCascade, Interval, ticks_to_ohlcv
+
+
+def _finished_bars(cascade: BarCascade, interval: Interval) -> pd.DataFrame:
+    """Bars of a finished dataset: last partial bars are closed, as `ticks_to_ohlcv` keeps them."""
+    cascade.add_interval(interval)
+    cascade.flush()
+    return cascade.bars(interval)
+
+
+# stage-timed leaf computations (see `src.metrics`; no-ops unless enabled)
+_ohlcv = timed("aggregate")(ticks_to_ohlcv)
+_rollup = timed("rollup")(_finished_bars)
+_hedge = timed("hedge")(ols_hedge_ratio)
+_zscore = timed("zscore")(rolling_zscore)
+_corr = timed("corr")(rolling_corr)
+_adf = timed("adf")(adf_fast)
+_scan = timed("scan")(scan_pairs)
+
+
+def content_hash(df: pd.DataFrame) -> str:
+    """Stable digest of a frame's values, index and column names."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr(list(df.columns)).encode())
+    h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def _nbytes(obj: Any) -> int:
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(index=True))
+    if isinstance(obj, (LODPyramid, BarCascade)):
+        return obj.nbytes
+    if isinstance(obj, tuple):
+        return sum(_nbytes(o) for o in obj)
+    return 0
+
+
+class LRUCache:
+    """Least-recently-used cache bounded by entries and approximate bytes."""
+
+    def __init__(self, maxsize: int = 128, max_bytes: Optional[int] = 512 * 2**20):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def get_or_compute(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        if key in self._data:
+            self._data.move_to_end(key)
+            self.hits += 1
+            return self._data[key][0]
+        self.misses += 1
+        value = fn()
+        size = _nbytes(value)
+        self._data[key] = (value, size)
+        self.nbytes += size
+        while len(self._data) > self.maxsize or (
+            self.max_bytes is not None and self.nbytes > self.max_bytes and len(self._data) > 1
+        ):
+            _, (_, old_size) = self._data.popitem(last=False)
+            self.nbytes -= old_size
+        return value
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.nbytes = 0
+
+
+class AnalyticsPipeline:
+    """Cached bars -> hedge ratio -> spread -> z-score/corr/ADF for tick datasets."""
+
+    def __init__(self, maxsize: int = 128, max_bytes: Optional[int] = 512 * 2**20):
+        self.cache = LRUCache(maxsize=maxsize, max_bytes=max_bytes)
+        # id(df) -> (weakref to df, hash); the hash is computed once per frame object
+        self._keys: Dict[int, Tuple[weakref.ref, str]] = {}
+
+    def dataset_key(self, df: pd.DataFrame) -> str:
+        entry = self._keys.get(id(df))
+        if entry is not None and entry[0]() is df:
+            return entry[1]
+        key = content_hash(df)
+        self._keys = {i: e for i, e in self._keys.items() if e[0]() is not None}
+        self._keys[id(df)] = (weakref.ref(df), key)
+        return key
+
+    def cascade(self, df: pd.DataFrame) -> BarCascade:
+        """Bar hierarchy of a dataset: 1s bars built once, other intervals rolled up from them.
+
+        Bar datasets (e.g. uploads aggregated by `src.loader.load_bars`) have
+        open/high/low/close/volume columns and are used as the 1s level.
+        """
+
+        def compute():
+            base = df if "close" in df.columns else _ohlcv(df, interval="1s")
+            return BarCascade.from_bars(base, base="1s")
+
+        return self.cache.get_or_compute(("cascade", self.dataset_key(df)), compute)
+
+    def bars(self, df: pd.DataFrame, interval: Interval = "1s") -> pd.DataFrame:
+        """OHLCV bars at any multiple of 1s; switching interval is a cascade lookup."""
+        key = ("bars", self.dataset_key(df), interval)
+        return self.cache.get_or_compute(key, lambda: _rollup(self.cascade(df), interval))
+
+    def closes(self, df: pd.DataFrame, interval: Interval = "1s") -> pd.DataFrame:
+        """Close prices with one column per symbol."""
+        key = ("closes", self.dataset_key(df), interval)
+        return self.cache.get_or_compute(key, lambda: self.bars(df, interval)["close"].unstack(level=0))
+
+    def pair(self, df: pd.DataFrame, interval: Interval, a: str, b: str) -> Tuple[pd.Series, pd.Series]:
+        """Close series of `a` and `b` aligned on their common bars."""
+
+        def compute():
+            close_df = self.closes(df, interval)
+            pair = pd.concat([close_df[a].dropna(), close_df[b].dropna()], axis=1).dropna()
+            return pair.iloc[:, 0], pair.iloc[:, 1]
+
+        return self.cache.get_or_compute(("pair", self.dataset_key(df), interval, a, b), compute)
+
+    def hedge_ratio(self, df: pd.DataFrame, interval: Interval, a: str, b: str) -> float:
+        key = ("beta", self.dataset_key(df), interval, a, b)
+        return self.cache.get_or_compute(key, lambda: _hedge(*self.pair(df, interval, a, b)))
+
+    def spread(self, df: pd.DataFrame, interval: Interval, a: str, b: str) -> pd.Series:
+        def compute():
+            sa, sb = self.pair(df, interval, a, b)
+            return construct_spread(sa, sb, self.hedge_ratio(df, interval, a, b))
+
+        return self.cache.get_or_compute(("spread", self.dataset_key(df), interval, a, b), compute)
+
+    def zscore(self, df: pd.DataFrame, interval: Interval, a: str, b: str, window: int = 60) -> pd.Series:
+        key = ("zscore", self.dataset_key(df), interval, a, b, window)
+        return self.cache.get_or_compute(key, lambda: _zscore(self.spread(df, interval, a, b), window=window))
+
+    def corr(self, df: pd.DataFrame, interval: Interval, a: str, b: str, window: int = 60) -> pd.Series:
+        key = ("corr", self.dataset_key(df), interval, a, b, window)
+        return self.cache.get_or_compute(key, lambda: _corr(*self.pair(df, interval, a, b), window=window))
+
+    def adf(self, df: pd.DataFrame, interval: Interval, a: str, b: str) -> Dict[str, float]:
+        key = ("adf", self.dataset_key(df), interval, a, b)
+        return self.cache.get_or_compute(key, lambda: _adf(self.spread(df, interval, a, b)))
+
+    def pyramid(self, df: pd.DataFrame, key: Tuple[Hashable, ...],
+                data: Callable[[], Union[pd.Series, pd.DataFrame]]) -> LODPyramid:
+        """Chart downsampling pyramid of `data()`, cached under the dataset and `key`.
+
+        `key` names the plotted series and every parameter it depends on,
+        e.g. ``("zscore", interval, a, b, window)``.
+        """
+        return self.cache.get_or_compute(("lod", self.dataset_key(df), *key), lambda: LODPyramid(data()))
+
+    def scan(self, df: pd.DataFrame, interval: Interval = "1s", top_n: int = 20) -> pd.DataFrame:
+        """Ranked pair table for every symbol in the dataset (see `scan_pairs`)."""
+        key = ("scan", self.dataset_key(df), interval, top_n)
+        return self.cache.get_or_compute(key, lambda: _scan(self.closes(df, interval), top_n=top_n))
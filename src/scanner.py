@@ -0,0 +1,98 @@
+"""Universe-wide pair scanner.
+
+Takes the close matrix produced from `ticks_to_ohlcv` (one column per
+symbol) and ranks candidate pairs:
+
+1. all-pairs correlation from one standardised matrix product,
+2. OLS hedge ratios of every pair read off the covariance matrix,
+3. batched ADF tests (`src.adf.adf_batch`) on the spreads of the top
+   candidates, split across a process pool.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Literal, Optional
+import os
+import numpy as np
+import pandas as pd
+
+from src.adf import adf_batch
+
+
+def _aligned(close_df: pd.DataFrame) -> pd.DataFrame:
+    """Forward-filled closes restricted to rows where every symbol has a price."""
+    return close_df.ffill().dropna()
+
+
+def corr_matrix(close_df: pd.DataFrame, on: Literal["returns", "levels"] = "returns") -> pd.DataFrame:
+    """All-pairs Pearson correlation of returns (or price levels)."""
+    data = _aligned(close_df).to_numpy(dtype=float)
+    if on == "returns":
+        data = np.diff(np.log(data), axis=0)
+    data = data - data.mean(axis=0)
+    sd = np.sqrt((data * data).sum(axis=0))
+    sd[sd == 0] = np.nan
+    z = data / sd
+    return pd.DataFrame(z.T @ z, index=close_df.columns, columns=close_df.columns)
+
+
+def hedge_ratio_matrix(close_df: pd.DataFrame) -> pd.DataFrame:
+    """OLS slope of every column on every other: ``beta.loc[a, b]`` regresses a on b."""
+    data = _aligned(close_df).to_numpy(dtype=float)
+    data = data - data.mean(axis=0)
+    cov = data.T @ data
+    var = np.diag(cov).copy()
+    var[var == 0] = np.nan
+    return pd.DataFrame(cov / var[None, :], index=close_df.columns, columns=close_df.columns)
+
+
+def _adf_chunk(spreads: np.ndarray, adf_kwargs: Dict) -> List[Dict[str, float]]:
+    if spreads.shape[1] < 10:
+        return [{"statistic": float("nan"), "pvalue": 1.0, "usedlag": 0, "nobs": spreads.shape[1]}] * len(spreads)
+    return adf_batch(spreads, **adf_kwargs).to_dict("records")
+
+
+def scan_pairs(
+    close_df: pd.DataFrame,
+    top_n: int = 50,
+    on: Literal["returns", "levels"] = "returns",
+    min_corr: Optional[float] = None,
+    processes: Optional[int] = None,
+    adf_kwargs: Optional[Dict] = None,
+) -> pd.DataFrame:
+    """Rank pairs by ADF p-value of their spread among the `top_n` most correlated.
+
+    `adf_kwargs` go to `adf_batch` (e.g. ``lag=1`` for a fixed lag).
+    `processes=1` runs the ADF tests serially; otherwise they are spread
+    across a process pool (default: one worker per CPU). Returns columns
+    a, b, corr, hedge_ratio, statistic, pvalue, usedlag, nobs.
+    """
+    cols = list(close_df.columns)
+    aligned = _aligned(close_df)
+    corr = corr_matrix(close_df, on=on).to_numpy()
+    iu, ju = np.triu_indices(len(cols), k=1)
+    pair_corr = corr[iu, ju]
+    keep = ~np.isnan(pair_corr)
+    if min_corr is not None:
+        keep &= pair_corr >= min_corr
+    iu, ju, pair_corr = iu[keep], ju[keep], pair_corr[keep]
+    best = np.argsort(-pair_corr, kind="stable")[:top_n]
+    iu, ju, pair_corr = iu[best], ju[best], pair_corr[best]
+
+    betas = hedge_ratio_matrix(aligned).to_numpy()[iu, ju]
+    data = aligned.to_numpy(dtype=float)
+    spreads = data[:, iu].T - betas[:, None] * data[:, ju].T
+
+    adf_kwargs = adf_kwargs or {}
+    workers = processes or os.cpu_count() or 1
+    if workers == 1 or len(spreads) < 2:
+        results = _adf_chunk(spreads, adf_kwargs)
+    else:
+        chunks = np.array_split(spreads, min(workers * 4, len(spreads)))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = [r for part in pool.map(_adf_chunk, chunks, [adf_kwargs] * len(chunks)) for r in part]
+
+    out = pd.DataFrame(results, columns=["statistic", "pvalue", "usedlag", "nobs"])
+    out.insert(0, "hedge_ratio", betas)
+    out.insert(0, "corr", pair_corr)
+    out.insert(0, "b", [cols[j] for j in ju])
+    out.insert(0, "a", [cols[i] for i in iu])
+    return out.sort_values(["pvalue", "statistic"], kind="stable").reset_index(drop=True)
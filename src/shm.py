@@ -0,0 +1,262 @@
+"""Zero-copy publication of live bars and pair signals through shared memory.
+
+One producer (`SharedBarsWriter`, e.g. inside `AnalyticsDaemon`) owns a
+`multiprocessing.shared_memory` segment holding the latest `capacity` bars
+per symbol and signal rows per pair in fixed ring buffers. Any number of
+dashboards or workers attach by name (`SharedBarsReader`) and see the rings
+as NumPy arrays - no sockets, no serialisation, no recomputation.
+
+Segment layout (every block 64-byte aligned)::
+
+    header    magic, seq, capacity, n_symbols, n_pairs
+    symbols   n_symbols x S32      names, in ring order
+    pairs     n_pairs   x S64      pair keys ("A/B")
+    counts    (n_symbols + n_pairs) int64   rows ever written per ring
+    bars      n_symbols x capacity  BAR_DTYPE
+    signals   n_pairs   x capacity  SIGNAL_DTYPE
+
+Consistency uses a seqlock: the writer makes `seq` odd before touching
+the rings and even again afterwards; readers copy what they need and retry
+if `seq` was odd or changed meanwhile. Readers never block the writer.
+"""
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import math
+import time
+import numpy as np
+import pandas as pd
+
+MAGIC = 0x5254515348_4D0001  # "RTQSHM" + layout version 1
+
+_HEADER = np.dtype([("magic", "<u8"), ("seq", "<i8"), ("capacity", "<i8"), ("n_symbols", "<i8"), ("n_pairs", "<i8")])
+BAR_DTYPE = np.dtype([("timestamp", "<i8"), ("open", "<f8"), ("high", "<f8"), ("low", "<f8"),
+                      ("close", "<f8"), ("volume", "<f8")])
+SIGNAL_FIELDS = ("a", "b", "hedge_ratio", "spread", "zscore", "corr", "adf_statistic", "adf_pvalue")
+SIGNAL_DTYPE = np.dtype([("timestamp", "<i8")] + [(f, "<f8") for f in SIGNAL_FIELDS])
+
+_OWNED: set = set()  # segments created by writers in this process
+
+
+def _align(n: int) -> int:
+    return (n + 63) // 64 * 64
+
+
+def _layout(capacity: int, n_symbols: int, n_pairs: int) -> Tuple[Dict[str, Tuple[int, np.dtype, tuple]], int]:
+    """Offset, dtype and shape of every block, and the total segment size."""
+    blocks = [
+        ("header", _HEADER, ()),
+        ("symbols", np.dtype("S32"), (n_symbols,)),
+        ("pairs", np.dtype("S64"), (n_pairs,)),
+        ("counts", np.dtype("<i8"), (n_symbols + n_pairs,)),
+        ("bars", BAR_DTYPE, (n_symbols, capacity)),
+        ("signals", SIGNAL_DTYPE, (n_pairs, capacity)),
+    ]
+    out, offset = {}, 0
+    for name, dtype, shape in blocks:
+        out[name] = (offset, dtype, shape)
+        offset = _align(offset + dtype.itemsize * math.prod(shape))
+    return out, offset
+
+
+def _views(buf, layout) -> Dict[str, np.ndarray]:
+    return {name: np.ndarray(shape, dtype=dtype, buffer=buf, offset=off) for name, (off, dtype, shape) in layout.items()}
+
+
+def _ring(arr: np.ndarray, count: int, capacity: int, n: Optional[int]) -> np.ndarray:
+    """Copy of the last `n` (all if None) rows of a ring holding `count` writes, oldest first."""
+    size = min(count, capacity)
+    n = size if n is None else min(n, size)
+    idx = (np.arange(count - n, count) % capacity) if n else np.empty(0, dtype=np.int64)
+    return arr[idx]
+
+
+class SharedBarsWriter:
+    """Producer side: creates the segment and publishes bars and pair signals.
+
+    A stale segment with the same name (e.g. left by a crashed producer) is
+    replaced. Call `close()` (which also unlinks) when done.
+    """
+
+    def __init__(self, name: str, symbols: Sequence[str], pairs: Sequence[str], capacity: int = 3600):
+        self.name = name
+        self.symbols = list(symbols)
+        self.pairs = list(pairs)
+        self.capacity = capacity
+        layout, size = _layout(capacity, len(self.symbols), len(self.pairs))
+        try:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        _OWNED.add(name)
+        v = self._v = _views(self._shm.buf, layout)
+        v["counts"][:] = 0
+        v["symbols"][:] = [s.encode() for s in self.symbols]
+        v["pairs"][:] = [p.encode() for p in self.pairs]
+        h = v["header"]
+        h["seq"], h["capacity"], h["n_symbols"], h["n_pairs"] = 0, capacity, len(self.symbols), len(self.pairs)
+        h["magic"] = MAGIC  # last: readers treat the segment as valid from here on
+        self._sym = {s: i for i, s in enumerate(self.symbols)}
+        self._pair = {p: i for i, p in enumerate(self.pairs)}
+
+    def _begin(self) -> None:
+        self._v["header"]["seq"] += 1  # odd: write in progress
+
+    def _end(self) -> None:
+        self._v["header"]["seq"] += 1  # even: consistent
+
+    def write_bars(self, records: Iterable[tuple]) -> None:
+        """Append closed bars given as (symbol, ns, o, h, l, c, v) tuples; unknown symbols are skipped."""
+        bars, counts, cap = self._v["bars"], self._v["counts"], self.capacity
+        self._begin()
+        try:
+            for sym, t, *ohlcv in records:
+                i = self._sym.get(sym)
+                if i is None:
+                    continue
+                n = counts[i]
+                bars[i, n % cap] = (t, *ohlcv)
+                counts[i] = n + 1
+        finally:
+            self._end()
+
+    def rewrite_bars(self, records: Iterable[tuple]) -> None:
+        """Overwrite already published bars with corrected (symbol, ns, o, h, l, c, v) tuples.
+
+        Bars no longer in the ring (or never published) are skipped.
+        """
+        bars = self._v["bars"]
+        self._begin()
+        try:
+            for sym, t, *ohlcv in records:
+                i = self._sym.get(sym)
+                if i is None:
+                    continue
+                hit = np.flatnonzero(bars[i]["timestamp"] == t)
+                if hit.size:
+                    bars[i, hit[-1]] = (t, *ohlcv)
+        finally:
+            self._end()
+
+    def write_signals(self, rows: Dict[str, List[dict]]) -> None:
+        """Append per-bar pair states (as recorded by `PairShard.process`) keyed by pair key."""
+        sig, counts, cap, base = self._v["signals"], self._v["counts"], self.capacity, len(self.symbols)
+        self._begin()
+        try:
+            for key, states in rows.items():
+                j = self._pair.get(key)
+                if j is None:
+                    continue
+                n = counts[base + j]
+                for st in states:
+                    sig[j, n % cap] = (int(st["timestamp"]), *(float(st.get(f, np.nan)) for f in SIGNAL_FIELDS))
+                    n += 1
+                counts[base + j] = n
+        finally:
+            self._end()
+
+    def close(self) -> None:
+        self._v = {}
+        _OWNED.discard(self.name)
+        self._shm.close()
+        try:
+            self._shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class SharedBarsReader:
+    """Consumer side: attach to a published segment by name, read-only.
+
+    `bars()` / `signals()` return consistent copies of the latest rows as
+    DataFrames; `arrays()` exposes the raw read-only ring views for callers
+    that do their own seqlock checks via `seq`.
+    """
+
+    def __init__(self, name: str, timeout: float = 2.0):
+        self._shm = shared_memory.SharedMemory(name=name)
+        # attaching registers the segment with this process' resource tracker,
+        # which would unlink it on exit; the writer owns its lifetime
+        if name not in _OWNED:
+            try:
+                resource_tracker.unregister(self._shm._name, "shared_memory")
+            except Exception:  # pragma: no cover - tracker details vary by platform
+                pass
+        header = np.ndarray((), dtype=_HEADER, buffer=self._shm.buf)
+        deadline = time.monotonic() + timeout
+        while header["magic"] != MAGIC:
+            if time.monotonic() > deadline:
+                self._shm.close()
+                raise ValueError(f"Shared memory segment {name!r} is not a bar/signal segment")
+            time.sleep(0.001)
+        self.capacity = int(header["capacity"])
+        layout, _ = _layout(self.capacity, int(header["n_symbols"]), int(header["n_pairs"]))
+        self._v = _views(self._shm.buf, layout)
+        for arr in self._v.values():
+            arr.flags.writeable = False
+        self.symbols: List[str] = [s.decode() for s in self._v["symbols"]]
+        self.pairs: List[str] = [p.decode() for p in self._v["pairs"]]
+        self._sym = {s: i for i, s in enumerate(self.symbols)}
+        self._pair = {p: i for i, p in enumerate(self.pairs)}
+
+    @property
+    def seq(self) -> int:
+        return int(self._v["header"]["seq"])
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """Read-only views of the rings: counts, bars (symbol x capacity), signals (pair x capacity)."""
+        return {k: self._v[k] for k in ("counts", "bars", "signals")}
+
+    def _read(self, fn, timeout: float = 5.0):
+        header = self._v["header"]
+        deadline = time.monotonic() + timeout
+        while True:
+            s1 = int(header["seq"])
+            if not s1 & 1:
+                out = fn()
+                if int(header["seq"]) == s1:
+                    return out
+            if time.monotonic() > deadline:
+                raise TimeoutError("Shared memory writer kept the segment busy")
+            time.sleep(0)  # yield to the writer instead of spinning
+
+    def bars(self, symbol: str, n: Optional[int] = None) -> pd.DataFrame:
+        """Latest `n` closed bars of `symbol` (all retained if None), oldest first."""
+        i = self._sym[symbol]
+        rows = self._read(lambda: _ring(self._v["bars"][i], int(self._v["counts"][i]), self.capacity, n))
+        return _frame(rows)
+
+    def signals(self, pair: str, n: Optional[int] = None) -> pd.DataFrame:
+        """Latest `n` signal rows of `pair` ("A/B"), oldest first."""
+        j = self._pair[pair]
+        base = len(self.symbols)
+        rows = self._read(lambda: _ring(self._v["signals"][j], int(self._v["counts"][base + j]), self.capacity, n))
+        return _frame(rows)
+
+    def latest(self) -> pd.DataFrame:
+        """The most recent signal row of every pair that has one, indexed by pair key."""
+        base = len(self.symbols)
+
+        def read():
+            counts = self._v["counts"][base:].copy()
+            have = np.flatnonzero(counts)
+            return have, self._v["signals"][have, (counts[have] - 1) % self.capacity]
+
+        have, rows = self._read(read)
+        frame = pd.DataFrame(rows)
+        frame.index = pd.Index([self.pairs[j] for j in have], name="pair")
+        if not frame.empty:
+            frame["timestamp"] = pd.to_datetime(frame["timestamp"])
+        return frame
+
+    def close(self) -> None:
+        self._v = {}
+        self._shm.close()
+
+
+def _frame(rows: np.ndarray) -> pd.DataFrame:
+    frame = pd.DataFrame(rows)
+    frame.index = pd.DatetimeIndex(frame.pop("timestamp").to_numpy().view("datetime64[ns]"), name="timestamp")
+    return frame
@@ -2,46 +2,664 @@
 
 Functions are intentionally small and testable.
 """
-from typing import Literal
+from collections import deque
+from typing import Deque, Dict, List, Literal, Optional, Sequence, Tuple
+import numpy as np
 import pandas as pd
 
-Interval = Literal["1s", "1m", "5m"]
+from src.metrics import timed
+
+# "1s" / "1m" / "5m" in the dashboards, or any fixed pandas frequency such as "15s" or "1h"
+Interval = str
+FloatDtype = Literal["float64", "float32"]
+
+# "1m" is minutes in this project; pandas reads a bare "m" as month-end.
+_FREQ = {"1s": "1s", "1m": "1min", "5m": "5min"}
+# NaT as int64 epoch nanoseconds
+_NAT = np.iinfo(np.int64).min
+
+
+def _freq(interval: str) -> str:
+    """Map a dashboard interval label to a pandas frequency string."""
+    if interval in _FREQ:
+        return _FREQ[interval]
+    if interval.endswith("m") and interval[:-1].isdigit():
+        return interval[:-1] + "min"
+    return interval
+
+
+def _interval_ns(interval: str) -> int:
+    """Length of an interval in nanoseconds."""
+    return int(pd.Timedelta(_freq(interval)).value)
+
+
+def _to_ns(ts: pd.Series) -> np.ndarray:
+    """Convert a timestamp column to int64 epoch nanoseconds.
+
+    The format is detected once for the whole column: datetimes are used as
+    is, integers are read as epoch s/ms/us/ns depending on their magnitude
+    and anything else is parsed as ISO-8601 in a single vectorised call.
+    """
+    if pd.api.types.is_datetime64_any_dtype(ts):
+        if getattr(ts.dt, "tz", None) is not None:
+            ts = ts.dt.tz_convert("UTC").dt.tz_localize(None)
+        return ts.to_numpy(dtype="datetime64[ns]").view("int64")
+    if pd.api.types.is_integer_dtype(ts):
+        arr = ts.to_numpy(dtype="int64")
+        peak = int(np.abs(arr).max()) if arr.size else 0
+        for unit, limit in (("s", 10**11), ("ms", 10**14), ("us", 10**17)):
+            if peak < limit:
+                return pd.to_datetime(arr, unit=unit).asi8
+        return arr
+    try:
+        parsed = pd.to_datetime(ts, format="ISO8601")
+    except (ValueError, TypeError):
+        # mixed formats: still one call, pandas infers per element
+        parsed = pd.to_datetime(ts, format="mixed")
+    if parsed.dt.tz is not None:
+        parsed = parsed.dt.tz_convert("UTC").dt.tz_localize(None)
+    return parsed.to_numpy(dtype="datetime64[ns]").view("int64")
+
+
+def compact_ticks(ticks: pd.DataFrame, float_dtype: FloatDtype = "float64",
+                  symbols: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Canonical compact tick frame used at every entry point.
+
+    Timestamps become datetime64[ns] (an int64 epoch-ns column), symbols a
+    categorical (over `symbols` if given, so frames built separately share
+    codes and concatenate without falling back to object) and price and
+    quantity `float_dtype`. A million ticks take ~25 MB with float64 and
+    ~17 MB with float32, against ~90 MB with object symbols.
+    """
+    sym = ticks["symbol"]
+    if symbols is not None:
+        sym = pd.Categorical(sym, categories=list(symbols))
+    elif not isinstance(sym.dtype, pd.CategoricalDtype):
+        sym = sym.astype("category")
+    return pd.DataFrame(
+        {
+            "timestamp": pd.DatetimeIndex(_to_ns(ticks["timestamp"]).view("datetime64[ns]")),
+            "symbol": sym,
+            "price": ticks["price"].to_numpy(dtype=float_dtype),
+            "quantity": ticks["quantity"].to_numpy(dtype=float_dtype),
+        },
+        index=ticks.index,
+    )
 
 
 def ticks_to_ohlcv(ticks: pd.DataFrame, interval: Interval = "1s") -> pd.DataFrame:
     """Convert tick dataframe into OHLCV bars by symbol.
 
     Expects columns: ['timestamp', 'symbol', 'price', 'quantity'] where
-    `timestamp` is either a pandas datetime or unix ms/ns integer.
+    `timestamp` is a pandas datetime, an ISO string or a unix s/ms/us/ns
+    integer. Timezone-aware timestamps are converted to naive UTC. Frames in
+    the `compact_ticks` schema (categorical symbols) skip the string hashing.
+
+    All symbols are binned in one pass: timestamps are floor-divided into
+    epoch-aligned intervals and reduced with NumPy over the (symbol, bin)
+    groups. Empty intervals inside a symbol's range are kept as NaN bars with
+    zero volume, like ``DataFrame.resample``.
 
     Returns a MultiIndex DataFrame (symbol, timestamp) with columns: open/high/low/close/volume
     """
-    df = ticks.copy()
-    if df.empty:
+    if ticks.empty:
         return pd.DataFrame()
 
-    # Robust parsing: accept ISO strings with fractional seconds and integers
-    orig_ts = df["timestamp"].copy()
-    try:
-        df["timestamp"] = pd.to_datetime(orig_ts, infer_datetime_format=True, errors="coerce")
-        if df["timestamp"].isna().any():
-            # fallback: parse element-wise from original strings (handles mixed formats)
-            df["timestamp"] = orig_ts.astype(str).apply(pd.to_datetime)
-    except Exception:
-        # Last-resort: let pandas infer per-element from original values
-        df["timestamp"] = orig_ts.astype(str).apply(pd.to_datetime)
-    df = df.set_index("timestamp")
-
-    out_frames = []
-    for sym, g in df.groupby("symbol"):
-        g = g.sort_index()
-        # price aggregation
-        ohlc = g["price"].resample(interval).ohlc()
-        vol = g["quantity"].resample(interval).sum().rename("volume")
-        merged = pd.concat([ohlc, vol], axis=1)
-        merged["symbol"] = sym
-        out_frames.append(merged)
-
-    res = pd.concat(out_frames)
-    res = res.reset_index().set_index(["symbol", "timestamp"]).sort_index()
-    return res
+    codes, symbols = pd.factorize(ticks["symbol"], sort=True)
+    ts, price, qty = _to_ns(ticks["timestamp"]), ticks["price"].to_numpy(dtype=float), ticks["quantity"].to_numpy()
+    keep = (codes >= 0) & (ts != _NAT)
+    if not keep.all():
+        # missing symbols factorize to -1 and missing timestamps are NaT; drop them like groupby does
+        if not keep.any():
+            return pd.DataFrame()
+        codes, ts, price, qty = codes[keep], ts[keep], price[keep], qty[keep]
+    symbols = np.asarray(symbols, dtype=object)
+    if symbols.size > 1 and not (symbols[1:] > symbols[:-1]).all():
+        # categoricals factorize in category order; codes must follow sorted names
+        order = np.argsort(symbols)
+        codes, symbols = np.argsort(order)[codes], symbols[order]
+    return ohlcv_from_arrays(
+        ts,
+        price,
+        qty,
+        symbols=symbols,
+        codes=codes,
+        interval=interval,
+    )
+
+
+def ohlcv_from_arrays(
+    ts: np.ndarray,
+    price: np.ndarray,
+    qty: np.ndarray,
+    symbols: Sequence[str],
+    codes: Optional[np.ndarray] = None,
+    interval: Interval = "1s",
+) -> pd.DataFrame:
+    """Core of `ticks_to_ohlcv` working on raw tick columns.
+
+    `ts` holds epoch nanoseconds (no NaT) and `codes[i]` indexes `symbols`
+    (which must be sorted); with `codes=None` all ticks belong to ``symbols[0]``. Inputs
+    that are already ordered by (symbol, time) are reduced in place, so views
+    into a tick buffer are never copied.
+    """
+    if len(ts) == 0:
+        return pd.DataFrame()
+    step = _interval_ns(interval)
+    symbols = np.asarray(symbols, dtype=object)
+    if codes is None:
+        codes = np.zeros(len(ts), dtype=np.int8)
+
+    dc = np.diff(codes)
+    if not np.all((dc > 0) | ((dc == 0) & (ts[1:] >= ts[:-1]))):
+        if np.all(ts[1:] >= ts[:-1]):
+            # time-ordered (the usual case): a stable radix sort on small symbol codes suffices
+            order = np.argsort(codes.astype(np.int16) if symbols.size < 2**15 else codes, kind="stable")
+        else:
+            order = np.lexsort((ts, codes))
+        codes, price, qty, ts = codes[order], price[order], qty[order], ts[order]
+    bins = ts // step * step
+
+    # one group per (symbol, bin)
+    starts = np.flatnonzero(np.r_[True, (codes[1:] != codes[:-1]) | (bins[1:] != bins[:-1])])
+    ends = np.r_[starts[1:], codes.size] - 1
+    g_code = codes[starts]
+    g_bin = bins[starts]
+
+    # dense per-symbol range of bins, including empty ones
+    sym_first = np.flatnonzero(np.r_[True, g_code[1:] != g_code[:-1]])
+    sym_last = np.r_[sym_first[1:], g_code.size] - 1
+    first_bin = g_bin[sym_first]
+    nbins = (g_bin[sym_last] - first_bin) // step + 1
+    offset = np.r_[0, np.cumsum(nbins)[:-1]]
+    pos = offset[np.repeat(np.arange(sym_first.size), sym_last - sym_first + 1)]
+    pos += (g_bin - np.repeat(first_bin, sym_last - sym_first + 1)) // step
+
+    total = int(nbins.sum())
+    cols = {name: np.full(total, np.nan) for name in ("open", "high", "low", "close")}
+    cols["open"][pos] = price[starts]
+    cols["high"][pos] = np.maximum.reduceat(price, starts)
+    cols["low"][pos] = np.minimum.reduceat(price, starts)
+    cols["close"][pos] = price[ends]
+    volume = np.zeros(total, dtype=np.add.reduceat(qty[:1], [0]).dtype)
+    volume[pos] = np.add.reduceat(qty, starts)
+    cols["volume"] = volume
+
+    within = np.arange(total) - np.repeat(offset, nbins)
+    index = pd.MultiIndex.from_arrays(
+        [
+            symbols[np.repeat(g_code[sym_first], nbins)],
+            pd.DatetimeIndex(np.repeat(first_bin, nbins) + within * step, dtype="datetime64[ns]"),
+        ],
+        names=["symbol", "timestamp"],
+    )
+    return pd.DataFrame(cols, index=index)
+
+
+def _densify(bars: pd.DataFrame, step: int) -> pd.DataFrame:
+    """Insert NaN/zero-volume bars for empty intervals inside each symbol's range."""
+    sym = bars.index.get_level_values(0).to_numpy()
+    ts = bars.index.get_level_values(1).asi8
+    first = np.flatnonzero(np.r_[True, sym[1:] != sym[:-1]])
+    last = np.r_[first[1:], len(sym)] - 1
+    nbins = (ts[last] - ts[first]) // step + 1
+    if int(nbins.sum()) == len(bars):
+        return bars
+    offset = np.r_[0, np.cumsum(nbins)[:-1]]
+    within = np.arange(int(nbins.sum())) - np.repeat(offset, nbins)
+    full = pd.MultiIndex.from_arrays(
+        [sym[np.repeat(first, nbins)], pd.DatetimeIndex(np.repeat(ts[first], nbins) + within * step, dtype="datetime64[ns]")],
+        names=bars.index.names,
+    )
+    out = bars.reindex(full)
+    out["volume"] = out["volume"].fillna(0)
+    return out
+
+
+def resample_bars(bars: pd.DataFrame, interval: Interval) -> pd.DataFrame:
+    """Aggregate OHLCV bars to `interval` (coarser, or equal to merge partial bars).
+
+    Takes the `ticks_to_ohlcv` layout (or the same columns flat, with
+    symbol and timestamp as columns) and returns that layout. Rows of the
+    same symbol and interval are combined in order (first open, max high,
+    min low, last close, summed volume), so bars aggregated from
+    consecutive chunks of a tick file merge into the bars of the whole file.
+    """
+    if bars.empty:
+        return pd.DataFrame()
+    flat = bars.reset_index() if isinstance(bars.index, pd.MultiIndex) else bars
+    step = _interval_ns(interval)
+    ts = _to_ns(flat["timestamp"])
+    keyed = pd.DataFrame({
+        "symbol": flat["symbol"].astype(object).to_numpy(),
+        "timestamp": pd.DatetimeIndex((ts // step * step).view("datetime64[ns]")),
+        "open": flat["open"].to_numpy(), "high": flat["high"].to_numpy(), "low": flat["low"].to_numpy(),
+        "close": flat["close"].to_numpy(), "volume": flat["volume"].to_numpy(),
+    })
+    # first/last skip the NaN empty bars, like the tick-level reduction
+    out = keyed.groupby(["symbol", "timestamp"], sort=True).agg(
+        open=("open", "first"), high=("high", "max"), low=("low", "min"),
+        close=("close", "last"), volume=("volume", "sum"),
+    )
+    return _densify(out, step)
+
+
+def bar_records(bars: pd.DataFrame, float_dtype: FloatDtype = "float32") -> Tuple[np.ndarray, List[str]]:
+    """Pack `ticks_to_ohlcv` bars into a compact structured array.
+
+    Each record holds an int32 symbol id, int64 ns timestamp and OHLCV in
+    `float_dtype` (32 bytes per bar with float32); returns the records and
+    the symbol list the ids index. `bars_from_records` is the inverse.
+    """
+    if bars.empty:
+        return np.empty(0, dtype=_record_dtype(float_dtype)), []
+    codes, symbols = pd.factorize(bars.index.get_level_values(0), sort=True)
+    rec = np.empty(len(bars), dtype=_record_dtype(float_dtype))
+    rec["symbol"] = codes
+    rec["timestamp"] = bars.index.get_level_values(1).asi8
+    for name in ("open", "high", "low", "close", "volume"):
+        rec[name] = bars[name].to_numpy()
+    return rec, [str(s) for s in symbols]
+
+
+def bars_from_records(records: np.ndarray, symbols: Sequence[str]) -> pd.DataFrame:
+    """Rebuild the (symbol, timestamp) bar frame from `bar_records` output."""
+    if not len(records):
+        return pd.DataFrame()
+    index = pd.MultiIndex.from_arrays(
+        [np.asarray(symbols, dtype=object)[records["symbol"]], pd.DatetimeIndex(records["timestamp"].view("datetime64[ns]"))],
+        names=["symbol", "timestamp"],
+    )
+    return pd.DataFrame({name: records[name] for name in ("open", "high", "low", "close", "volume")}, index=index)
+
+
+def _record_dtype(float_dtype: str) -> np.dtype:
+    return np.dtype([("symbol", "<i4"), ("timestamp", "<i8")]
+                    + [(name, float_dtype) for name in ("open", "high", "low", "close", "volume")])
+
+
+def _bars_frame(records: List[tuple]) -> pd.DataFrame:
+    """Build a (symbol, timestamp) bar frame from (symbol, ns, o, h, l, c, v) tuples."""
+    if not records:
+        return pd.DataFrame()
+    cols = list(zip(*records))
+    res = pd.DataFrame(
+        {
+            "symbol": list(cols[0]),
+            "timestamp": pd.to_datetime(np.asarray(cols[1], dtype="int64")),
+            "open": np.asarray(cols[2], dtype=float),
+            "high": np.asarray(cols[3], dtype=float),
+            "low": np.asarray(cols[4], dtype=float),
+            "close": np.asarray(cols[5], dtype=float),
+            "volume": np.asarray(cols[6]),
+        }
+    )
+    return res.set_index(["symbol", "timestamp"]).sort_index()
+
+
+def _merge_bar(bar: list, first: int, last: int, o: float, high: float, low: float, c: float, v) -> None:
+    """Fold ticks spanning [first, last] into `bar`, keeping open/close in event-time order."""
+    if bar[1] != bar[1]:  # empty (NaN) bar
+        bar[1:8] = [o, high, low, c, bar[5] + v, first, last]
+        return
+    if first < bar[6]:
+        bar[1], bar[6] = o, first
+    if last >= bar[7]:
+        bar[4], bar[7] = c, last
+    bar[2], bar[3], bar[5] = max(bar[2], high), min(bar[3], low), bar[5] + v
+
+
+class BarAggregator:
+    """Stateful OHLCV aggregator fed with tick batches or single ticks.
+
+    Bars are finalized by a per-symbol event-time watermark: the newest tick
+    time seen for the symbol minus `lateness`. A bar is closed (and
+    returned) once the watermark passes its end, so ticks up to `lateness`
+    out of order still land in the right bar with the right open/close.
+    Empty intervals between two ticks are emitted as NaN bars with zero
+    volume, so ``bars()`` matches ``ticks_to_ohlcv`` on the same ticks.
+
+    Ticks for an already finalized bar are late. The last `amend_bars`
+    finalized bars per symbol are corrected in place and queued for
+    ``take_amendments()``; older late ticks are dropped. ``stats`` counts
+    late, amended and dropped ticks. `history` caps how many closed bars are
+    retained for ``bars()`` (None keeps all), so long-running consumers that
+    only use the bars returned by ``update()`` stay bounded.
+    """
+
+    def __init__(self, interval: Interval = "1s", history: Optional[int] = None,
+                 lateness: Optional[Interval] = None, amend_bars: int = 0):
+        self.interval = interval
+        self._step = _interval_ns(interval)
+        self._lateness = _interval_ns(lateness) if lateness else 0
+        self.amend_bars = amend_bars
+        # symbol -> {bin_start_ns: [bin_start_ns, open, high, low, close, volume, first_ns, last_ns]}
+        self._open: Dict[str, Dict[int, list]] = {}
+        self._next: Dict[str, int] = {}  # start of the first bar not yet finalized
+        self._max: Dict[str, int] = {}  # newest tick time seen
+        # symbol -> last `amend_bars` finalized bars (dense, oldest first)
+        self._final: Dict[str, Deque[list]] = {}
+        self._amended: Dict[Tuple[str, int], list] = {}
+        self._closed: Deque[Tuple[str, list]] = deque(maxlen=history)
+        self._frame: Optional[pd.DataFrame] = None
+        self.stats: Dict[str, int] = {"late": 0, "amended": 0, "dropped": 0}
+
+    def _emit(self, sym: str, bar: list, out: List[tuple]) -> None:
+        out.append((sym, *bar[:6]))
+        self._closed.append((sym, bar))
+        if self.amend_bars:
+            final = self._final.get(sym)
+            if final is None:
+                final = self._final[sym] = deque(maxlen=self.amend_bars)
+            final.append(bar)
+
+    def _finalize(self, sym: str, frontier: int, out: List[tuple]) -> None:
+        """Close the pending bars of `sym` before `frontier`, filling empty intervals."""
+        pending = self._open.get(sym)
+        nxt = self._next.get(sym)
+        if not pending or (nxt is not None and frontier <= nxt):
+            return
+        zero = next(iter(pending.values()))[5] * 0
+        for b in sorted(b for b in pending if b < frontier):
+            bar = pending.pop(b)
+            if nxt is not None:
+                for t in range(nxt, b, self._step):
+                    self._emit(sym, [t, np.nan, np.nan, np.nan, np.nan, zero, None, None], out)
+            self._emit(sym, bar, out)
+            nxt = b + self._step
+        if nxt is not None:
+            end = min(frontier, min(pending)) if pending else frontier
+            for t in range(nxt, end, self._step):
+                self._emit(sym, [t, np.nan, np.nan, np.nan, np.nan, zero, None, None], out)
+            self._next[sym] = max(nxt, end)
+        if not pending:
+            del self._open[sym]
+
+    def _late(self, sym: str, b: int, t: int, price: float, qty) -> None:
+        """Amend the finalized bar starting at `b` with a late tick, or drop the tick."""
+        self.stats["late"] += 1
+        final = self._final.get(sym)
+        i = len(final) - 1 - (self._next[sym] - self._step - b) // self._step if final else -1
+        if i < 0:
+            self.stats["dropped"] += 1
+            return
+        bar = final[i]
+        _merge_bar(bar, t, t, price, price, price, price, qty)
+        self._amended[(sym, b)] = bar
+        self.stats["amended"] += 1
+        self._frame = None
+
+    def _add_symbol(self, sym: str, ts: np.ndarray, price: np.ndarray, qty: np.ndarray, out: List[tuple]) -> None:
+        order = np.argsort(ts, kind="stable")
+        ts, price, qty = ts[order], price[order], qty[order]
+        bins = ts // self._step * self._step
+        nxt = self._next.get(sym)
+        if nxt is not None and bins[0] < nxt:
+            late = bins < nxt
+            for i in np.flatnonzero(late):
+                self._late(sym, int(bins[i]), int(ts[i]), float(price[i]), qty[i])
+            keep = ~late
+            ts, price, qty, bins = ts[keep], price[keep], qty[keep], bins[keep]
+        if bins.size == 0:
+            return
+        starts = np.flatnonzero(np.r_[True, bins[1:] != bins[:-1]])
+        ends = np.r_[starts[1:], bins.size] - 1
+        highs = np.maximum.reduceat(price, starts)
+        lows = np.minimum.reduceat(price, starts)
+        vols = np.add.reduceat(qty, starts)
+        pending = self._open.setdefault(sym, {})
+        for i, s in enumerate(starts):
+            b, e = int(bins[s]), ends[i]
+            cur = pending.get(b)
+            if cur is None:
+                pending[b] = [b, float(price[s]), float(highs[i]), float(lows[i]), float(price[e]), vols[i],
+                              int(ts[s]), int(ts[e])]
+            else:
+                _merge_bar(cur, int(ts[s]), int(ts[e]), float(price[s]), float(highs[i]), float(lows[i]),
+                           float(price[e]), vols[i])
+        newest = max(self._max.get(sym, int(ts[-1])), int(ts[-1]))
+        self._max[sym] = newest
+        self._finalize(sym, (newest - self._lateness) // self._step * self._step, out)
+
+    def update(self, ticks: pd.DataFrame) -> pd.DataFrame:
+        """Consume a tick batch and return the bars it closed."""
+        return _bars_frame(self.update_records(ticks))
+
+    @timed("aggregate")
+    def update_records(self, ticks: pd.DataFrame) -> List[tuple]:
+        """Like `update` but return closed bars as (symbol, ns, o, h, l, c, v) tuples.
+
+        Skips building a DataFrame, for streaming consumers that handle bars
+        one by one.
+        """
+        if ticks.empty:
+            return []
+        ts = _to_ns(ticks["timestamp"])
+        codes, syms = pd.factorize(ticks["symbol"])
+        price = ticks["price"].to_numpy(dtype=float)
+        qty = ticks["quantity"].to_numpy()
+        out: List[tuple] = []
+        # group rows by symbol with one stable sort instead of a mask per symbol;
+        # rows without a symbol (code -1) or timestamp (NaT) are dropped
+        order = np.flatnonzero((codes >= 0) & (ts != _NAT))
+        order = order[np.argsort(codes[order], kind="stable")]
+        if not order.size:
+            return out
+        for idx in np.split(order, np.flatnonzero(np.diff(codes[order])) + 1):
+            self._add_symbol(syms[codes[idx[0]]], ts[idx], price[idx], qty[idx], out)
+        self._frame = None
+        return out
+
+    def add_tick(self, symbol: str, timestamp, price: float, quantity) -> pd.DataFrame:
+        """Consume a single tick and return the bars it closed."""
+        ts = np.array([pd.Timestamp(timestamp).value], dtype="int64")
+        out: List[tuple] = []
+        self._add_symbol(symbol, ts, np.array([price], dtype=float), np.array([quantity]), out)
+        self._frame = None
+        return _bars_frame(out)
+
+    def take_amendments(self) -> List[tuple]:
+        """Corrected (symbol, ns, o, h, l, c, v) bars since the last call, one per bar."""
+        out = [(sym, *bar[:6]) for (sym, _), bar in self._amended.items()]
+        self._amended.clear()
+        return out
+
+    def flush(self) -> pd.DataFrame:
+        """Close every open bar (e.g. at end of a session) and return them."""
+        return _bars_frame(self.flush_records())
+
+    def flush_records(self) -> List[tuple]:
+        """Like `flush` but return the bars as (symbol, ns, o, h, l, c, v) tuples."""
+        out: List[tuple] = []
+        for sym in list(self._open):
+            self._finalize(sym, max(self._open[sym]) + self._step, out)
+        self._frame = None
+        return out
+
+    def bars(self, include_open: bool = True) -> pd.DataFrame:
+        """All bars seen so far in the same layout as ``ticks_to_ohlcv``."""
+        if self._frame is None:
+            self._frame = _bars_frame([(sym, *bar[:6]) for sym, bar in self._closed])
+        if not include_open or not self._open:
+            return self._frame
+        open_bars = _bars_frame([(sym, *bar[:6]) for sym, pending in self._open.items() for bar in pending.values()])
+        if self._frame.empty:
+            return open_bars
+        return pd.concat([self._frame, open_bars]).sort_index()
+
+
+class _Rollup:
+    """One level of a `BarCascade`: closed bars plus the open bar per symbol.
+
+    Rolls finer closed bars (spaced `source_step` apart) into bars of
+    `interval`, closing a bar as soon as the finer bar ending it arrives.
+    Finer levels are dense (empty intervals are NaN bars), so coarse empty
+    bars appear without gap filling.
+    """
+
+    def __init__(self, interval: Interval, source_step: int):
+        self.interval = interval
+        self.step = _interval_ns(interval)
+        self.source_step = source_step
+        self.frame = pd.DataFrame()
+        self.pending: List[tuple] = []
+        self.open: Dict[str, list] = {}
+
+    def roll(self, records: Sequence[tuple]) -> List[tuple]:
+        step, fine = self.step, self.source_step
+        out: List[tuple] = []
+        for sym, t, o, high, low, c, v in records:
+            b = t // step * step
+            cur = self.open.get(sym)
+            if cur is None or cur[0] != b:
+                if cur is not None:
+                    out.append((sym, *cur))
+                cur = self.open[sym] = [b, o, high, low, c, v]
+            else:
+                if o == o:  # skip NaN (empty) finer bars
+                    if cur[1] != cur[1]:
+                        cur[1], cur[2], cur[3] = o, high, low
+                    else:
+                        cur[2], cur[3] = max(cur[2], high), min(cur[3], low)
+                    cur[4] = c
+                cur[5] = cur[5] + v
+            if t + fine >= b + step:
+                out.append((sym, *self.open.pop(sym)))
+        self.pending += out
+        return out
+
+    def flush(self) -> List[tuple]:
+        out = [(sym, *bar) for sym, bar in self.open.items()]
+        self.open.clear()
+        self.pending += out
+        return out
+
+    def bars(self, include_open: bool = True) -> pd.DataFrame:
+        if self.pending:
+            new = _bars_frame(self.pending)
+            self.frame = new if self.frame.empty else pd.concat([self.frame, new]).sort_index()
+            self.pending = []
+        if not include_open or not self.open:
+            return self.frame
+        open_bars = _bars_frame([(sym, *bar) for sym, bar in self.open.items()])
+        return open_bars if self.frame.empty else pd.concat([self.frame, open_bars]).sort_index()
+
+
+class BarCascade:
+    """Multi-timeframe bars: base bars from ticks, coarser ones rolled up from finer bars.
+
+    Ticks are aggregated once into `base` bars; every other interval (any
+    multiple of the base, e.g. "15s", "1m", "1h") is a cached level rolled
+    up incrementally from the coarsest existing level that divides it, as
+    the finer bars close. ``bars(interval)`` is a lookup; intervals not seen
+    before are built from their parent's history on first use and kept up
+    to date from then on. Ticks are not retained.
+    """
+
+    def __init__(self, base: Interval = "1s", intervals: Sequence[Interval] = ()):
+        self.base = base
+        self._agg = BarAggregator(base, history=0)
+        self._levels: Dict[str, _Rollup] = {base: _Rollup(base, self._agg._step)}
+        self._children: Dict[str, List[str]] = {base: []}
+        self._aliases: Dict[str, str] = {}  # other names for a level, e.g. "60s" -> "1m"
+        for interval in intervals:
+            self.add_interval(interval)
+
+    @classmethod
+    def from_bars(cls, bars: pd.DataFrame, base: Interval = "1s", intervals: Sequence[Interval] = ()) -> "BarCascade":
+        """Start from existing `base` bars (`ticks_to_ohlcv` layout or flat columns)."""
+        cascade = cls(base)
+        if not bars.empty:
+            if not isinstance(bars.index, pd.MultiIndex):
+                bars = bars.set_index(["symbol", "timestamp"]).sort_index()
+            cascade._levels[base].frame = bars[["open", "high", "low", "close", "volume"]]
+        for interval in intervals:
+            cascade.add_interval(interval)
+        return cascade
+
+    @property
+    def intervals(self) -> List[str]:
+        return sorted(self._levels, key=lambda i: self._levels[i].step)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the closed bars of every level."""
+        return sum(int(lv.frame.memory_usage(index=True).sum()) for lv in self._levels.values())
+
+    def add_interval(self, interval: Interval) -> None:
+        """Register a coarser level, seeded from its parent's closed bars.
+
+        Another name for an existing level (e.g. "60s" next to "1m") becomes
+        an alias of it rather than a level of its own.
+        """
+        if interval in self._levels or interval in self._aliases:
+            return
+        step = _interval_ns(interval)
+        if step % self._agg._step:
+            raise ValueError(f"Interval {interval} is not a multiple of the base interval {self.base}")
+        same = [i for i, lv in self._levels.items() if lv.step == step]
+        if same:
+            self._aliases[interval] = same[0]
+            return
+        parent = max((i for i, lv in self._levels.items() if lv.step < step and step % lv.step == 0),
+                     key=lambda i: self._levels[i].step)
+        level = _Rollup(interval, self._levels[parent].step)
+        history = self._levels[parent].bars(include_open=False)
+        if not history.empty:
+            level.frame = resample_bars(history, interval)
+            self._open_tail(level, history)
+        self._levels[interval] = level
+        self._children[interval] = []
+        self._children[parent].append(interval)
+
+    @staticmethod
+    def _open_tail(level: _Rollup, parent: pd.DataFrame) -> None:
+        """Move each symbol's last coarse bar back to open if its parent bars are incomplete."""
+        frame = level.frame
+        sym = frame.index.get_level_values(0).to_numpy()
+        ts = frame.index.get_level_values(1).asi8
+        last = np.flatnonzero(np.r_[sym[1:] != sym[:-1], True])
+        psym = parent.index.get_level_values(0).to_numpy()
+        plast = parent.index.get_level_values(1).asi8[np.flatnonzero(np.r_[psym[1:] != psym[:-1], True])]
+        rows = last[ts[last] + level.step > plast + level.source_step]
+        for i in rows:
+            level.open[sym[i]] = [int(ts[i]), *frame.iloc[i][["open", "high", "low", "close", "volume"]].tolist()]
+        if len(rows):
+            level.frame = frame.drop(frame.index[rows])
+
+    def _push(self, interval: str, records: List[tuple], out: Dict[str, List[tuple]]) -> None:
+        closed = self._levels[interval].roll(records)
+        out.setdefault(interval, []).extend(closed)
+        for child in self._children[interval]:
+            self._push(child, closed, out)
+
+    def update_records(self, ticks: pd.DataFrame) -> Dict[str, List[tuple]]:
+        """Consume a tick batch; return the bars closed at each level as tuples."""
+        out: Dict[str, List[tuple]] = {}
+        self._push(self.base, self._agg.update_records(ticks), out)
+        return out
+
+    def flush(self) -> Dict[str, List[tuple]]:
+        """Close every open bar at every level."""
+        out: Dict[str, List[tuple]] = {}
+        self._push(self.base, self._agg.flush_records(), out)
+        for interval in self.intervals:
+            closed = self._levels[interval].flush()
+            out.setdefault(interval, []).extend(closed)
+            for child in self._children[interval]:
+                self._push(child, closed, out)
+        return out
+
+    def bars(self, interval: Optional[Interval] = None, include_open: bool = True) -> pd.DataFrame:
+        """Bars of `interval` (default: base) in the `ticks_to_ohlcv` layout.
+
+        Open bars of coarser levels reflect the finer bars closed so far.
+        """
+        interval = interval or self.base
+        self.add_interval(interval)
+        interval = self._aliases.get(interval, interval)
+        bars = self._levels[interval].bars(include_open)
+        if include_open and interval == self.base and self._agg._open:
+            open_bars = self._agg.bars(include_open=True)
+            bars = open_bars if bars.empty else pd.concat([bars, open_bars]).sort_index()
+        return bars
@@ -0,0 +1,253 @@
+"""Persistent tick/bar store partitioned by symbol and UTC day.
+
+Layout::
+
+    root/ticks/<symbol>/<YYYY-MM-DD>/{timestamp,price,quantity}.bin
+    root/bars_<interval>/<symbol>/<YYYY-MM-DD>/{timestamp,open,high,low,close,volume}.bin
+
+Each column is a raw little-endian NumPy array (int64 ns timestamps,
+float64 values) that appends simply extend. Reads memory-map only the
+partitions overlapping the requested time range and binary-search the
+timestamp column, so loading a week of bars touches a handful of files
+instead of re-parsing CSV. `compact()` rewrites partitions whose appends
+arrived out of order into sorted, de-duplicated columns.
+
+Compaction writes every column of a partition into a hidden sibling
+directory (``.<day>.compact``) and then swaps directories: the live one is
+renamed to ``.<day>.old``, the new one takes its place and the old one is
+removed. Readers fall back to ``.<day>.old`` while the swap is in flight,
+and the next `compact()` finishes or rolls back a swap interrupted by a
+crash, so a partition's columns always stay the same length.
+"""
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+import os
+import shutil
+import numpy as np
+import pandas as pd
+
+from src.storage import Interval, _to_ns
+
+TICK_COLUMNS: Dict[str, np.dtype] = {
+    "timestamp": np.dtype("<i8"),
+    "price": np.dtype("<f8"),
+    "quantity": np.dtype("<f8"),
+}
+BAR_COLUMNS: Dict[str, np.dtype] = {
+    "timestamp": np.dtype("<i8"),
+    "open": np.dtype("<f8"),
+    "high": np.dtype("<f8"),
+    "low": np.dtype("<f8"),
+    "close": np.dtype("<f8"),
+    "volume": np.dtype("<f8"),
+}
+
+_DAY_NS = 86_400 * 10**9
+TimeLike = Union[str, pd.Timestamp, None]
+
+
+def _day(ns: int) -> str:
+    return str(np.datetime64(ns // _DAY_NS, "D"))
+
+
+class PartitionedStore:
+    """Append-only columnar store of ticks and closed bars under `root`."""
+
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root)
+
+    def _dir(self, kind: str, symbol: str, day: str) -> Path:
+        return self.root / kind / symbol / day
+
+    @staticmethod
+    def _bars_kind(interval: str) -> str:
+        return f"bars_{interval}"
+
+    def _append(self, kind: str, schema: Dict[str, np.dtype], symbol: str, cols: Dict[str, np.ndarray]) -> None:
+        ts = cols["timestamp"]
+        days = ts // _DAY_NS
+        cuts = np.flatnonzero(np.diff(days)) + 1
+        for idx in np.split(np.arange(len(ts)), cuts):
+            if not len(idx):
+                continue
+            part = self._dir(kind, symbol, _day(int(ts[idx[0]])))
+            part.mkdir(parents=True, exist_ok=True)
+            for name, dtype in schema.items():
+                with open(part / f"{name}.bin", "ab") as f:
+                    f.write(np.ascontiguousarray(cols[name][idx], dtype=dtype).tobytes())
+
+    def append_ticks(self, ticks: pd.DataFrame) -> None:
+        """Append ticks in the usual schema (timestamp/symbol/price/quantity)."""
+        if ticks.empty:
+            return
+        ts = _to_ns(ticks["timestamp"])
+        for sym, idx in ticks.groupby("symbol", sort=False, observed=True).indices.items():
+            idx = idx[np.argsort(ts[idx], kind="stable")]
+            self._append("ticks", TICK_COLUMNS, sym, {
+                "timestamp": ts[idx],
+                "price": ticks["price"].to_numpy()[idx],
+                "quantity": ticks["quantity"].to_numpy()[idx],
+            })
+
+    def append_bars(self, bars: pd.DataFrame, interval: Interval = "1s") -> None:
+        """Append closed bars in the `ticks_to_ohlcv` (symbol, timestamp) layout."""
+        if bars.empty:
+            return
+        for sym, g in bars.groupby(level="symbol", sort=False):
+            cols = {name: g[name].to_numpy() for name in BAR_COLUMNS if name != "timestamp"}
+            cols["timestamp"] = g.index.get_level_values("timestamp").to_numpy(dtype="datetime64[ns]").view("int64")
+            self._append(self._bars_kind(interval), BAR_COLUMNS, sym, cols)
+
+    def symbols(self, kind: str = "ticks") -> List[str]:
+        base = self.root / kind
+        return sorted(p.name for p in base.iterdir() if p.is_dir()) if base.exists() else []
+
+    def _partitions(self, kind: str, symbol: str, start: Optional[int], end: Optional[int]) -> List[Path]:
+        base = self.root / kind / symbol
+        if not base.exists():
+            return []
+        lo = _day(start) if start is not None else ""
+        hi = _day(end) if end is not None else "9999"
+        names = {p.name for p in base.iterdir() if p.is_dir()}
+        # a day whose compaction swap is in flight is still readable from its old copy
+        days = {n for n in names if not n.startswith(".")}
+        days |= {n[1:-4] for n in names if n.startswith(".") and n.endswith(".old")}
+        return [base / d if d in names else base / f".{d}.old" for d in sorted(days) if lo <= d <= hi]
+
+    @staticmethod
+    def _recover(base: Path) -> None:
+        """Finish or roll back compaction swaps interrupted under `base`."""
+        for old in base.glob(".*.old"):
+            day = old.name[1:-4]
+            part, new = base / day, base / f".{day}.compact"
+            if not part.exists():
+                # crashed between the renames: the new copy is complete if it exists
+                os.rename(new if new.exists() else old, part)
+            if old.exists():
+                shutil.rmtree(old)
+        for new in base.glob(".*.compact"):
+            shutil.rmtree(new)  # crashed while writing; the live partition is untouched
+
+    @staticmethod
+    def _map(part: Path, schema: Dict[str, np.dtype]) -> Dict[str, np.ndarray]:
+        """Memory-map every column, trimmed to the rows all columns share."""
+        cols = {}
+        for name, dtype in schema.items():
+            path = part / f"{name}.bin"
+            size = path.stat().st_size // dtype.itemsize if path.exists() else 0
+            cols[name] = np.memmap(path, dtype=dtype, mode="r") if size else np.empty(0, dtype=dtype)
+        n = min(len(c) for c in cols.values())
+        return {name: c[:n] for name, c in cols.items()}
+
+    def _read(self, kind: str, schema: Dict[str, np.dtype], symbol: str,
+              start: TimeLike, end: TimeLike) -> Dict[str, np.ndarray]:
+        t0 = pd.Timestamp(start).value if start is not None else None
+        t1 = pd.Timestamp(end).value if end is not None else None
+        pieces = []
+        for part in self._partitions(kind, symbol, t0, t1):
+            cols = self._map(part, schema)
+            ts = cols["timestamp"]
+            if len(ts) and np.all(ts[1:] >= ts[:-1]):
+                i0 = np.searchsorted(ts, t0, "left") if t0 is not None else 0
+                i1 = np.searchsorted(ts, t1, "left") if t1 is not None else len(ts)
+                sel = slice(i0, i1)
+            else:
+                sel = np.ones(len(ts), dtype=bool)
+                if t0 is not None:
+                    sel &= ts >= t0
+                if t1 is not None:
+                    sel &= ts < t1
+            pieces.append({name: c[sel] for name, c in cols.items()})
+        if not pieces:
+            return {name: np.empty(0, dtype=dtype) for name, dtype in schema.items()}
+        if len(pieces) == 1:
+            return pieces[0]
+        return {name: np.concatenate([p[name] for p in pieces]) for name in schema}
+
+    def read_ticks(self, symbols: Iterable[str], start: TimeLike = None, end: TimeLike = None) -> pd.DataFrame:
+        """Ticks with start <= timestamp < end, in the tick schema."""
+        frames = []
+        for sym in symbols:
+            cols = self._read("ticks", TICK_COLUMNS, sym, start, end)
+            frames.append(pd.DataFrame({
+                "timestamp": pd.DatetimeIndex(cols["timestamp"].view("datetime64[ns]")),
+                "symbol": sym,
+                "price": cols["price"],
+                "quantity": cols["quantity"],
+            }))
+        if not frames:
+            return pd.DataFrame(columns=["timestamp", "symbol", "price", "quantity"])
+        return pd.concat(frames, ignore_index=True)
+
+    def read_bars(self, symbols: Iterable[str], interval: Interval = "1s",
+                  start: TimeLike = None, end: TimeLike = None) -> pd.DataFrame:
+        """Bars with start <= timestamp < end in the `ticks_to_ohlcv` layout."""
+        syms, parts = [], []
+        for sym in sorted(symbols):
+            cols = self._read(self._bars_kind(interval), BAR_COLUMNS, sym, start, end)
+            if len(cols["timestamp"]):
+                syms.append(sym)
+                parts.append(cols)
+        if not parts:
+            return pd.DataFrame()
+        lengths = [len(p["timestamp"]) for p in parts]
+        ts = np.concatenate([p["timestamp"] for p in parts])
+        # build the index from codes directly; factorizing repeated symbol strings is the slow part
+        levels, ts_codes = np.unique(ts, return_inverse=True)
+        index = pd.MultiIndex(
+            levels=[pd.Index(syms, dtype=object), pd.DatetimeIndex(levels.view("datetime64[ns]"))],
+            codes=[np.repeat(np.arange(len(syms)), lengths), ts_codes],
+            names=["symbol", "timestamp"],
+            verify_integrity=False,
+        )
+        data = {name: np.concatenate([p[name] for p in parts]) for name in BAR_COLUMNS if name != "timestamp"}
+        return pd.DataFrame(data, index=index)
+
+    def compact(self, kind: Optional[str] = None) -> int:
+        """Sort and de-duplicate partitions appended out of order.
+
+        Duplicate timestamps in bar partitions keep the last appended bar;
+        tick partitions keep every tick. Returns the number of partitions
+        rewritten. A partition's columns are replaced together by a directory
+        swap; swaps interrupted by a crash are completed or rolled back first.
+        """
+        if kind is not None:
+            kinds = [kind]
+        else:
+            kinds = [p.name for p in self.root.iterdir() if p.is_dir()] if self.root.exists() else []
+        rewritten = 0
+        for k in kinds:
+            schema = TICK_COLUMNS if k == "ticks" else BAR_COLUMNS
+            for sym in self.symbols(k):
+                self._recover(self.root / k / sym)
+                for part in self._partitions(k, sym, None, None):
+                    cols = self._map(part, schema)
+                    ts = cols["timestamp"]
+                    ordered = ts[1:] >= ts[:-1] if k == "ticks" else ts[1:] > ts[:-1]
+                    if ordered.all():
+                        continue
+                    order = np.argsort(ts, kind="stable")
+                    if k != "ticks":
+                        # keep the last bar written for each timestamp
+                        rev = order[::-1]
+                        _, first = np.unique(ts[rev], return_index=True)
+                        order = rev[first]
+                    out = {name: np.asarray(c[order]) for name, c in cols.items()}
+                    del cols, ts
+                    self._swap(part, {name: out[name].astype(dtype) for name, dtype in schema.items()})
+                    rewritten += 1
+        return rewritten
+
+    @staticmethod
+    def _swap(part: Path, cols: Dict[str, np.ndarray]) -> None:
+        """Replace every column of `part` at once (see the module docstring)."""
+        new, old = part.parent / f".{part.name}.compact", part.parent / f".{part.name}.old"
+        new.mkdir()
+        for name, values in cols.items():
+            with open(new / f"{name}.bin", "wb") as f:
+                values.tofile(f)
+                f.flush()
+                os.fsync(f.fileno())
+        os.rename(part, old)
+        os.rename(new, part)
+        shutil.rmtree(old)
@@ -1,33 +1,249 @@
-"""Minimal WebSocket client abstraction.
+"""Binance WebSocket ingestion.
 
-This is intentionally lightweight: the real project would implement robust
-reconnects, buffering, and backpressure.
+A single connection subscribes to the combined trade streams of all
+symbols. Messages are parsed on a fast JSON path and grouped into
+micro-batches (every `batch_size` ticks or `batch_ms` milliseconds,
+whichever comes first) which are handed either to an `on_message`
+callback or to a bounded queue with a drop/block backpressure policy.
+Dropped connections are retried with jittered exponential backoff.
+Connection errors and exceptions raised by `on_message` are logged, counted
+in `stats` and kept in `last_error`; a failing callback loses its batch but
+does not drop the connection.
+
+The asyncio loop runs in a daemon thread so callers keep the simple
+`start()` / `stop()` interface.
 """
-from typing import Callable, Optional
+from typing import Callable, Dict, Iterable, List, Literal, Optional
+import asyncio
+import logging
+import queue
+import random
 import threading
-import time
+
+try:  # fast path; the stdlib parser is a drop-in fallback
+    import orjson as _json
+
+    _loads = _json.loads
+except ImportError:  # pragma: no cover - depends on environment
+    import json as _json
+
+    _loads = _json.loads
+
+from src.metrics import REGISTRY, timer
+
+log = logging.getLogger(__name__)
+
+BINANCE_FUTURES_WS = "wss://fstream.binance.com"
+
+Policy = Literal["drop_oldest", "drop_newest", "block"]
+
+
+def combined_stream_url(symbols: Iterable[str], base: str = BINANCE_FUTURES_WS, stream: str = "aggTrade") -> str:
+    """URL of the combined `<symbol>@<stream>` feed for all symbols."""
+    streams = "/".join(f"{s.lower()}@{stream}" for s in symbols)
+    return f"{base}/stream?streams={streams}"
+
+
+def parse_trade(raw) -> Optional[dict]:
+    """Normalise one (combined or raw) trade frame into the tick schema.
+
+    Returns ``{"timestamp": <epoch ms>, "symbol", "price", "quantity"}`` or
+    None for frames that are not trades (e.g. subscription acks).
+    """
+    try:
+        msg = _loads(raw)
+    except ValueError:
+        return None
+    data = msg.get("data", msg) if isinstance(msg, dict) else None
+    if not isinstance(data, dict) or "p" not in data:
+        return None
+    return {
+        "timestamp": int(data.get("T") or data["E"]),
+        "symbol": data["s"],
+        "price": float(data["p"]),
+        "quantity": float(data["q"]),
+    }
 
 
 class WebsocketClient:
-    def __init__(self, on_message: Callable[[dict], None], source: str = "binance"):
+    """Asyncio trade-stream client delivering micro-batches of tick dicts.
+
+    If `on_message` is given it is called with every batch (a list of tick
+    dicts) from the ingestion thread; otherwise batches are put on
+    `self.queue` and consumers call `get_batch()`. When the queue is full,
+    `policy` decides whether to drop the oldest batch, drop the new one or
+    block ingestion (which stops reading the socket and lets TCP push back;
+    the event loop keeps running, so keepalive pings are still answered).
+    """
+
+    def __init__(
+        self,
+        on_message: Optional[Callable[[List[dict]], None]] = None,
+        source: str = "binance",
+        symbols: Iterable[str] = ("btcusdt", "ethusdt"),
+        url: Optional[str] = None,
+        batch_size: int = 500,
+        batch_ms: float = 100.0,
+        queue_size: int = 1000,
+        policy: Policy = "drop_oldest",
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+    ):
+        if policy not in ("drop_oldest", "drop_newest", "block"):
+            raise ValueError(f"Unknown backpressure policy: {policy}")
         self.on_message = on_message
         self.source = source
+        self.symbols = [s.lower() for s in symbols]
+        self.url = url or combined_stream_url(self.symbols)
+        self.batch_size = batch_size
+        self.batch_ms = batch_ms
+        self.policy = policy
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.queue: "queue.Queue[List[dict]]" = queue.Queue(maxsize=queue_size)
+        self.stats: Dict[str, int] = {"messages": 0, "batches": 0, "dropped": 0, "reconnects": 0,
+                                      "errors": 0, "callback_errors": 0}
+        self.last_error: Optional[BaseException] = None
         self._running = False
         self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
 
-    def _run_loop(self):
-        # Placeholder: in production, connect to Binance websockets
+    async def _deliver(self, batch: List[dict]) -> None:
+        self.stats["batches"] += 1
+        if self.on_message is not None:
+            try:
+                self.on_message(batch)
+            except Exception as exc:
+                self.stats["callback_errors"] += 1
+                self.last_error = exc
+                log.exception("on_message callback failed; batch of %d ticks lost", len(batch))
+            return
+        if self.policy == "block":
+            # poll instead of a blocking put so the loop keeps serving the socket's pings
+            while self._running:
+                try:
+                    self.queue.put_nowait(batch)
+                    return
+                except queue.Full:
+                    await asyncio.sleep(0.005)
+            return
+        try:
+            self.queue.put_nowait(batch)
+            return
+        except queue.Full:
+            pass
+        if self.policy == "drop_newest":
+            self.stats["dropped"] += len(batch)
+            return
+        try:
+            self.stats["dropped"] += len(self.queue.get_nowait())
+        except queue.Empty:
+            pass
+        try:
+            self.queue.put_nowait(batch)
+        except queue.Full:
+            self.stats["dropped"] += len(batch)
+
+    async def _consume(self, ws) -> None:
+        batch: List[dict] = []
+        lock = asyncio.Lock()  # keeps batches in order while a blocked delivery waits
+
+        async def deliver(out: List[dict]) -> None:
+            async with lock:
+                await self._deliver(out)
+
+        async def flush_periodically():
+            nonlocal batch
+            while True:
+                await asyncio.sleep(self.batch_ms / 1000.0)
+                if batch:
+                    out, batch = batch, []
+                    await deliver(out)
+
+        flusher = asyncio.ensure_future(flush_periodically())
+        try:
+            async for raw in ws:
+                with timer("parse"):
+                    tick = parse_trade(raw)
+                if tick is None:
+                    continue
+                self.stats["messages"] += 1
+                batch.append(tick)
+                if len(batch) >= self.batch_size:
+                    out, batch = batch, []
+                    await deliver(out)
+        finally:
+            flusher.cancel()
+            if batch:
+                await deliver(batch)
+
+    async def _run(self) -> None:
+        import websockets
+
+        attempt = 0
         while self._running:
-            time.sleep(1.0)
+            try:
+                async with websockets.connect(self.url, max_size=None) as ws:
+                    attempt = 0
+                    await self._consume(ws)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                self.stats["errors"] += 1
+                self.last_error = exc
+                log.warning("websocket connection to %s failed: %r", self.url, exc)
+            if not self._running:
+                break
+            # full jitter: sleep uniformly in [0, min(cap, base * 2**attempt)]
+            self.stats["reconnects"] += 1
+            delay = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+            attempt += 1
+            await asyncio.sleep(random.uniform(0, delay))
+
+    def _run_loop(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._task = self._loop.create_task(self._run())
+        try:
+            self._loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._loop.close()
+
+    def _collect_metrics(self) -> Dict[str, float]:
+        return {
+            "ws_queue_depth": self.queue.qsize(),
+            "ws_messages_total": self.stats["messages"],
+            "ws_dropped_total": self.stats["dropped"],
+            "ws_reconnects_total": self.stats["reconnects"],
+            "ws_errors_total": self.stats["errors"],
+            "ws_callback_errors_total": self.stats["callback_errors"],
+        }
 
     def start(self):
         if self._running:
             return
         self._running = True
+        REGISTRY.register_collector(f"ws-{id(self)}", self._collect_metrics)
         self._thread = threading.Thread(target=self._run_loop, daemon=True)
         self._thread.start()
 
     def stop(self):
         self._running = False
+        REGISTRY.unregister_collector(f"ws-{id(self)}")
+        if self._loop is not None and self._task is not None and not self._loop.is_closed():
+            try:
+                self._loop.call_soon_threadsafe(self._task.cancel)
+            except RuntimeError:
+                pass
         if self._thread is not None:
             self._thread.join(timeout=1.0)
+
+    def get_batch(self, timeout: Optional[float] = None) -> Optional[List[dict]]:
+        """Next queued batch, or None if none arrived within `timeout` seconds."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
@@ -19,12 +19,15 @@ import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
 
-from src.storage import ticks_to_ohlcv
-from src.analytics import ols_hedge_ratio, construct_spread, rolling_zscore, adf_test, rolling_corr
-from src.alerts import zscore_alerts
-from tools.gen_synthetic_ticks import gen
+from src import metrics
+from src.pipeline import AnalyticsPipeline
+from src.alerts import AlertEngine, zscore_rule
+from src.export import FORMATS, MIME, export_bytes
+from src.loader import load_bars
+from src.storage import compact_ticks
 
 st.set_page_config(page_title="Realtime Quant — Professional Site", layout="wide")
+metrics.enable()
 
 # --- CSS / styling ---
 with open(Path(__file__).parent / "assets" / "style.css", "r") as f:
@@ -41,26 +44,52 @@ with st.sidebar:
         n = st.number_input("Ticks per symbol", min_value=120, max_value=100000, value=600, step=60)
         symbols = st.text_input("Symbols (space-separated)", value="SYM1 SYM2").strip().split()
         if st.button("Generate demo"):
+            from tools.gen_synthetic_ticks import gen  # only needed for demo data
+
             frames = [gen(s, n=n, seed=42 + i) for i, s in enumerate(symbols)]
-            st.session_state["df"] = pd.concat(frames).sort_values("timestamp").reset_index(drop=True)
+            st.session_state["df"] = compact_ticks(pd.concat(frames).sort_values("timestamp").reset_index(drop=True))
     else:
-        uploaded = st.file_uploader("Upload CSV", type=["csv"])
-        if uploaded is not None:
-            st.session_state["df"] = pd.read_csv(uploaded)
+        uploaded = st.file_uploader("Upload ticks (CSV or Parquet)", type=["csv", "parquet"])
+        if uploaded is not None and st.session_state.get("upload_id") != (uploaded.name, uploaded.size):
+            # stream the file into 1s bars; coarser intervals are resampled from them
+            st.session_state["df"] = load_bars(uploaded, "1s").reset_index()
+            st.session_state["upload_id"] = (uploaded.name, uploaded.size)
 
     st.markdown("---")
     st.subheader("Analytics")
-    interval = st.selectbox("OHLCV interval", ["1s", "1m", "5m"], index=0)
+    interval = st.selectbox("OHLCV interval", ["1s", "15s", "1m", "5m", "15m", "1h"], index=0)
     rolling_window = st.slider("Rolling window (periods)", 10, 500, 60, 10)
     z_threshold = st.slider("Z-score alert threshold", 1.0, 5.0, 2.0, 0.1)
+    # charts get about this many buckets (min/max pairs) per trace whatever the history length
+    chart_points = st.slider("Chart detail (buckets per trace)", 200, 4000, 1500, 100)
     st.markdown("---")
     st.markdown("**Exports**")
+    export_fmt = st.selectbox("Pair export format", FORMATS, index=0)
     st.checkbox("Enable PNG export", value=True, key="enable_png")
+    st.markdown("---")
+    st.markdown("**Latency metrics**")
+    metrics_url = st.text_input("Metrics endpoint (blank = this session)", value="",
+                                placeholder="http://127.0.0.1:9108/metrics").strip()
 
 # Helper
 def ensure_data() -> pd.DataFrame:
     return st.session_state.get("df")
 
+
+def pipeline() -> AnalyticsPipeline:
+    """Per-session cache of bars and pair analytics."""
+    if "pipeline" not in st.session_state:
+        st.session_state["pipeline"] = AnalyticsPipeline()
+    return st.session_state["pipeline"]
+
+
+def alert_engine(threshold: float) -> AlertEngine:
+    """Per-session alert state; rebuilt when the threshold changes."""
+    engine = st.session_state.get("alert_engine")
+    if engine is None or engine.rules[0].enter != threshold:
+        engine = st.session_state["alert_engine"] = AlertEngine([zscore_rule(threshold, exit=0.5)])
+    return engine
+
 # Main layout: tabs
 df = ensure_data()
 if df is None:
@@ -84,40 +113,54 @@ with col2:
     if symbol_a == symbol_b:
         st.warning("Symbol A and B are the same — select two different symbols for pair analytics")
 
-# compute OHLCV bars
-ohlcv = ticks_to_ohlcv(df, interval=interval)
+# compute OHLCV bars (cached per dataset and interval)
+pipe = pipeline()
+if pipe.bars(df, interval).empty:
+    st.info(f"No {interval} bars in this dataset. Pick a different interval or load more data.")
+    st.stop()
+close_df = pipe.closes(df, interval)
+
+# visible time range; the chart resolution follows it
+t_first, t_last = close_df.index[0].to_pydatetime(), close_df.index[-1].to_pydatetime()
+visible = (t_first, t_last)
+if t_last > t_first:
+    visible = st.slider("Visible range", min_value=t_first, max_value=t_last, value=(t_first, t_last),
+                        format="YYYY-MM-DD HH:mm:ss")
+
+
+def lod_view(key, data):
+    """Downsampled rows of a cached series for the visible range (see `src.lod`)."""
+    return pipe.pyramid(df, key, data).view(visible[0], visible[1], width=chart_points)
+
 
 # Overview: combined price plot
 st.subheader("Overview")
-close_df = ohlcv["close"].unstack(level=0)
 
 fig = go.Figure()
-for sym in close_df.columns:
-    fig.add_trace(go.Scatter(x=close_df.index, y=close_df[sym], mode="lines", name=sym))
+close_view = lod_view(("closes", interval), lambda: close_df)
+for sym in close_view.columns:
+    fig.add_trace(go.Scatter(x=close_view.index, y=close_view[sym], mode="lines", name=sym))
 fig.update_layout(title="Close Price — All Symbols", xaxis_title="Time", yaxis_title="Price")
 st.plotly_chart(fig, use_container_width=True)
 
 # Pair analytics
 st.subheader("Pair Analytics")
 try:
-    a = close_df[symbol_a].dropna()
-    b = close_df[symbol_b].dropna()
-    pair = pd.concat([a, b], axis=1).dropna()
-    a = pair.iloc[:, 0]
-    b = pair.iloc[:, 1]
+    a, b = pipe.pair(df, interval, symbol_a, symbol_b)
 
-    beta = ols_hedge_ratio(a, b)
+    beta = pipe.hedge_ratio(df, interval, symbol_a, symbol_b)
     st.markdown(f"**OLS hedge ratio (A ~ B):** `{beta:.6f}`")
 
-    spread = construct_spread(a, b, beta)
-    z = rolling_zscore(spread, window=rolling_window)
-    corr = rolling_corr(a, b, window=rolling_window)
+    spread = pipe.spread(df, interval, symbol_a, symbol_b)
+    z = pipe.zscore(df, interval, symbol_a, symbol_b, window=rolling_window)
+    corr = pipe.corr(df, interval, symbol_a, symbol_b, window=rolling_window)
 
     # spread + zscore plot
-    fig2 = make_subplots_rows = None
     fig2 = go.Figure()
-    fig2.add_trace(go.Scatter(x=spread.index, y=spread.values, name="spread", yaxis="y1"))
-    fig2.add_trace(go.Scatter(x=z.index, y=z.values, name="zscore", yaxis="y2"))
+    sz = lod_view(("spread_z", interval, symbol_a, symbol_b, rolling_window),
+                  lambda: pd.DataFrame({"spread": spread, "zscore": z}))
+    fig2.add_trace(go.Scatter(x=sz.index, y=sz["spread"].values, name="spread", yaxis="y1"))
+    fig2.add_trace(go.Scatter(x=sz.index, y=sz["zscore"].values, name="zscore", yaxis="y2"))
     fig2.update_layout(
         title=f"Spread and Rolling Z-score ({rolling_window})",
         xaxis=dict(title="Time"),
@@ -128,24 +171,28 @@ try:
 
     # rolling correlation
     fig3 = go.Figure()
-    fig3.add_trace(go.Scatter(x=corr.index, y=corr.values, name="rolling_corr"))
+    corr_view = lod_view(("corr", interval, symbol_a, symbol_b, rolling_window), lambda: corr)
+    fig3.add_trace(go.Scatter(x=corr_view.index, y=corr_view.values, name="rolling_corr"))
     fig3.update_layout(title=f"Rolling Correlation ({rolling_window})", yaxis=dict(range=[-1, 1]))
     st.plotly_chart(fig3, use_container_width=True)
 
     # ADF
-    adf_res = adf_test(spread)
+    adf_res = pipe.adf(df, interval, symbol_a, symbol_b)
     st.code(adf_res)
 
     # alerts
-    alerts = zscore_alerts(z, threshold=z_threshold)
-    st.markdown(f"**Alerts:** {len(alerts)} where |z| > {z_threshold}")
+    engine = alert_engine(z_threshold)
+    key = (pipe.dataset_key(df), interval, symbol_a, symbol_b, rolling_window)
+    engine.evaluate(key, z.rename("zscore"))
+    alerts = [{"timestamp": a["timestamp"], "zscore": a["value"]} for a in engine.history if a["pair"] == key]
+    st.markdown(f"**Alerts:** {len(alerts)} excursions where |z| > {z_threshold} (re-armed below 0.5)")
     if alerts:
         st.dataframe(pd.DataFrame(alerts))
 
-    # export
-    export_df = pd.concat([a.rename(symbol_a), b.rename(symbol_b), spread.rename("spread"), z.rename("zscore")], axis=1)
-    csv = export_df.to_csv()
-    st.download_button("Download pair CSV", csv, file_name="pair_analysis.csv", mime="text/csv")
+    # export, generated only when the download is clicked
+    columns = {symbol_a: a, symbol_b: b, "spread": spread, "zscore": z}
+    st.download_button(f"Download pair {export_fmt}", data=lambda: export_bytes(columns, export_fmt),
+                       file_name=f"pair_analysis.{export_fmt}", mime=MIME[export_fmt], on_click="ignore")
 
     if st.session_state.get("enable_png"):
         # PNG snapshot of the spread chart — require Kaleido for fig.to_image
@@ -163,5 +210,26 @@ try:
 except Exception as exc:  # pragma: no cover - UI-run only
     st.error(f"Error computing pair analytics: {exc}")
 
+# Universe-wide scan
+st.subheader("Pair Scanner")
+if st.button("Scan all pairs"):
+    try:
+        st.dataframe(pipe.scan(df, interval), use_container_width=True)
+    except Exception as exc:  # pragma: no cover - UI-run only
+        st.error(f"Error scanning pairs: {exc}")
+
+# Per-stage latency (this session's pipeline, or a daemon's /metrics endpoint)
+st.subheader("Stage Latency")
+try:
+    rows = metrics.read_prometheus(metrics_url) if metrics_url else metrics.stage_summary()
+    if rows:
+        table = pd.DataFrame(rows).set_index("stage")
+        st.dataframe(table[[c for c in ("count", "p50_ms", "p99_ms", "max_ms") if c in table]],
+                     use_container_width=True)
+    else:
+        st.caption("No stage timings recorded yet.")
+except Exception as exc:  # pragma: no cover - UI-run only
+    st.error(f"Error reading metrics: {exc}")
+
 st.markdown("---")
 st.caption("This site is a presentation layer. Replace the demo generator with a WebSocket source for live data ingestion while keeping the same analytics pipeline.")
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.stattools import adfuller, coint
+from src.adf import ADFLagCache, adf_batch, adf_fast, engle_granger
+
+
+def _arma(n=600, phi=0.95, seed=0):
+    rng = np.random.default_rng(seed)
+    e = rng.normal(size=n)
+    x = np.zeros(n)
+    for t in range(1, n):
+        x[t] = phi * x[t - 1] + e[t] + 0.3 * e[t - 1]
+    return 100 + x
+
+
+def test_adf_fast_matches_adfuller():
+    x = _arma()
+    ref = adfuller(x)
+    res = adf_fast(pd.Series(x))
+    assert abs(res["statistic"] - ref[0]) < 1e-8
+    assert abs(res["pvalue"] - ref[1]) < 1e-8
+    assert (res["usedlag"], res["nobs"]) == (ref[2], ref[3])
+    fixed = adfuller(x, maxlag=3, autolag=None)
+    res = adf_fast(pd.Series(x), lag=3)
+    assert abs(res["statistic"] - fixed[0]) < 1e-8 and res["usedlag"] == 3
+
+
+def test_adf_batch_rows_match_single_and_cache():
+    batch = np.vstack([_arma(phi=p, seed=i) for i, p in enumerate([0.5, 0.9, 0.99, 1.0])])
+    out = adf_batch(batch)
+    for row, x in zip(out.itertuples(), batch):
+        ref = adfuller(x)
+        assert abs(row.statistic - ref[0]) < 1e-8 and row.usedlag == ref[2]
+    cache = ADFLagCache()
+    first = cache.test("pair", pd.Series(batch[1]))
+    again = cache.test("pair", pd.Series(batch[1][50:]))
+    assert len(cache) == 1 and again["usedlag"] == first["usedlag"]
+
+
+def test_engle_granger_matches_coint():
+    rng = np.random.default_rng(4)
+    x = 50 + rng.normal(size=800).cumsum()
+    y = 3 + 2 * x + rng.normal(scale=2, size=800)
+    ref = coint(y, x)
+    res = engle_granger(pd.Series(y), pd.Series(x))
+    assert abs(res["statistic"] - ref[0]) < 1e-8
+    assert abs(res["pvalue"] - ref[1]) < 1e-8
+    assert abs(res["hedge_ratio"] - 2) < 0.05
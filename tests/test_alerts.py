@@ -1,5 +1,8 @@
 import pandas as pd
-from src.alerts import zscore_alerts
+from src.alerts import (
+    AlertDispatcher, AlertEngine, FileSink, QueueSink, Rule,
+    corr_breakdown_rule, hedge_drift_rule, zscore_alerts, zscore_rule,
+)
 
 
 def test_zscore_alerts():
@@ -7,4 +10,32 @@ def test_zscore_alerts():
     z = pd.Series([0.0, 1.0, 2.5, -3.0, 0.5], index=idx)
     alerts = zscore_alerts(z, threshold=2.0)
     assert len(alerts) == 2
-    assert any(a["zscore"] < 0 for a in alerts)
\ No newline at end of file
+    assert any(a["zscore"] < 0 for a in alerts)
+
+
+def test_engine_hysteresis_cooldown_and_incremental():
+    idx = pd.date_range("2025-01-01", periods=8, freq="1s")
+    z = pd.Series([0.0, 2.5, 3.0, 1.0, 2.6, 0.2, 2.7, 0.0], index=idx, name="zscore")
+    engine = AlertEngine([zscore_rule(2.0, exit=0.5)])
+    fired = engine.evaluate("A/B", z)
+    # the excursion 2.5 -> 3.0 -> 1.0 -> 2.6 is one episode; re-armed at 0.2
+    assert [a["timestamp"] for a in fired] == [idx[1], idx[6]]
+    assert engine.evaluate("A/B", z) == []
+    assert engine.update("A/B", idx[-1] + pd.Timedelta("1s"), zscore=-4.0)[0]["value"] == -4.0
+
+    slow = AlertEngine([Rule("z", "zscore", 2.0, 0.5, cooldown="10s")])
+    assert len(slow.evaluate("A/B", z)) == 1
+
+
+def test_engine_dispatches_to_sinks(tmp_path):
+    sink = QueueSink()
+    dispatcher = AlertDispatcher([sink, FileSink(str(tmp_path / "alerts.jsonl"))]).start()
+    engine = AlertEngine([corr_breakdown_rule(0.5, exit=0.6), hedge_drift_rule(0.1)], dispatcher=dispatcher)
+    t0 = pd.Timestamp("2025-01-01")
+    engine.update(("A", "B"), t0, corr=0.9, hedge_ratio=2.0)
+    engine.update(("A", "B"), t0 + pd.Timedelta("1s"), corr=0.3, hedge_ratio=2.5)
+    dispatcher.stop()
+    got = sorted(sink.get(timeout=1)["rule"] for _ in range(2))
+    assert got == ["corr_breakdown", "hedge_drift"]
+    assert len((tmp_path / "alerts.jsonl").read_text().splitlines()) == 2
+    assert dispatcher.stats["delivered"] == 2
@@ -1,6 +1,6 @@
 import numpy as np
 import pandas as pd
-from src.analytics import ols_hedge_ratio, rolling_zscore, adf_test, construct_spread, rolling_corr
+from src.analytics import ols_hedge_ratio, rolling_zscore, adf_test, construct_spread, rolling_corr, rolling_hedge_ratio
 
 
 def test_ols_hedge_ratio():
@@ -43,3 +43,12 @@ def test_adf_on_stationary_series():
     s = pd.Series(x)
     res = adf_test(s)
     assert res["pvalue"] < 0.1
+
+
+def test_rolling_hedge_ratio():
+    rng = np.random.default_rng(3)
+    x = pd.Series(np.linspace(0, 10, 300))
+    y = 1.5 * x + rng.normal(scale=0.01, size=x.shape)
+    beta = rolling_hedge_ratio(y, x, window=50)
+    assert beta.iloc[:49].isna().all()
+    assert abs(beta.iloc[-1] - ols_hedge_ratio(y.iloc[-50:], x.iloc[-50:])) < 1e-9
@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+from src.backtest import backtest_pair, positions, sweep
+
+
+def test_positions_hysteresis():
+    z = pd.Series([0.0, 2.5, 1.0, 0.2, -2.1, -1.0, 0.0])
+    assert positions(z, entry=2.0, exit=0.5).tolist() == [0, -1, -1, 0, 1, 1, 0]
+
+
+def test_backtest_pnl_by_hand():
+    sig = pd.DataFrame({
+        "a": [10.0, 11.0, 10.0, 10.0],
+        "b": [5.0, 5.0, 6.0, 6.0],
+        "hedge_ratio": [2.0, 2.0, 3.0, 3.0],
+        "zscore": [0.0, 2.5, 0.1, 0.0],
+    })
+    frame, summary = backtest_pair(sig, entry=2.0, exit=0.5, cost_bps=10)
+    # short 1 A / long 2 B at bar 1 (beta frozen at 2): -1 * (10 - 11) + 2 * (6 - 5) = 3
+    assert frame["pnl"].tolist() == [0.0, 0.0, 3.0, 0.0]
+    assert summary["trades"] == 1
+    assert np.isclose(summary["turnover"], (11 + 2 * 5) + (10 + 2 * 6))
+    assert np.isclose(summary["pnl"], 3.0 - summary["turnover"] * 1e-3)
+
+
+def test_sweep_grid_serial_matches_pool():
+    rng = np.random.default_rng(2)
+    n = 900
+    ts = pd.date_range("2025-01-01", periods=n, freq="1s")
+    x = 100 + rng.normal(scale=0.1, size=n).cumsum()
+    y = 2 * x + rng.normal(scale=0.2, size=n)
+    ticks = pd.concat([pd.DataFrame({"timestamp": ts, "symbol": s, "price": p, "quantity": 1.0})
+                       for s, p in (("X", x), ("Y", y))]).sort_values("timestamp", kind="stable")
+    serial = sweep(ticks, [("Y", "X")], windows=[30, 60], thresholds=[1.5, 2.0], processes=1)
+    assert len(serial) == 4 and set(serial["window"]) == {30, 60}
+    pd.testing.assert_frame_equal(serial, sweep(ticks, [("Y", "X")], windows=[30, 60], thresholds=[1.5, 2.0], processes=2))
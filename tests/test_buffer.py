@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+from src.buffer import TickRingBuffer
+from src.storage import ticks_to_ohlcv
+from tools.gen_synthetic_ticks import gen
+
+
+def test_ring_buffer_keeps_latest_ticks_contiguous():
+    buf = TickRingBuffer(capacity=100)
+    df = gen("SYM", n=250)
+    for i in range(0, len(df), 30):
+        buf.extend(df.iloc[i:i + 30])
+    ts, price, qty = buf.view("SYM")
+    assert len(ts) == 100
+    np.testing.assert_array_equal(price, df["price"].to_numpy()[-100:])
+    np.testing.assert_array_equal(ts, df["timestamp"].to_numpy(dtype="datetime64[ns]").view("int64")[-100:])
+    # views share memory with the buffer
+    assert np.shares_memory(price, buf.view("SYM")[1])
+    assert len(buf.view("SYM", last=10)[0]) == 10
+    assert buf.nbytes == 2 * 100 * 3 * 8
+
+
+def test_ring_buffer_ohlcv_and_ws_batches():
+    buf = TickRingBuffer(capacity=1000)
+    df = pd.concat([gen("A", n=300, seed=1), gen("B", n=300, seed=2)]).sort_values("timestamp")
+    buf.extend(df)
+    expected = ticks_to_ohlcv(df.assign(quantity=df["quantity"].astype(float)), interval="1m")
+    pd.testing.assert_frame_equal(buf.ohlcv("1m"), expected)
+
+    ms = int(df["timestamp"].iloc[-1].value // 1_000_000) + 1000
+    buf.extend([{"timestamp": ms, "symbol": "A", "price": 1.0, "quantity": 2.0}])
+    assert buf.prices("A").iloc[-1] == 1.0
+    assert buf.prices("A").index[-1] == pd.Timestamp(ms, unit="ms")
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+from src.daemon import AnalyticsDaemon, BarSlicer, read_state
+from src.shm import SharedBarsReader
+from src.storage import BarAggregator
+
+
+def _ticks(n=900, seed=0):
+    rng = np.random.default_rng(seed)
+    ts = pd.date_range("2025-01-01", periods=n, freq="1s")
+    x = 100 + rng.normal(scale=0.1, size=n).cumsum()
+    y = 10 + 2 * x + rng.normal(scale=0.05, size=n)
+    z = 50 + rng.normal(scale=0.1, size=n).cumsum()
+    return pd.concat([
+        pd.DataFrame({"timestamp": ts, "symbol": s, "price": p, "quantity": 1.0})
+        for s, p in (("X", x), ("Y", y), ("Z", z))
+    ]).sort_values("timestamp", kind="stable").reset_index(drop=True)
+
+
+def test_slicer_waits_for_all_symbols():
+    agg, slicer = BarAggregator("1s"), BarSlicer("1s", symbols=["A", "B"])
+    t0 = pd.Timestamp("2025-01-01")
+    ticks = pd.DataFrame({"timestamp": [t0, t0 + pd.Timedelta("1s"), t0],
+                          "symbol": ["A", "A", "B"], "price": [1.0, 2.0, 3.0], "quantity": 1.0})
+    # A closed its first bar, B has not: nothing released yet
+    assert slicer.add(agg.update(ticks)) == []
+    later = pd.DataFrame({"timestamp": [t0 + pd.Timedelta("2s")], "symbol": ["B"], "price": [4.0], "quantity": 1.0})
+    released = slicer.add(agg.update(later))
+    assert released == [(t0.value, {"A": 1.0, "B": 3.0})]
+
+
+def test_daemon_sharded_matches_in_process_and_serves_state():
+    ticks = _ticks()
+    pairs = [("Y", "X"), ("Y", "Z"), ("X", "Z")]
+    local = AnalyticsDaemon(pairs, processes=0, adf_every=200).start()
+    sharded = AnalyticsDaemon(pairs, processes=2, adf_every=200, address=("127.0.0.1", 0)).start()
+    for i in range(0, len(ticks), 250):
+        local.process_ticks(ticks.iloc[i:i + 250])
+        sharded.process_ticks(ticks.iloc[i:i + 250])
+    local.stop()
+    served = read_state(sharded.server.address)
+    sharded.stop()
+    assert set(served["pairs"]) <= {"Y/X", "Y/Z", "X/Z"}
+    assert local.snapshot()["pairs"] == sharded.snapshot()["pairs"]
+    yx = local.state["Y/X"]
+    assert abs(yx["hedge_ratio"] - 2) < 0.1 and yx["adf_pvalue"] < 0.05
+
+
+def test_daemon_amends_late_bars_and_flags_pairs():
+    ticks = _ticks(120)
+    late = ticks[(ticks["symbol"] == "X") & (ticks["timestamp"] == pd.Timestamp("2025-01-01 00:01:30"))]
+    on_time = ticks.drop(late.index)
+    daemon = AnalyticsDaemon([("Y", "X")], processes=0, adf_every=0, amend_bars=60, shm_name="rtq_test_amend").start()
+    try:
+        daemon.process_ticks(on_time)
+        daemon.process_ticks(late.assign(price=late["price"] + 1))
+        assert daemon.state["Y/X"]["amended"]
+        assert daemon.snapshot()["stats"]["amended"] == 1
+        reader = SharedBarsReader("rtq_test_amend")
+        assert reader.bars("X").loc["2025-01-01 00:01:30", "close"] == late["price"].iloc[0] + 1
+        reader.close()
+    finally:
+        daemon.stop()
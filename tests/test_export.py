@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+from src.export import FORMATS, export_bytes, iter_frames, last_exported, write_export
+
+
+def _columns(n=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2025-01-01", periods=n, freq="1s", name="timestamp")
+    return {c: pd.Series(rng.normal(size=n), index=index) for c in ("A", "B", "spread")}
+
+
+def _read(path, fmt):
+    if fmt.startswith("csv"):
+        return pd.read_csv(path, index_col=0, parse_dates=True)
+    if fmt == "parquet":
+        return pd.read_parquet(path).set_index("timestamp")
+    return pa.ipc.open_stream(pa.memory_map(str(path))).read_all().to_pandas().set_index("timestamp")
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_append_only_adds_new_rows(tmp_path, fmt):
+    cols = _columns()
+    path = tmp_path / f"pair.{fmt}"
+    assert write_export({k: v.iloc[:600] for k, v in cols.items()}, path, chunk_rows=128) == 600
+    assert last_exported(path) == pd.Timestamp("2025-01-01 00:09:59")
+    assert write_export(cols, path, append=True, chunk_rows=128) == 400
+    assert write_export(cols, path, append=True) == 0
+    expected = pd.DataFrame(cols)
+    pd.testing.assert_frame_equal(_read(path, fmt), expected, check_freq=False)
+    # the in-memory export holds the same rows
+    buf = tmp_path / f"bytes.{fmt}"
+    buf.write_bytes(export_bytes(cols, fmt, chunk_rows=300))
+    pd.testing.assert_frame_equal(_read(buf, fmt), expected, check_freq=False)
+    # a plain write replaces the export
+    assert write_export(cols, path) == 1000 and len(_read(path, fmt)) == 1000
+
+
+def test_frames_are_chunked_and_outer_aligned_like_concat():
+    cols = _columns(10)
+    cols["zscore"] = cols["spread"].iloc[3:]
+    chunks = list(iter_frames(cols, chunk_rows=4))
+    assert [len(c) for c in chunks] == [4, 4, 2]
+    got = pd.concat(chunks, ignore_index=True).set_index("timestamp")
+    pd.testing.assert_frame_equal(got, pd.concat(cols, axis=1), check_freq=False)
+    assert list(iter_frames(cols, after=cols["A"].index[-1])) == []
+
+
+def test_arrow_append_rejects_different_columns(tmp_path):
+    path = tmp_path / "pair.arrow"
+    write_export(_columns(), path)
+    with pytest.raises(ValueError):
+        write_export({"other": _columns(2000)["A"]}, path, append=True)
+    assert len(_read(path, "arrow")) == 1000  # left intact
+
+
+def test_parquet_export_over_a_single_file_is_refused(tmp_path):
+    path = tmp_path / "pair.parquet"
+    path.write_bytes(export_bytes(_columns(), "parquet"))
+    for append in (False, True):
+        with pytest.raises(ValueError, match="directory"):
+            write_export(_columns(), path, append=append)
+    assert path.is_file()
@@ -0,0 +1,22 @@
+import numpy as np
+import pandas as pd
+from src.adf import engle_granger
+from tools.gen_synthetic_ticks import gen_universe
+
+
+def test_universe_is_chunked_deterministic_and_irregular():
+    chunks = list(gen_universe(n_symbols=6, n_ticks=25_000, chunk_size=10_000, seed=3))
+    assert [len(c) for c in chunks] == [10_000, 10_000, 5_000]
+    ticks = pd.concat(chunks, ignore_index=True)
+    again = pd.concat(gen_universe(n_symbols=6, n_ticks=25_000, chunk_size=10_000, seed=3), ignore_index=True)
+    pd.testing.assert_frame_equal(ticks, again)
+    gaps = np.diff(ticks["timestamp"].to_numpy().view("int64"))
+    assert (gaps > 0).all() and gaps.std() > gaps.mean()  # Poisson plus bursts: overdispersed
+
+
+def test_universe_symbols_sharing_a_factor_are_cointegrated():
+    ticks = pd.concat(gen_universe(n_symbols=4, n_ticks=60_000, n_factors=2, rate=2.0, seed=1))
+    logs = np.log(ticks.pivot_table(index=ticks["timestamp"].dt.floor("1min"), columns="symbol", values="price", observed=True).ffill().dropna())
+    # SYM0000 and SYM0002 both load on factor 0, SYM0001 on factor 1
+    assert engle_granger(logs["SYM0000"], logs["SYM0002"])["pvalue"] < 0.01
+    assert engle_granger(logs["SYM0000"], logs["SYM0001"])["pvalue"] > 0.05
@@ -0,0 +1,51 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+HEAVY = ("statsmodels", "scipy", "plotly", "numba")
+
+
+def imported(module: str) -> dict:
+    """Cumulative `-X importtime` microseconds of every package loaded by a cold `import module`."""
+    res = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                         cwd=ROOT, capture_output=True, text=True, check=True)
+    out = {}
+    for line in res.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                out[name.strip()] = int(cumulative)
+    return out
+
+
+@pytest.mark.parametrize("module", ["src.analytics", "src.pipeline", "src.daemon", "src.scanner",
+                                    "tools.gen_synthetic_ticks"])
+def test_entry_points_do_not_load_heavy_dependencies(module):
+    loaded = imported(module)
+    assert module in loaded
+    assert not [m for m in loaded if m.split(".")[0] in HEAVY]
+
+
+def test_kernels_are_numpy_only():
+    loaded = imported("src.kernels")
+    assert "numpy" in loaded and "pandas" not in loaded
+
+
+def test_adf_still_loads_statsmodels_on_demand():
+    code = ("import sys, numpy as np, pandas as pd\n"
+            "from src.analytics import adf_test\n"
+            "assert 'statsmodels' not in sys.modules\n"
+            "res = adf_test(pd.Series(np.random.default_rng(0).normal(size=200)))\n"
+            "assert res['pvalue'] < 0.05 and 'statsmodels' in sys.modules\n")
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+
+
+def test_generator_import_leaves_sys_path_alone():
+    code = ("import sys\n"
+            "before = list(sys.path)\n"
+            "import tools.gen_synthetic_ticks\n"
+            "assert sys.path == before\n")
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
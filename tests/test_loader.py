@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from src.loader import iter_ticks, load_bars
+from src.pipeline import AnalyticsPipeline
+from src.storage import resample_bars, ticks_to_ohlcv
+
+
+def _ticks(n=3000, seed=0):
+    rng = np.random.default_rng(seed)
+    ts = pd.Timestamp("2025-01-01") + pd.to_timedelta(np.sort(rng.integers(0, 600_000, size=n)), unit="ms")
+    return pd.DataFrame({
+        "timestamp": ts,
+        "symbol": rng.choice(["A", "B", "C"], size=n),
+        "price": 100 + rng.normal(size=n).cumsum(),
+        "quantity": rng.integers(1, 5, size=n).astype(float),
+    })
+
+
+def test_chunked_csv_bars_match_in_memory(tmp_path):
+    ticks = _ticks()
+    path = tmp_path / "ticks.csv"
+    ticks.to_csv(path, index=False)
+    bars = load_bars(str(path), "1s", chunksize=257)
+    pd.testing.assert_frame_equal(bars, ticks_to_ohlcv(ticks, "1s"), check_dtype=False)
+    assert all(len(c) <= 257 for c in iter_ticks(str(path), chunksize=257))
+
+
+def test_parquet_prunes_row_groups_by_symbol_and_time(tmp_path):
+    ticks = _ticks().sort_values(["symbol", "timestamp"], kind="stable").reset_index(drop=True)
+    path = tmp_path / "ticks.parquet"
+    pq.write_table(pa.Table.from_pandas(ticks.assign(extra=1)), path, row_group_size=500)
+    start, end = pd.Timestamp("2025-01-01 00:02"), pd.Timestamp("2025-01-01 00:05")
+    chunks = list(iter_ticks(str(path), chunksize=200, symbols=["B"], start=start, end=end))
+    got = pd.concat(chunks, ignore_index=True)
+    want = ticks[(ticks["symbol"] == "B") & (ticks["timestamp"] >= start) & (ticks["timestamp"] < end)]
+    assert list(got.columns) == ["timestamp", "symbol", "price", "quantity"]
+    np.testing.assert_array_equal(got["price"], want["price"])
+    # only B's row groups are decoded
+    assert sum(len(c) for c in chunks) == len(want) and len(chunks) <= 3
+
+
+def test_resampled_bars_match_tick_aggregation():
+    ticks = _ticks()
+    fine = ticks_to_ohlcv(ticks, "1s")
+    pd.testing.assert_frame_equal(resample_bars(fine, "1m"), ticks_to_ohlcv(ticks, "1m"), check_dtype=False)
+    pipe = AnalyticsPipeline()
+    pd.testing.assert_frame_equal(pipe.closes(fine.reset_index(), "1m"), pipe.closes(ticks, "1m"))
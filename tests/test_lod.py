@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+from src.lod import LODPyramid
+
+
+def _series(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.Series(rng.normal(size=n), index=pd.date_range("2025-01-01", periods=n, freq="1s"), name="zscore")
+
+
+def test_view_keeps_extremes_with_bounded_payload():
+    for n in (20_000, 500_000):
+        z = _series(n)
+        z.iloc[n // 3], z.iloc[n // 2] = 40.0, -40.0
+        view = LODPyramid(z).view(width=500)
+        assert len(view) <= 2 * 500 + 2 and view.name == "zscore"
+        assert view.max() == 40.0 and view.min() == -40.0
+        assert view.index[0] == z.index[0] and view.index[-1] == z.index[-1]
+        assert view.index.is_monotonic_increasing and (z.loc[view.index] == view).all()
+
+
+def test_visible_range_and_incremental_append():
+    frame = pd.DataFrame({"spread": _series(50_000, 1).to_numpy(), "zscore": _series(50_000, 2).to_numpy()},
+                         index=_series(50_000).index)
+    frame.iloc[100:300, 0] = np.nan
+    full = LODPyramid(frame)
+    live = LODPyramid(frame.iloc[:7])
+    for i in range(7, len(frame), 613):
+        live.append(frame.iloc[i:i + 613])
+    pd.testing.assert_frame_equal(live.view(width=300), full.view(width=300))
+    # a narrow range is returned in full, a wider one at coarser detail
+    start, end = frame.index[1000], frame.index[1400]
+    pd.testing.assert_frame_equal(full.view(start, end, width=300), frame.loc[start:end], check_freq=False)
+    hour = full.view(frame.index[0], frame.index[3599], width=300)
+    assert len(hour) <= 4 * 300 + 2 and hour.index[-1] == frame.index[3599]
+
+
+def test_view_extremes_match_visible_slice():
+    frame = pd.DataFrame({"spread": _series(100_000, 3).cumsum().to_numpy(), "zscore": _series(100_000, 4).to_numpy()},
+                         index=_series(100_000).index)
+    pyramid = LODPyramid(frame)
+    rng = np.random.default_rng(5)
+    for _ in range(200):
+        i0, i1 = np.sort(rng.integers(0, len(frame), size=2))
+        start, end = frame.index[i0], frame.index[i1]
+        view, visible = pyramid.view(start, end, width=200), frame.loc[start:end]
+        pd.testing.assert_series_equal(view.min(), visible.min())
+        pd.testing.assert_series_equal(view.max(), visible.max())
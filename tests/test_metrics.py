@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+from src import metrics
+from src.daemon import AnalyticsDaemon
+from src.metrics import LatencyHistogram, MetricsServer, Registry, prometheus_text, read_prometheus
+
+
+def test_histogram_percentiles_within_bucket_precision():
+    rng = np.random.default_rng(0)
+    values = rng.lognormal(mean=10, sigma=1.5, size=20_000).astype(int)
+    hist = LatencyHistogram()
+    for v in values:
+        hist.record(int(v))
+    for q in (0.5, 0.9, 0.99):
+        exact = np.quantile(values, q)
+        assert abs(hist.percentile(q) - exact) / exact < 0.02
+    assert hist.count == len(values) and hist.max == values.max()
+    assert np.isnan(LatencyHistogram().percentile(0.5))
+
+
+def test_timer_is_noop_when_disabled_and_records_when_enabled():
+    metrics.REGISTRY.reset()
+    metrics.disable()
+    with metrics.timer("stage"):
+        pass
+    assert "stage" not in metrics.REGISTRY.histograms
+    metrics.enable()
+    try:
+        with metrics.timer("stage"):
+            pass
+        metrics.timed("stage")(lambda: None)()
+    finally:
+        metrics.disable()
+    assert metrics.REGISTRY.histograms["stage"].count == 2
+    metrics.REGISTRY.reset()
+
+
+def test_prometheus_endpoint_round_trip():
+    reg = Registry()
+    reg.observe("parse", 2_000)
+    reg.observe("parse", 4_000)
+    reg.register_collector("q", lambda: {"queue_depth": 3, "dropped_total": 7})
+    text = prometheus_text(reg)
+    assert 'rtq_stage_latency_seconds_count{stage="parse"} 2' in text
+    assert "# TYPE rtq_dropped_total counter" in text and "rtq_queue_depth 3" in text
+    server = MetricsServer(port=0, registry=reg).start()
+    try:
+        rows = read_prometheus(server.url)
+    finally:
+        server.stop()
+    assert rows[0]["stage"] == "parse" and rows[0]["count"] == 2
+    assert 0.001 < rows[0]["p50_ms"] < 0.005
+
+
+def test_daemon_records_stage_latencies():
+    metrics.REGISTRY.reset()
+    metrics.enable()
+    ts = pd.date_range("2025-01-01", periods=400, freq="1s")
+    rng = np.random.default_rng(1)
+    ticks = pd.concat([
+        pd.DataFrame({"timestamp": ts, "symbol": s, "price": 100 + rng.normal(size=len(ts)).cumsum(), "quantity": 1.0})
+        for s in ("A", "B")
+    ]).sort_values("timestamp", kind="stable")
+    try:
+        daemon = AnalyticsDaemon([("A", "B")], processes=0, adf_every=100).start()
+        daemon.process_ticks(ticks)
+        daemon.stop()
+        text = prometheus_text()
+    finally:
+        metrics.disable()
+        metrics.REGISTRY.reset()
+    for stage in ("aggregate", "hedge", "zscore", "adf", "alert"):
+        assert f'stage="{stage}"' in text
+    assert "rtq_ticks_total" not in text  # collector removed on stop
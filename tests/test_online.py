@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+from src.analytics import rolling_zscore, rolling_corr, ols_hedge_ratio, ewm_hedge_ratio, construct_spread
+from src.online import RollingZScore, RollingCorr, recursive_hedge_ratio
+
+
+def test_rolling_zscore_matches_batch():
+    rng = np.random.default_rng(0)
+    s = pd.Series(100 + rng.normal(scale=0.1, size=2000).cumsum())
+    s.iloc[[50, 51, 700]] = np.nan
+    s.iloc[900:930] = 5.0  # flat stretch: zero variance windows
+    expected = rolling_zscore(s, window=25).to_numpy()
+    got = RollingZScore(window=25).update_many(s)
+    np.testing.assert_allclose(got, expected, rtol=0, atol=1e-9)
+
+
+def test_rolling_corr_matches_batch():
+    rng = np.random.default_rng(1)
+    x = pd.Series(100 + rng.normal(size=3000).cumsum())
+    y = 1.5 * x + rng.normal(scale=2.0, size=x.size)
+    expected = rolling_corr(y, x, window=40).to_numpy()
+    got = RollingCorr(window=40).update_many(y, x)
+    np.testing.assert_allclose(got, expected, rtol=0, atol=1e-9)
+    assert np.isnan(got[:39]).all()
+
+
+def test_recursive_hedge_ratio_matches_ols_and_ewm():
+    rng = np.random.default_rng(2)
+    x = pd.Series(100 + rng.normal(size=500).cumsum())
+    y = 0.8 * x + rng.normal(size=x.size)
+    betas = recursive_hedge_ratio(y, x)
+    assert abs(betas.iloc[-1] - ols_hedge_ratio(y, x)) < 1e-9
+    assert abs(betas.iloc[199] - ols_hedge_ratio(y.iloc[:200], x.iloc[:200])) < 1e-9
+
+    halflife = 30.0
+    lam = 0.5 ** (1.0 / halflife)
+    np.testing.assert_allclose(recursive_hedge_ratio(y, x, lam).iloc[1:], ewm_hedge_ratio(y, x, halflife).iloc[1:], rtol=1e-9)
+
+    spread = construct_spread(y, x, betas)
+    assert spread.index.equals(y.index)
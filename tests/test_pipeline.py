@@ -0,0 +1,64 @@
+import pandas as pd
+from src.analytics import ols_hedge_ratio, rolling_zscore
+from src.pipeline import AnalyticsPipeline, LRUCache, content_hash
+from src.storage import ticks_to_ohlcv
+from tools.gen_synthetic_ticks import gen
+
+
+def _ticks():
+    return pd.concat([gen("A", n=600, seed=1), gen("B", n=600, seed=2)]).sort_values("timestamp").reset_index(drop=True)
+
+
+def test_pipeline_caches_each_stage():
+    df = _ticks()
+    pipe = AnalyticsPipeline()
+    z = pipe.zscore(df, "1s", "A", "B", window=30)
+    a, b = pipe.pair(df, "1s", "A", "B")
+    beta = ols_hedge_ratio(a, b)
+    pd.testing.assert_series_equal(z, rolling_zscore(a - beta * b, window=30))
+
+    misses = pipe.cache.misses
+    # same inputs (even via an equal copy of the data) are served from cache
+    pipe.zscore(df.copy(), "1s", "A", "B", window=30)
+    assert pipe.cache.misses == misses
+    # a new window only recomputes the z-score stage
+    pipe.zscore(df, "1s", "A", "B", window=60)
+    assert pipe.cache.misses == misses + 1
+
+
+def test_lru_cache_is_bounded():
+    cache = LRUCache(maxsize=2, max_bytes=None)
+    for i in range(5):
+        cache.get_or_compute(i, lambda i=i: i)
+    assert len(cache) == 2 and 4 in cache and 0 not in cache
+
+    s = pd.Series(range(1000), dtype="float64")
+    cache = LRUCache(maxsize=100, max_bytes=3 * s.memory_usage(index=True))
+    for i in range(10):
+        cache.get_or_compute(i, lambda: s.copy())
+    assert len(cache) == 3
+    assert cache.nbytes <= cache.max_bytes
+
+
+def test_cascade_counts_toward_cache_size():
+    df = _ticks()
+    pipe = AnalyticsPipeline()
+    cascade = pipe.cascade(df)
+    assert cascade.nbytes >= cascade.bars("1s", include_open=False).memory_usage(index=True).sum() > 0
+    assert pipe.cache.nbytes == cascade.nbytes
+
+
+def test_content_hash_tracks_values():
+    df = _ticks()
+    other = df.copy()
+    other.loc[5, "price"] += 1.0
+    assert content_hash(df) == content_hash(df.copy())
+    assert content_hash(df) != content_hash(other)
+
+
+def test_bars_match_ticks_to_ohlcv_including_partial_last_bars():
+    # ends at 00:16:39, mid-bar for every interval above 1s (and shorter than 1h)
+    df = pd.concat([gen("A", n=1000, seed=1), gen("B", n=1000, seed=2)]).sort_values("timestamp").reset_index(drop=True)
+    pipe = AnalyticsPipeline()
+    for interval in ["1m", "5m", "15m", "1h", "15s"]:
+        pd.testing.assert_frame_equal(pipe.bars(df, interval), ticks_to_ohlcv(df, interval), check_freq=False)
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+from src.daemon import AnalyticsDaemon
+from src.replay import ReplayEngine, replay_ticks
+
+
+def _ticks(n=600, seed=1):
+    rng = np.random.default_rng(seed)
+    ts = pd.date_range("2025-01-01", periods=n, freq="500ms")
+    x = 100 + rng.normal(scale=0.1, size=n).cumsum()
+    y = 5 + 1.5 * x + rng.normal(scale=0.05, size=n)
+    return pd.concat([
+        pd.DataFrame({"timestamp": ts, "symbol": s, "price": p, "quantity": 1.0}) for s, p in (("X", x), ("Y", y))
+    ]).sort_values("timestamp", kind="stable").reset_index(drop=True)
+
+
+def test_replay_batches_do_not_depend_on_chunking(tmp_path):
+    ticks = _ticks()
+    path = tmp_path / "ticks.csv"
+    ticks.to_csv(path, index=False)
+    small = list(replay_ticks(str(path), batch="10s", chunksize=37))
+    large = list(replay_ticks(ticks, batch="10s"))
+    assert [len(b) for b in small] == [len(b) for b in large]
+    assert all(len(b) == 40 for b in large)  # 10s of 2 symbols at 2 ticks/s
+    pd.testing.assert_frame_equal(pd.concat(small, ignore_index=True), pd.concat(large, ignore_index=True))
+
+
+def test_engine_matches_live_daemon_state():
+    ticks = _ticks()
+    signals = ReplayEngine([("Y", "X")], window=30).run(ticks, batch="7s")["Y/X"]
+    daemon = AnalyticsDaemon([("Y", "X")], window=30, processes=0, adf_every=0, rules=[]).start()
+    for batch in replay_ticks(ticks, batch="3s"):
+        daemon.process_ticks(batch)
+    daemon.stop()
+    live = daemon.state["Y/X"]
+    assert len(signals) == 300
+    assert signals.index[-1].value == live["timestamp"]
+    assert np.isclose(signals["zscore"].iloc[-1], live["zscore"]) and np.isclose(signals["hedge_ratio"].iloc[-1], live["hedge_ratio"])
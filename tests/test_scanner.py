@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+from src.analytics import ols_hedge_ratio
+from src.scanner import corr_matrix, hedge_ratio_matrix, scan_pairs
+
+
+def _universe(n=400, k=8, seed=0):
+    rng = np.random.default_rng(seed)
+    walks = 100 + rng.normal(size=(n, k)).cumsum(axis=0)
+    close = pd.DataFrame(walks, columns=[f"S{i}" for i in range(k)])
+    # S0 and S1 are cointegrated with beta 0.5
+    close["S1"] = 20 + 0.5 * close["S0"] + rng.normal(scale=0.2, size=n)
+    return close
+
+
+def test_corr_and_beta_matrices():
+    close = _universe()
+    pd.testing.assert_frame_equal(corr_matrix(close, on="levels"), close.corr(), atol=1e-12)
+    pd.testing.assert_frame_equal(corr_matrix(close), np.log(close).diff().corr(), atol=1e-12)
+    assert abs(hedge_ratio_matrix(close).loc["S1", "S0"] - ols_hedge_ratio(close["S1"], close["S0"])) < 1e-12
+
+
+def test_scan_pairs_ranks_cointegrated_pair_first():
+    close = _universe()
+    serial = scan_pairs(close, top_n=10, on="levels", processes=1)
+    assert len(serial) == 10
+    assert {serial.loc[0, "a"], serial.loc[0, "b"]} == {"S0", "S1"}
+    assert serial.loc[0, "pvalue"] < 0.05
+    pooled = scan_pairs(close, top_n=10, on="levels", processes=2)
+    pd.testing.assert_frame_equal(serial, pooled)
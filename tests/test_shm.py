@@ -0,0 +1,75 @@
+import multiprocessing as mp
+import threading
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from src.daemon import AnalyticsDaemon
+from src.shm import SharedBarsReader, SharedBarsWriter
+from tests.test_daemon import _ticks
+
+
+def _child_latest_close(name, out):
+    reader = SharedBarsReader(name)
+    out.put(float(reader.bars("A", 1)["close"].iloc[0]))
+    reader.close()
+
+
+def test_rings_wrap_and_readers_see_read_only_views():
+    t0 = pd.Timestamp("2025-01-01").value
+    writer = SharedBarsWriter("rtq_test_rings", ["A", "B"], ["A/B"], capacity=4)
+    try:
+        writer.write_bars([("A", t0 + i * 10**9, i, i, i, float(i), 1.0) for i in range(6)] + [("X", t0, 1, 1, 1, 1, 1)])
+        writer.write_signals({"A/B": [{"timestamp": t0 + i * 10**9, "zscore": float(i)} for i in range(3)]})
+        reader = SharedBarsReader("rtq_test_rings")
+        assert reader.symbols == ["A", "B"] and reader.pairs == ["A/B"] and reader.seq % 2 == 0
+        bars = reader.bars("A")
+        assert list(bars["close"]) == [2.0, 3.0, 4.0, 5.0]
+        assert bars.index[-1] == pd.Timestamp("2025-01-01 00:00:05")
+        assert reader.bars("B").empty
+        assert list(reader.signals("A/B", 2)["zscore"]) == [1.0, 2.0]
+        assert reader.latest().loc["A/B", "zscore"] == 2.0
+        with pytest.raises(ValueError):
+            reader.arrays()["bars"][0, 0] = 0
+        # another process attaches by name and sees the same memory
+        out = mp.get_context("spawn").Queue()
+        proc = mp.get_context("spawn").Process(target=_child_latest_close, args=("rtq_test_rings", out))
+        proc.start()
+        assert out.get(timeout=30) == 5.0
+        proc.join(timeout=30)
+        reader.close()
+    finally:
+        writer.close()
+
+
+def test_readers_wait_out_a_long_write():
+    t0 = pd.Timestamp("2025-01-01").value
+    writer = SharedBarsWriter("rtq_test_busy", ["A"], [], capacity=4)
+    reader = SharedBarsReader("rtq_test_busy")
+    try:
+        writer.write_bars([("A", t0, 1, 1, 1, 1.0, 1.0)])
+        writer._begin()  # a large batch in progress
+        threading.Timer(0.3, writer._end).start()
+        start = time.monotonic()
+        assert list(reader.bars("A")["close"]) == [1.0]
+        assert time.monotonic() - start >= 0.25
+    finally:
+        reader.close()
+        writer.close()
+
+
+def test_daemon_publishes_bars_and_signals():
+    ticks = _ticks(300)
+    daemon = AnalyticsDaemon([("Y", "X")], processes=0, adf_every=0, shm_name="rtq_test_daemon",
+                             shm_capacity=100).start()
+    reader = SharedBarsReader("rtq_test_daemon")
+    try:
+        daemon.process_ticks(ticks)
+        sig = reader.signals("Y/X")
+        np.testing.assert_allclose(sig["zscore"].iloc[-1], daemon.state["Y/X"]["zscore"])
+        assert reader.capacity == 100 and len(sig) == min(daemon.stats["slices"], 100)
+        closes = reader.bars("X")["close"]
+        assert closes.iloc[-1] == ticks.loc[ticks["symbol"] == "X", "price"].iloc[-2]
+    finally:
+        reader.close()
+        daemon.stop()
@@ -1,5 +1,6 @@
+import numpy as np
 import pandas as pd
-from src.storage import ticks_to_ohlcv
+from src.storage import BarCascade, bar_records, bars_from_records, compact_ticks, ticks_to_ohlcv
 
 
 def test_ticks_to_ohlcv_simple():
@@ -18,3 +19,197 @@ def test_ticks_to_ohlcv_simple():
     assert first["high"] == 101.0
     assert first["close"] == 101.0
     assert first["volume"] == 3
+
+
+def test_bar_aggregator_matches_batch():
+    from src.storage import BarAggregator
+    from tools.gen_synthetic_ticks import gen
+
+    df = pd.concat([gen("A", n=300, seed=1), gen("B", n=300, seed=2)]).sort_values("timestamp")
+    # drop a block of ticks so the aggregator has to emit empty bars
+    df = df.drop(df.index[100:160]).reset_index(drop=True)
+    for interval in ("1s", "1m"):
+        agg = BarAggregator(interval)
+        closed = [agg.update(chunk) for chunk in (df.iloc[i:i + 90] for i in range(0, len(df), 90))]
+        closed.append(agg.flush())
+        expected = ticks_to_ohlcv(df, interval=interval)
+        pd.testing.assert_frame_equal(agg.bars(), expected)
+        pd.testing.assert_frame_equal(pd.concat(closed).sort_index(), expected)
+
+
+def test_bar_aggregator_skips_missing_symbols():
+    from src.storage import BarAggregator
+
+    ticks = pd.DataFrame({
+        "timestamp": pd.to_datetime(["2025-01-01T00:00:00", "2025-01-01T00:00:01", "2025-01-01T00:00:02"]),
+        "symbol": ["A", None, "B"],
+        "price": [100.0, 101.0, 102.0],
+        "quantity": [1.0, 2.0, 1.0],
+    })
+    agg = BarAggregator("1s")
+    assert agg.update_records(ticks) == []
+    assert agg.update_records(ticks.iloc[[1]]) == []
+    pd.testing.assert_frame_equal(agg.flush(), ticks_to_ohlcv(ticks, "1s"))
+
+
+def test_bar_aggregator_single_ticks():
+    from src.storage import BarAggregator
+
+    agg = BarAggregator("1s")
+    assert agg.add_tick("SYM", "2025-01-01T00:00:00", 100.0, 1).empty
+    agg.add_tick("SYM", "2025-01-01T00:00:00.500", 101.0, 2)
+    closed = agg.add_tick("SYM", "2025-01-01T00:00:02", 99.0, 1)
+    # the first bar and the empty 00:00:01 bar are closed; 00:00:02 stays open
+    assert len(closed) == 2
+    first = closed.loc[("SYM", pd.Timestamp("2025-01-01T00:00:00"))]
+    assert first["high"] == 101.0 and first["volume"] == 3
+    assert len(agg.bars()) == 3
+    assert len(agg.bars(include_open=False)) == 2
+
+
+def test_bar_aggregator_watermark_reorders_and_amends_late_ticks():
+    from src.storage import BarAggregator
+    from tools.gen_synthetic_ticks import gen
+
+    df = pd.concat([gen("A", n=300, seed=1), gen("B", n=300, seed=2)]).sort_values("timestamp", kind="stable")
+    # jitter arrival order by up to 3s; 3s of allowed lateness absorbs it exactly
+    rng = np.random.default_rng(0)
+    arrival = df.iloc[np.argsort(df["timestamp"].to_numpy().astype("int64") + rng.integers(0, 3 * 10**9, len(df)))]
+    agg = BarAggregator("1s", lateness="3s")
+    for i in range(0, len(arrival), 40):
+        agg.update(arrival.iloc[i:i + 40])
+    agg.flush()
+    pd.testing.assert_frame_equal(agg.bars(), ticks_to_ohlcv(df, "1s"))
+    assert agg.stats == {"late": 0, "amended": 0, "dropped": 0}
+
+    agg = BarAggregator("1s", amend_bars=2)
+    t0 = pd.Timestamp("2025-01-01")
+    ticks = pd.DataFrame({"timestamp": [t0, t0 + pd.Timedelta("1s"), t0 + pd.Timedelta("3s")],
+                          "symbol": "A", "price": [1.0, 2.0, 3.0], "quantity": 1.0})
+    agg.update(ticks)  # 0s, 1s and the empty 2s bar are final
+    late = pd.DataFrame({"timestamp": [t0 + pd.Timedelta("2.5s"), t0 + pd.Timedelta("1.5s"), t0],
+                         "symbol": "A", "price": [5.0, 0.5, 9.0], "quantity": 1.0})
+    assert agg.update(late).empty
+    fixed = agg.take_amendments()
+    assert fixed == [("A", (t0 + pd.Timedelta("1s")).value, 2.0, 2.0, 0.5, 0.5, 2.0),
+                     ("A", (t0 + pd.Timedelta("2s")).value, 5.0, 5.0, 5.0, 5.0, 1.0)]
+    assert agg.stats == {"late": 3, "amended": 2, "dropped": 1}
+    assert agg.bars().loc[("A", t0 + pd.Timedelta("2s")), "close"] == 5.0 and agg.take_amendments() == []
+
+
+def _resample_reference(df, interval):
+    # per-symbol pandas resample, the original implementation
+    df = df.assign(timestamp=pd.to_datetime(df["timestamp"])).set_index("timestamp")
+    frames = []
+    for sym, g in df.groupby("symbol"):
+        g = g.sort_index()
+        merged = pd.concat([g["price"].resample(interval).ohlc(), g["quantity"].resample(interval).sum().rename("volume")], axis=1)
+        frames.append(merged.assign(symbol=sym))
+    return pd.concat(frames).reset_index().set_index(["symbol", "timestamp"]).sort_index()
+
+
+def test_ticks_to_ohlcv_vectorized_matches_resample():
+    rng = np.random.default_rng(3)
+    n = 5000
+    ts = pd.Timestamp("2025-01-01") + pd.to_timedelta(np.sort(rng.choice(900_000, size=n, replace=False)), unit="ms")
+    df = pd.DataFrame({
+        "timestamp": ts,
+        "symbol": rng.choice(["AAA", "BBB", "CCC"], size=n),
+        "price": 100 + rng.normal(size=n).cumsum(),
+        "quantity": rng.integers(1, 10, size=n),
+    }).sample(frac=1.0, random_state=0)
+    for interval, freq in (("1s", "1s"), ("1m", "1min"), ("5m", "5min")):
+        pd.testing.assert_frame_equal(ticks_to_ohlcv(df, interval=interval), _resample_reference(df, freq), check_freq=False)
+
+
+def test_ticks_to_ohlcv_epoch_ms():
+    df = pd.DataFrame({
+        "timestamp": [1735689600000, 1735689600500, 1735689601000],
+        "symbol": ["SYM", "SYM", "SYM"],
+        "price": [100.0, 101.0, 102.0],
+        "quantity": [1, 2, 1],
+    })
+    o = ticks_to_ohlcv(df, interval="1s")
+    assert list(o.index.get_level_values("timestamp")) == [pd.Timestamp("2025-01-01T00:00:00"), pd.Timestamp("2025-01-01T00:00:01")]
+    assert o["volume"].tolist() == [3, 1]
+
+
+def test_ticks_to_ohlcv_drops_missing_symbols():
+    df = pd.DataFrame({
+        "timestamp": ["2025-01-01T00:00:00", "2025-01-01T00:00:01", "2025-01-01T00:00:02"],
+        "symbol": ["A", None, "B"],
+        "price": [100.0, 101.0, 102.0],
+        "quantity": [1, 2, 1],
+    })
+    for ticks in (df, compact_ticks(df)):
+        o = ticks_to_ohlcv(ticks, interval="1s")
+        assert list(o.index) == [("A", pd.Timestamp("2025-01-01T00:00:00")), ("B", pd.Timestamp("2025-01-01T00:00:02"))]
+        assert o["close"].tolist() == [100.0, 102.0]
+
+
+def test_ticks_to_ohlcv_drops_missing_timestamps():
+    from src.storage import BarAggregator
+
+    df = pd.DataFrame({
+        "timestamp": pd.to_datetime(["2025-01-01T00:00:00", None, "2025-01-01T00:00:02"]),
+        "symbol": ["A", "A", "A"],
+        "price": [100.0, 101.0, 102.0],
+        "quantity": [1.0, 2.0, 1.0],
+    })
+    expected = ticks_to_ohlcv(df.iloc[[0, 2]], interval="1s")
+    for ticks in (df, compact_ticks(df)):
+        pd.testing.assert_frame_equal(ticks_to_ohlcv(ticks, interval="1s"), expected)
+    assert ticks_to_ohlcv(df.iloc[[1]], interval="1s").empty
+    agg = BarAggregator("1s")
+    closed = agg.update_records(df)
+    assert [(sym, pd.Timestamp(ns)) for sym, ns, *_ in closed] == list(expected.index[:2])
+    pd.testing.assert_frame_equal(agg.flush(), expected.iloc[2:])
+
+
+def test_compact_schema_gives_same_bars():
+    df = pd.DataFrame({
+        "timestamp": ["2025-01-01T00:00:01", "2025-01-01T00:00:00", "2025-01-01T00:00:00.5", "2025-01-01T00:00:02"],
+        "symbol": ["B", "A", "B", "A"],
+        "price": [10.0, 1.0, 11.0, 2.0],
+        "quantity": [1, 2, 3, 4],
+    })
+    # category order deliberately not alphabetical
+    compact = compact_ticks(df, symbols=["B", "A"])
+    assert isinstance(compact["symbol"].dtype, pd.CategoricalDtype)
+    assert compact["timestamp"].dtype == "datetime64[ns]" and compact["price"].dtype == "float64"
+    bars = ticks_to_ohlcv(compact, "1s")
+    pd.testing.assert_frame_equal(bars, ticks_to_ohlcv(df, "1s"), check_dtype=False)
+    assert compact_ticks(df, float_dtype="float32")["quantity"].dtype == "float32"
+
+    rec, symbols = bar_records(bars)
+    assert rec.itemsize == 32 and symbols == ["A", "B"]
+    pd.testing.assert_frame_equal(bars_from_records(rec, symbols), bars, check_dtype=False)
+
+
+def test_bar_cascade_matches_direct_aggregation():
+    rng = np.random.default_rng(3)
+    n = 6000
+    ts = pd.Timestamp("2025-01-01") + pd.to_timedelta(np.sort(rng.integers(0, 1_800_000, size=n)), unit="ms")
+    ticks = pd.DataFrame({"timestamp": ts, "symbol": rng.choice(["A", "B"], size=n),
+                          "price": 100 + rng.normal(size=n).cumsum(), "quantity": 1.0})
+    cascade = BarCascade("1s", intervals=["15s"])
+    half = n // 2 + 7
+    for i in range(0, half, 500):
+        cascade.update_records(ticks.iloc[i:min(i + 500, half)])
+    cascade.bars("5m")  # added mid-stream from the 15s history, then kept up to date
+    for i in range(half, n, 500):
+        cascade.update_records(ticks.iloc[i:i + 500])
+    cascade.flush()
+    for interval in ("1s", "15s", "1m", "5m"):
+        pd.testing.assert_frame_equal(cascade.bars(interval), ticks_to_ohlcv(ticks, interval), check_dtype=False)
+
+
+def test_bar_cascade_aliases_share_a_level():
+    ticks = pd.DataFrame({"timestamp": pd.date_range("2025-01-01", periods=300, freq="700ms"),
+                          "symbol": "A", "price": np.arange(300.0), "quantity": 1.0})
+    cascade = BarCascade("1s", intervals=["1m", "60s"])
+    cascade.update_records(ticks)
+    assert cascade.intervals == ["1s", "1m"]
+    cascade.flush()
+    pd.testing.assert_frame_equal(cascade.bars("60s"), cascade.bars("1m"))
+    pd.testing.assert_frame_equal(cascade.bars("60s"), ticks_to_ohlcv(ticks, "1m"), check_dtype=False)
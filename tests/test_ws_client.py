@@ -0,0 +1,117 @@
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("websockets")
+
+from src.ws_client import WebsocketClient, combined_stream_url, parse_trade
+from tools.ws_replay_server import ReplayServer, synthetic_frames
+
+
+def _drain(client, expected, timeout=10.0):
+    ticks = []
+    deadline = time.monotonic() + timeout
+    while len(ticks) < expected and time.monotonic() < deadline:
+        batch = client.get_batch(timeout=0.1)
+        if batch:
+            ticks.extend(batch)
+    return ticks
+
+
+def test_parse_trade_and_url():
+    frame = '{"stream":"btcusdt@aggTrade","data":{"e":"aggTrade","E":1735689600001,"s":"BTCUSDT","p":"100.5","q":"0.25","T":1735689600000}}'
+    assert parse_trade(frame) == {"timestamp": 1735689600000, "symbol": "BTCUSDT", "price": 100.5, "quantity": 0.25}
+    assert parse_trade('{"result":null,"id":1}') is None
+    assert combined_stream_url(["BTCUSDT", "ethusdt"]).endswith("streams=btcusdt@aggTrade/ethusdt@aggTrade")
+
+
+def test_client_batches_replayed_stream():
+    frames = synthetic_frames(("AAA", "BBB"), n=500)
+    server = ReplayServer(frames).start()
+    client = WebsocketClient(url=server.url, batch_size=64, batch_ms=20)
+    client.start()
+    try:
+        ticks = _drain(client, len(frames))
+    finally:
+        client.stop()
+        server.stop()
+    assert len(ticks) == len(frames)
+    assert {t["symbol"] for t in ticks} == {"AAA", "BBB"}
+    assert client.stats["batches"] >= len(frames) // 64
+
+
+def test_client_reconnects_and_resumes():
+    frames = synthetic_frames(("AAA",), n=300)
+    server = ReplayServer(frames, close_after=100).start()
+    client = WebsocketClient(url=server.url, batch_size=50, batch_ms=10, backoff_base=0.01)
+    client.start()
+    try:
+        ticks = _drain(client, len(frames))
+    finally:
+        client.stop()
+        server.stop()
+    assert len(ticks) == len(frames)
+    assert client.stats["reconnects"] >= 2
+
+
+def test_drop_oldest_backpressure():
+    frames = synthetic_frames(("AAA",), n=1000)
+    server = ReplayServer(frames).start()
+    client = WebsocketClient(url=server.url, batch_size=10, batch_ms=10, queue_size=5, policy="drop_oldest")
+    client.start()
+    try:
+        deadline = time.monotonic() + 10.0
+        while client.stats["messages"] < len(frames) and time.monotonic() < deadline:
+            time.sleep(0.02)
+        ticks = _drain(client, len(frames), timeout=0.5)
+    finally:
+        client.stop()
+        server.stop()
+    assert client.queue.maxsize == 5
+    assert client.stats["dropped"] == len(frames) - len(ticks)
+    # the newest ticks survive
+    assert ticks[-1]["timestamp"] == max(t["timestamp"] for t in ticks)
+    assert client.stats["dropped"] > 0
+
+
+def test_block_backpressure_keeps_event_loop_running():
+    frames = synthetic_frames(("AAA",), n=500)
+    server = ReplayServer(frames).start()
+    client = WebsocketClient(url=server.url, batch_size=10, batch_ms=10, queue_size=2, policy="block")
+    client.start()
+    try:
+        deadline = time.monotonic() + 10.0
+        while not client.queue.full() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        # ingestion is now held back, but the loop still runs other work (e.g. keepalive pings)
+        asyncio.run_coroutine_threadsafe(asyncio.sleep(0), client._loop).result(timeout=1.0)
+        ticks = _drain(client, len(frames))
+    finally:
+        client.stop()
+        server.stop()
+    assert [t["timestamp"] for t in ticks] == sorted(t["timestamp"] for t in ticks)
+    assert len(ticks) == len(frames) and client.stats["dropped"] == 0
+
+
+def test_callback_errors_are_counted_not_swallowed():
+    frames = synthetic_frames(("AAA",), n=200)
+    server = ReplayServer(frames).start()
+    seen = []
+
+    def on_message(batch):
+        seen.extend(batch)
+        raise RuntimeError("boom")
+
+    client = WebsocketClient(on_message=on_message, url=server.url, batch_size=50, batch_ms=10)
+    client.start()
+    try:
+        deadline = time.monotonic() + 10.0
+        while len(seen) < len(frames) and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        client.stop()
+        server.stop()
+    assert len(seen) == len(frames)
+    assert client.stats["callback_errors"] == client.stats["batches"] > 0
+    assert isinstance(client.last_error, RuntimeError) and client.stats["reconnects"] == 0
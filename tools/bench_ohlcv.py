@@ -0,0 +1,80 @@
+"""Benchmark vectorised `ticks_to_ohlcv` against the original per-symbol resample.
+
+Usage: python tools/bench_ohlcv.py --sizes 1000000 10000000 --symbols 50
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# ensure repo root is on path so `src` is importable when run as a script
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import numpy as np
+import pandas as pd
+from src.storage import ticks_to_ohlcv
+
+
+def legacy_ticks_to_ohlcv(ticks: pd.DataFrame, interval: str = "1s") -> pd.DataFrame:
+    """The groupby/resample implementation `ticks_to_ohlcv` replaced."""
+    df = ticks.copy()
+    orig_ts = df["timestamp"].copy()
+    try:
+        df["timestamp"] = pd.to_datetime(orig_ts, errors="coerce")
+        if df["timestamp"].isna().any():
+            df["timestamp"] = orig_ts.astype(str).apply(pd.to_datetime)
+    except Exception:
+        df["timestamp"] = orig_ts.astype(str).apply(pd.to_datetime)
+    df = df.set_index("timestamp")
+    out_frames = []
+    for sym, g in df.groupby("symbol"):
+        g = g.sort_index()
+        ohlc = g["price"].resample(interval).ohlc()
+        vol = g["quantity"].resample(interval).sum().rename("volume")
+        merged = pd.concat([ohlc, vol], axis=1)
+        merged["symbol"] = sym
+        out_frames.append(merged)
+    res = pd.concat(out_frames)
+    return res.reset_index().set_index(["symbol", "timestamp"]).sort_index()
+
+
+def make_ticks(n: int, n_symbols: int, seed: int = 0) -> pd.DataFrame:
+    """`n` ticks spread over `n_symbols` symbols, ~1 tick per ms overall."""
+    rng = np.random.default_rng(seed)
+    ts = pd.Timestamp("2025-01-01").value + np.sort(rng.integers(0, n * 1_000_000, n))
+    return pd.DataFrame({
+        "timestamp": pd.to_datetime(ts),
+        "symbol": rng.choice([f"SYM{i:03d}" for i in range(n_symbols)], size=n),
+        "price": 100 + rng.normal(scale=0.01, size=n).cumsum(),
+        "quantity": rng.integers(1, 10, size=n),
+    })
+
+
+def _time(fn, *args, **kwargs) -> float:
+    t0 = time.perf_counter()
+    fn(*args, **kwargs)
+    return time.perf_counter() - t0
+
+
+def main(sizes=(1_000_000, 10_000_000), n_symbols=50, interval="1s", iso=False):
+    print(f"{'ticks':>12} {'legacy s':>10} {'vector s':>10} {'speedup':>8}")
+    for n in sizes:
+        df = make_ticks(n, n_symbols)
+        if iso:
+            # CSV round-trip: ISO strings that drop the fraction on whole seconds
+            iso_ts = df["timestamp"].dt.floor("ms").dt.strftime("%Y-%m-%dT%H:%M:%S.%f")
+            df["timestamp"] = iso_ts.str.replace(r"\.000000$", "", regex=True)
+        fast = _time(ticks_to_ohlcv, df, interval=interval)
+        slow = _time(legacy_ticks_to_ohlcv, df, interval={"1m": "1min", "5m": "5min"}.get(interval, interval))
+        print(f"{n:>12,} {slow:>10.2f} {fast:>10.2f} {slow / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("--sizes", nargs="+", type=int, default=[1_000_000, 10_000_000])
+    p.add_argument("--symbols", type=int, default=50)
+    p.add_argument("--interval", default="1s")
+    p.add_argument("--iso", action="store_true", help="feed mixed-precision ISO strings as from a CSV upload")
+    args = p.parse_args()
+    main(sizes=args.sizes, n_symbols=args.symbols, interval=args.interval, iso=args.iso)
@@ -0,0 +1,62 @@
+"""Offline ingestion benchmark against the local replay server.
+
+Measures `WebsocketClient` throughput (msgs/s) and end-to-end latency from
+the server stamping a frame to its batch being delivered.
+
+Usage: python tools/bench_ws.py --n 50000 --rate 0 --batch-size 500 --batch-ms 50
+"""
+import argparse
+import sys
+import threading
+import time
+from pathlib import Path
+
+# ensure repo root is on path so `tools` and `src` are importable when run as a script
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import numpy as np
+from src.ws_client import WebsocketClient
+from tools.ws_replay_server import ReplayServer, synthetic_frames
+
+
+def main(n=50000, symbols=("BTCUSDT", "ETHUSDT"), rate=0.0, batch_size=500, batch_ms=50.0, stamp=True):
+    frames = synthetic_frames(symbols, n=n // len(symbols))
+    server = ReplayServer(frames, rate=rate, stamp=stamp).start()
+    latencies = []
+    done = threading.Event()
+    received = 0
+
+    def on_batch(batch):
+        nonlocal received
+        now_ms = time.time() * 1000
+        latencies.extend(now_ms - t["timestamp"] for t in batch)
+        received += len(batch)
+        if received >= len(frames):
+            done.set()
+
+    client = WebsocketClient(on_message=on_batch, url=server.url, batch_size=batch_size, batch_ms=batch_ms)
+    t0 = time.perf_counter()
+    client.start()
+    done.wait(timeout=300)
+    elapsed = time.perf_counter() - t0
+    client.stop()
+    server.stop()
+
+    print(f"messages: {received} in {elapsed:.2f}s -> {received / elapsed:,.0f} msgs/s")
+    if stamp and latencies:
+        lat = np.asarray(latencies)
+        print(f"latency ms: p50={np.percentile(lat, 50):.1f} p99={np.percentile(lat, 99):.1f} max={lat.max():.1f}")
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("--n", type=int, default=50000)
+    p.add_argument("--symbols", nargs="+", default=["BTCUSDT", "ETHUSDT"])
+    p.add_argument("--rate", type=float, default=0.0, help="server send rate in msgs/s (0 = as fast as possible)")
+    p.add_argument("--batch-size", type=int, default=500)
+    p.add_argument("--batch-ms", type=float, default=50.0)
+    p.add_argument("--no-stamp", action="store_true", help="replay recorded times (skips latency measurement)")
+    args = p.parse_args()
+    main(n=args.n, symbols=args.symbols, rate=args.rate, batch_size=args.batch_size,
+         batch_ms=args.batch_ms, stamp=not args.no_stamp)
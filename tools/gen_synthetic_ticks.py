@@ -1,29 +1,142 @@
-"""Generate simple synthetic tick CSV for demo and tests."""
+"""Generate synthetic tick CSV for demo, tests and benchmarks.
+
+`gen()` is the simple one-symbol random walk used by the dashboards.
+`gen_universe()` streams a realistic multi-symbol universe in chunks.
+"""
 import argparse
+import sys
+from pathlib import Path
+from typing import Iterator
 import numpy as np
 import pandas as pd
 
 
 def gen(symbol: str, n: int = 1000, seed: int = 42, start_price: float = 100.0):
+    """`n` one-second ticks of a random walk in the `compact_ticks` schema.
+
+    Quantities are whole numbers but stored as float64 like every compact
+    frame, so CSV output writes them as e.g. ``5.0``.
+    """
+    from src.storage import compact_ticks
+
     rng = np.random.default_rng(seed)
     # simple random walk
     steps = rng.normal(loc=0.0, scale=0.1, size=n)
     prices = start_price + np.cumsum(steps)
     quantities = rng.integers(1, 10, size=n)
     timestamps = pd.date_range("2025-01-01", periods=n, freq="s")
-    return pd.DataFrame({"timestamp": timestamps, "symbol": symbol, "price": prices, "quantity": quantities})
+    return compact_ticks(pd.DataFrame({"timestamp": timestamps, "symbol": symbol, "price": prices, "quantity": quantities}))
+
+
+def gen_universe(
+    n_symbols: int = 50,
+    n_ticks: int = 1_000_000,
+    chunk_size: int = 1_000_000,
+    n_factors: int = 5,
+    rate: float = 1000.0,
+    burst_frac: float = 0.1,
+    burst_mult: float = 20.0,
+    mean_burst: int = 500,
+    factor_vol: float = 2e-4,
+    resid_scale: float = 2e-3,
+    resid_phi: float = 0.995,
+    start: str = "2025-01-01",
+    seed: int = 0,
+) -> Iterator[pd.DataFrame]:
+    """Stream `n_ticks` ticks of a cointegrated universe in time-ordered chunks.
+
+    - arrivals are Poisson at `rate` ticks/s overall, switching into bursts
+      `burst_mult` times faster for about `burst_frac` of the ticks
+    - symbols trade with Zipf-like activity (a few names dominate the flow)
+    - log prices are loadings on `n_factors` common random walks plus a
+      stationary AR(1) residual per symbol; symbol i loads on factor
+      i % n_factors, so symbols sharing a factor are cointegrated (in logs)
+    Only one chunk is held in memory at a time, so 100M+ ticks can be
+    written to disk without materialising them.
+    """
+    from scipy.signal import lfilter  # only the universe generator needs scipy
+
+    rng = np.random.default_rng(seed)
+    names = np.array([f"SYM{i:04d}" for i in range(n_symbols)], dtype=object)
+    activity = 1.0 / np.arange(1, n_symbols + 1) ** 0.8
+    activity = rng.permutation(activity / activity.sum())
+    # symbol i loads only on factor i % n_factors
+    loadings = np.zeros((n_symbols, n_factors))
+    loadings[np.arange(n_symbols), np.arange(n_symbols) % n_factors] = rng.uniform(0.5, 1.5, n_symbols)
+    log_base = np.log(rng.uniform(20, 500, n_symbols))
+    eps_scale = resid_scale * np.sqrt(1 - resid_phi**2)
+    mean_calm = mean_burst * (1 - burst_frac) / burst_frac
+
+    t_ns = pd.Timestamp(start).value
+    factors = np.zeros(n_factors)
+    resid = rng.normal(scale=resid_scale, size=n_symbols)
+    burst, run_left = False, int(rng.geometric(1 / mean_calm))
+    done = 0
+    while done < n_ticks:
+        m = min(chunk_size, n_ticks - done)
+        # regime of each tick from alternating geometric run lengths
+        in_burst = np.empty(m, dtype=bool)
+        filled = 0
+        while filled < m:
+            take = min(run_left, m - filled)
+            in_burst[filled:filled + take] = burst
+            filled += take
+            run_left -= take
+            if run_left == 0:
+                burst = not burst
+                run_left = int(rng.geometric(1 / (mean_burst if burst else mean_calm)))
+        dt = rng.exponential(1.0 / rate, m) / np.where(in_burst, burst_mult, 1.0)
+        ts = t_ns + np.cumsum(np.maximum((dt * 1e9).astype(np.int64), 1))
+        t_ns = int(ts[-1])
+
+        sym = rng.choice(n_symbols, size=m, p=activity)
+        path = factors + np.cumsum(rng.normal(size=(m, n_factors)) * (factor_vol * np.sqrt(dt))[:, None], axis=0)
+        factors = path[-1]
+
+        # AR(1) residual per symbol, advanced on that symbol's own ticks
+        eps = np.empty(m)
+        order = np.argsort(sym, kind="stable")
+        bounds = np.searchsorted(sym[order], np.arange(n_symbols + 1))
+        for s in range(n_symbols):
+            idx = order[bounds[s]:bounds[s + 1]]
+            if idx.size:
+                z = rng.normal(scale=eps_scale, size=idx.size)
+                eps[idx], _ = lfilter([1.0], [1.0, -resid_phi], z, zi=[resid_phi * resid[s]])
+                resid[s] = eps[idx[-1]]
+
+        log_price = log_base[sym] + np.einsum("ij,ij->i", loadings[sym], path) + eps
+        yield pd.DataFrame({
+            "timestamp": ts.view("datetime64[ns]"),
+            "symbol": pd.Categorical.from_codes(sym, categories=names),
+            "price": np.round(np.exp(log_price), 2),
+            "quantity": rng.geometric(0.3, size=m).astype(float),
+        })
+        done += m
 
 
 if __name__ == "__main__":
+    # ensure repo root is on path so `src` is importable when run as a script
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+    from src.storage import compact_ticks
+
     p = argparse.ArgumentParser()
     p.add_argument("--symbols", nargs="+", default=["SYM1", "SYM2"])
     p.add_argument("--n", type=int, default=1000)
     p.add_argument("--out", default="synthetic_ticks.csv")
+    p.add_argument("--universe", type=int, default=0, help="stream a cointegrated universe of this many symbols instead")
+    p.add_argument("--rate", type=float, default=1000.0, help="universe ticks per second (Poisson)")
+    p.add_argument("--chunk", type=int, default=1_000_000)
     args = p.parse_args()
 
+    if args.universe:
+        for i, chunk in enumerate(gen_universe(args.universe, args.n, chunk_size=args.chunk, rate=args.rate)):
+            chunk.to_csv(args.out, index=False, mode="w" if i == 0 else "a", header=i == 0)
+        print(f"Written {args.out}")
+        raise SystemExit
+
     frames = []
     for i, s in enumerate(args.symbols):
         frames.append(gen(s, n=args.n, seed=42 + i, start_price=100 + 10 * i))
-    df = pd.concat(frames).sort_values("timestamp")
+    df = compact_ticks(pd.concat(frames).sort_values("timestamp"))
     df.to_csv(args.out, index=False)
     print(f"Written {args.out}")
@@ -0,0 +1,56 @@
+"""Replay stored ticks and backtest z-score pair trading over a parameter grid.
+
+Usage:
+    python tools/run_backtest.py --ticks synthetic_ticks.csv --pairs SYM1:SYM2 \
+        --windows 30 60 120 --thresholds 1.5 2 2.5 --processes 4
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# ensure repo root is on path so `tools` and `src` are importable when run as a script
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.backtest import sweep
+from src.storage import _interval_ns
+
+
+def _interval(value: str) -> str:
+    """argparse type: a bar interval such as 1s, 15s, 1m or 1h."""
+    try:
+        ok = _interval_ns(value) > 0
+    except ValueError:
+        ok = False
+    if not ok:
+        raise argparse.ArgumentTypeError(f"invalid interval {value!r}; expected e.g. 1s, 15s, 1m, 1h")
+    return value
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser()
+    p.add_argument("--ticks", required=True, help="tick CSV with timestamp,symbol,price,quantity (time-sorted)")
+    p.add_argument("--pairs", nargs="+", required=True, help="pairs as A:B (A is regressed on B)")
+    p.add_argument("--windows", nargs="+", type=int, default=[30, 60, 120])
+    p.add_argument("--thresholds", nargs="+", type=float, default=[1.5, 2.0, 2.5])
+    p.add_argument("--exit", type=float, default=0.5)
+    p.add_argument("--interval", type=_interval, default="1s", help="bar interval, any fixed length (e.g. 15s, 1h)")
+    p.add_argument("--cost-bps", type=float, default=0.0)
+    p.add_argument("--processes", type=int, default=None)
+    p.add_argument("--out", default=None, help="optional CSV for the results table")
+    args = p.parse_args(argv)
+
+    start = time.perf_counter()
+    res = sweep(
+        args.ticks, [tuple(s.split(":")) for s in args.pairs], windows=args.windows, thresholds=args.thresholds,
+        exit=args.exit, interval=args.interval, cost_bps=args.cost_bps, processes=args.processes,
+    )
+    print(res.to_string(index=False))
+    print(f"\n{len(res)} runs in {time.perf_counter() - start:.1f}s")
+    if args.out:
+        res.to_csv(args.out, index=False)
+
+
+if __name__ == "__main__":
+    main()
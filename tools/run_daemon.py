@@ -0,0 +1,102 @@
+"""Run the headless analytics daemon.
+
+Replays a tick CSV (or subscribes to Binance) and serves the latest pair
+state as JSON on a local TCP port; the dashboards read it with
+`src.daemon.read_state`. With `--shm` the closed bars and per-bar signals
+are also published to a shared-memory segment (`src.shm.SharedBarsReader`).
+
+Usage:
+    python tools/run_daemon.py --pairs SYM1:SYM2 --replay synthetic_ticks.csv --speed 10
+    python tools/run_daemon.py --pairs BTCUSDT:ETHUSDT --ws --metrics-port 9108
+    python tools/run_daemon.py --pairs SYM1:SYM2 --replay synthetic_ticks.csv --shm rtq_bars
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# ensure repo root is on path so `tools` and `src` are importable when run as a script
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src import metrics
+from src.alerts import AlertDispatcher, FileSink
+from src.daemon import AnalyticsDaemon, default_rules, ws_batches
+from src.replay import replay_ticks
+from src.storage import _interval_ns
+from src.ws_client import WebsocketClient
+
+
+def _interval(value: str) -> str:
+    """argparse type: a bar interval such as 1s, 15s, 1m or 1h."""
+    try:
+        ok = _interval_ns(value) > 0
+    except ValueError:
+        ok = False
+    if not ok:
+        raise argparse.ArgumentTypeError(f"invalid interval {value!r}; expected e.g. 1s, 15s, 1m, 1h")
+    return value
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser()
+    p.add_argument("--pairs", nargs="+", required=True, help="pairs as A:B (A is regressed on B)")
+    src = p.add_mutually_exclusive_group(required=True)
+    src.add_argument("--replay", help="tick CSV with timestamp,symbol,price,quantity")
+    src.add_argument("--ws", action="store_true", help="live Binance trade streams")
+    p.add_argument("--speed", type=float, default=0.0, help="replay pace vs real time (0 = as fast as possible)")
+    p.add_argument("--interval", type=_interval, default="1s", help="bar interval, any fixed length (e.g. 15s, 1h)")
+    p.add_argument("--window", type=int, default=60)
+    p.add_argument("--threshold", type=float, default=2.0)
+    p.add_argument("--processes", type=int, default=None)
+    p.add_argument("--port", type=int, default=8766)
+    p.add_argument("--alerts", default=None, help="append alerts to this JSON-lines file")
+    p.add_argument("--metrics-port", type=int, default=None, help="serve Prometheus metrics on this port")
+    p.add_argument("--shm", default=None, help="publish bars and signals to this shared-memory segment")
+    p.add_argument("--lateness", default=None, help="allowed tick lateness before a bar is final, e.g. 2s")
+    p.add_argument("--amend-bars", type=int, default=0, help="finalized bars per symbol that late ticks may correct")
+    p.add_argument("--history", type=int, default=3600, help="spread bars kept per pair for the ADF test")
+    p.add_argument("--shm-capacity", type=int, default=None,
+                   help="bars/signal rows kept per ring in --shm (default: --history)")
+    args = p.parse_args(argv)
+
+    metrics_server = None
+    if args.metrics_port is not None:
+        metrics.enable()
+        metrics_server = metrics.MetricsServer(port=args.metrics_port).start()
+        print(f"Serving metrics on {metrics_server.url}")
+
+    pairs = [tuple(s.split(":")) for s in args.pairs]
+    dispatcher = AlertDispatcher([FileSink(args.alerts)]).start() if args.alerts else None
+    daemon = AnalyticsDaemon(
+        pairs, interval=args.interval, window=args.window, rules=default_rules(args.threshold),
+        processes=args.processes, address=("127.0.0.1", args.port), dispatcher=dispatcher,
+        shm_name=args.shm, history=args.history, shm_capacity=args.shm_capacity, lateness=args.lateness,
+        amend_bars=args.amend_bars,
+    ).start()
+    print(f"Serving state on {daemon.server.address[0]}:{daemon.server.address[1]}")
+    if args.shm:
+        print(f"Publishing bars and signals to shared memory {args.shm!r}")
+    client = None
+    try:
+        if args.replay:
+            daemon.run(replay_ticks(args.replay, speed=args.speed))
+        else:
+            client = WebsocketClient(symbols=sorted({s for pr in pairs for s in pr}))
+            client.start()
+            daemon.run(ws_batches(client))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if client is not None:
+            client.stop()
+        daemon.stop()
+        if dispatcher is not None:
+            dispatcher.stop()
+        if metrics_server is not None:
+            metrics_server.stop()
+    print(f"Processed {daemon.stats['ticks']} ticks, {daemon.stats['slices']} bars, {daemon.stats['alerts']} alerts"
+          f" ({daemon.aggregator.stats['late']} late ticks, {daemon.aggregator.stats['dropped']} dropped)")
+
+
+if __name__ == "__main__":
+    main()
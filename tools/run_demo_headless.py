@@ -15,9 +15,11 @@ import pandas as pd
 from src.storage import ticks_to_ohlcv
 from src.analytics import ols_hedge_ratio, construct_spread, rolling_zscore, adf_test
 from src.alerts import zscore_alerts
+from src.export import write_export
 
 
-def main(symbols=("SYM1", "SYM2"), n=240, rolling_window=60, z_threshold=2.0):
+def main(symbols=("SYM1", "SYM2"), n=240, rolling_window=60, z_threshold=2.0, out="pair_analysis.csv",
+         append=False):
     frames = [gen(s, n=n, seed=42 + i) for i, s in enumerate(symbols)]
     df = pd.concat(frames).sort_values("timestamp").reset_index(drop=True)
 
@@ -62,10 +64,9 @@ def main(symbols=("SYM1", "SYM2"), n=240, rolling_window=60, z_threshold=2.0):
     if alerts:
         print(pd.DataFrame(alerts).to_string(index=False))
 
-    # Save pair csv
-    out = pd.concat([a.rename(f"{a_sym}"), b.rename(f"{b_sym}"), spread.rename("spread"), z.rename("zscore")], axis=1)
-    out.to_csv("pair_analysis.csv")
-    print("\nWrote pair_analysis.csv")
+    # Save pair export (format from the file suffix), streamed in chunks
+    rows = write_export({a_sym: a, b_sym: b, "spread": spread, "zscore": z}, out, append=append)
+    print(f"\nWrote {rows} rows to {out}")
 
 
 if __name__ == "__main__":
@@ -74,5 +75,8 @@ if __name__ == "__main__":
     p.add_argument("--symbols", nargs="+", default=["SYM1", "SYM2"]) 
     p.add_argument("--window", type=int, default=60)
     p.add_argument("--threshold", type=float, default=2.0)
+    p.add_argument("--out", default="pair_analysis.csv", help=".csv, .csv.gz, .parquet (directory) or .arrow")
+    p.add_argument("--append", action="store_true", help="only add rows newer than those already in --out")
     args = p.parse_args()
-    main(symbols=args.symbols, n=args.n, rolling_window=args.window, z_threshold=args.threshold)
+    main(symbols=args.symbols, n=args.n, rolling_window=args.window, z_threshold=args.threshold, out=args.out,
+         append=args.append)
@@ -0,0 +1,137 @@
+"""Local WebSocket stand-in for the Binance combined trade stream.
+
+Replays recorded frames (one raw JSON frame per line) or frames synthesised
+from `gen()` at a configurable rate, so ingestion can be tested and
+benchmarked offline.
+
+Usage: python tools/ws_replay_server.py --frames recorded.jsonl --rate 20000 --port 8765
+"""
+import argparse
+import asyncio
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+# ensure repo root is on path so `tools` and `src` are importable when run as a script
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import pandas as pd
+from tools.gen_synthetic_ticks import gen
+
+
+def synthetic_frames(symbols: Sequence[str] = ("BTCUSDT", "ETHUSDT"), n: int = 1000) -> List[str]:
+    """Combined-stream aggTrade frames built from `gen()` ticks."""
+    frames = [gen(s, n=n, seed=42 + i) for i, s in enumerate(symbols)]
+    df = pd.concat(frames).sort_values("timestamp", kind="stable")
+    ts_ms = df["timestamp"].to_numpy(dtype="datetime64[ms]").astype("int64")
+    out = []
+    for i, (t, sym, p, q) in enumerate(zip(ts_ms, df["symbol"], df["price"], df["quantity"])):
+        data = {"e": "aggTrade", "E": int(t), "s": sym, "a": i, "p": f"{p:.8f}", "q": str(q), "T": int(t), "m": False}
+        out.append(json.dumps({"stream": f"{sym.lower()}@aggTrade", "data": data}))
+    return out
+
+
+def load_frames(path: str) -> List[str]:
+    """Recorded frames, one raw JSON message per line."""
+    with open(path) as f:
+        return [line.rstrip("\n") for line in f if line.strip()]
+
+
+class ReplayServer:
+    """Serve `frames` to every client at `rate` msgs/s (0 = as fast as possible).
+
+    The replay position is shared across connections, so a client that
+    reconnects resumes where it left off. `close_after` drops the connection
+    after that many frames to exercise reconnect logic; `stamp` rewrites the
+    trade time to the send time so clients can measure end-to-end latency.
+    """
+
+    def __init__(self, frames: List[str], rate: float = 0.0, host: str = "127.0.0.1", port: int = 0,
+                 close_after: Optional[int] = None, stamp: bool = False):
+        self.frames = frames
+        self.rate = rate
+        self.host = host
+        self.port = port
+        self.close_after = close_after
+        self.stamp = stamp
+        self.sent = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}/stream"
+
+    def _frame(self, i: int) -> str:
+        if not self.stamp:
+            return self.frames[i]
+        msg = json.loads(self.frames[i])
+        msg["data"]["T"] = msg["data"]["E"] = int(time.time() * 1000)
+        return json.dumps(msg)
+
+    async def _handler(self, ws) -> None:
+        start = time.perf_counter()
+        sent_here = 0
+        while self.sent < len(self.frames):
+            if self.close_after is not None and sent_here >= self.close_after:
+                await ws.close()
+                return
+            if self.rate > 0:
+                delay = start + sent_here / self.rate - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            await ws.send(self._frame(self.sent))
+            self.sent += 1
+            sent_here += 1
+        await ws.wait_closed()
+
+    async def _serve(self) -> None:
+        import websockets
+
+        self._stop = asyncio.Event()
+        async with websockets.serve(self._handler, self.host, self.port) as server:
+            self.port = server.sockets[0].getsockname()[1]
+            self._ready.set()
+            await self._stop.wait()
+
+    def serve_forever(self) -> None:
+        asyncio.run(self._serve())
+
+    def _run(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        self._loop.run_until_complete(self._serve())
+        self._loop.close()
+
+    def start(self) -> "ReplayServer":
+        """Serve from a background thread; returns once the port is bound."""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout=5.0)
+        return self
+
+    def stop(self) -> None:
+        if self._loop is not None and self._stop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("--frames", help="file of recorded frames (one JSON message per line)")
+    p.add_argument("--symbols", nargs="+", default=["BTCUSDT", "ETHUSDT"])
+    p.add_argument("--n", type=int, default=10000, help="synthetic ticks per symbol when --frames is not given")
+    p.add_argument("--rate", type=float, default=0.0, help="messages per second (0 = as fast as possible)")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    args = p.parse_args()
+    frames = load_frames(args.frames) if args.frames else synthetic_frames(args.symbols, n=args.n)
+    server = ReplayServer(frames, rate=args.rate, host=args.host, port=args.port)
+    print(f"Replaying {len(frames)} frames on ws://{args.host}:{args.port}/stream")
+    server.serve_forever()